@@ -1,7 +1,15 @@
 # app_main.py (o Home.py)
+import os
+
 import streamlit as st
-import pandas as pd
-import numpy as np 
+from simulacion.cache import cache_simulaciones
+from simulacion.calibracion import cargar_calibracion
+from simulacion.componentes import panel_perfilado
+from simulacion.escenarios import SEGMENTOS
+from simulacion.importaciones import TIEMPOS_IMPORTACION, importar, iniciar_precarga
+from simulacion.logistico import RESOLUCIONES
+from simulacion.perfilado import iniciar_ejecucion, seccion
+from simulacion.tablas import abrir_tablas
 
 # --- Configuración General de la Aplicación Streamlit ---
 st.set_page_config(
@@ -11,6 +19,12 @@ st.set_page_config(
     initial_sidebar_state="expanded" # Sidebar expandido por defecto
 )
 
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Inicio")
+
+# Precarga en segundo plano (una vez por proceso) de las bibliotecas científicas que usan las páginas
+iniciar_precarga()
+
 # --- Título Principal y Introducción ---
 st.title("💰 Simulación de Moneda Digital de Incentivos - NURC")
 
@@ -40,6 +54,64 @@ st.session_state['poblacion_total_urc'] = st.sidebar.number_input(
     "Población total de estudiantes URC", 1000, 50000, 25000, 1000,
     key="global_poblacion_urc"
 )
+st.session_state['resolucion_curvas'] = st.sidebar.selectbox(
+    "Resolución de las curvas de adopción", list(RESOLUCIONES),
+    format_func={"estandar": "Estándar (100 puntos)", "semanal": "Semanal", "diaria": "Diaria"}.get,
+    key="global_resolucion_curvas"
+)
+
+# Registros reales de participación: su calibración define los valores por defecto de las páginas
+with st.sidebar.expander("Datos de participación observados"):
+    directorio_participacion = st.text_input(
+        "Directorio de registros (CSV/Parquet con estudiante, segmento, fecha)",
+        os.environ.get("NURC_DATOS_PARTICIPACION", ""), key="global_directorio_participacion"
+    )
+    st.session_state['directorio_participacion'] = directorio_participacion
+    if directorio_participacion and not os.path.isdir(directorio_participacion):
+        st.error("El directorio no existe.")
+    elif directorio_participacion:
+        if st.button("Ingerir registros nuevos y calibrar", key="global_calibrar"):
+            with seccion("Ingesta y calibración"), st.spinner("Procesando registros nuevos..."):
+                ingesta = importar("simulacion.ingesta") # pyarrow y scipy solo se cargan al ingerir
+                resumen_ingesta, _ = ingesta.calibrar(directorio_participacion)
+            st.write(f"{resumen_ingesta.archivos_procesados} archivos nuevos o ampliados "
+                     f"({resumen_ingesta.bytes_leidos / 1e6:,.1f} MB) en {resumen_ingesta.segundos:.2f} s"
+                     + (" · estado reconstruido" if resumen_ingesta.reconstruido else ""))
+            for archivo, mensaje in resumen_ingesta.errores.items():
+                st.error(f"No se pudo leer `{archivo}`: {mensaje}")
+            if resumen_ingesta.filas_descartadas:
+                st.error(f"{resumen_ingesta.filas_descartadas:,} filas descartadas (segmento desconocido, "
+                         f"sin fecha o sin estudiante).")
+        with seccion("Calibración guardada"):
+            for clave, parametros in cargar_calibracion(directorio_participacion).items():
+                st.write(f"**{SEGMENTOS[clave]['nombre']}**: r = {parametros['r']:.3f} "
+                         f"(IC 95%: {parametros['ic_r'][0]:.3f}–{parametros['ic_r'][1]:.3f}), "
+                         f"K = {parametros['K']:,.0f} ({parametros['ic_K'][0]:,.0f}–{parametros['ic_K'][1]:,.0f}), "
+                         f"N0 = {parametros['N0']:,.0f} ({parametros['meses']} meses desde {parametros['primer_mes']})")
+
+# Estado de la caché de simulaciones compartida por todas las sesiones del servidor
+with st.sidebar.expander("Caché de simulaciones"):
+    stats_cache = cache_simulaciones.estadisticas()
+    st.write(f"Aciertos: **{stats_cache['aciertos']}** · Fallos: **{stats_cache['fallos']}** "
+             f"· Tasa de aciertos: **{stats_cache['tasa_aciertos']:.0%}**")
+    st.write(f"Entradas: {stats_cache['entradas']} / {stats_cache['max_entradas']}")
+    tablas_montecarlo = abrir_tablas()
+    if tablas_montecarlo is not None:
+        st.write(f"Tablas Monte Carlo precalculadas: {len(tablas_montecarlo.sigmas)} (σ r, σ K) · "
+                 f"{tablas_montecarlo.num_trayectorias:,} trayectorias")
+    else:
+        st.write("Tablas Monte Carlo: no construidas (`python -m simulacion.tablas`)")
+
+# Costo de la primera importación de cada biblioteca pesada en este proceso del servidor
+with st.sidebar.expander("Tiempos de importación"):
+    if TIEMPOS_IMPORTACION:
+        for modulo, registro in sorted(TIEMPOS_IMPORTACION.items(), key=lambda item: -item[1]["ms"]):
+            st.write(f"`{modulo}`: {registro['ms']:.0f} ms ({registro['origen']})")
+    else:
+        st.write("La precarga aún no ha importado ningún módulo.")
+
+# Tiempos por sección de las últimas reejecuciones de todas las páginas
+panel_perfilado()
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Navegación de la Aplicación")
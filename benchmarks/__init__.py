@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Suite de rendimiento de la aplicación NURC (ver benchmarks/rendimiento.py).
@@ -0,0 +1,425 @@
+# benchmarks/rendimiento.py
+# Mide los núcleos de cálculo, las reejecuciones completas de cada página y el arranque en frío.
+#   python -m benchmarks                       # compara contra benchmarks/baseline.json
+#   python -m benchmarks --guardar-baseline    # reescribe la línea base
+#   python -m benchmarks --grupos volumen      # dimensionamiento de los módulos de gran volumen (opcional)
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PAGINAS = ["app.py", "pages/1_Cultura.py", "pages/2_Sostenibilidad.py",
+           "pages/3_Dedicacion_Escolar.py", "pages/4_Comparativa_General.py", "pages/5_Dinamica_Monetaria.py"]
+
+POBLACIONES = [1000, 10000, 25000, 50000, 100000]
+DURACIONES = [12, 24, 36, 60]
+POBLACIONES_PAGINAS = [1000, 25000, 50000]
+DURACIONES_PAGINAS = [12, 60]
+
+
+def medir(funcion, repeticiones=5, preparar=None):
+    """Ejecuta `funcion` varias veces y devuelve la mediana y el mínimo en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {"mediana_ms": statistics.median(tiempos), "min_ms": min(tiempos)}
+
+
+# --- Núcleos de cálculo ---
+def bench_nucleos(repeticiones):
+    from sklearn.decomposition import PCA
+    from sklearn.linear_model import LinearRegression
+
+    from simulacion.escenarios import SEGMENTOS
+    from simulacion.logistico import N0_DEFECTO, malla_temporal, simular_logistico
+    from simulacion.metricas import evaluar_metricas, tabla_metricas
+
+    resultados = {}
+    for poblacion in POBLACIONES:
+        for duracion in DURACIONES:
+            sufijo = f"[poblacion={poblacion},duracion={duracion}]"
+            t = malla_temporal(duracion)
+            K = np.array([SEGMENTOS[c]["fraccion_capacidad"] for c in SEGMENTOS]) * poblacion
+            resultados[f"nucleo.logistico{sufijo}"] = medir(
+                lambda: simular_logistico(N0_DEFECTO, 0.05, K, t), repeticiones)
+
+            participantes = simular_logistico(N0_DEFECTO, 0.05, K, t)
+
+            # Igual que las páginas de segmento: registro de métricas evaluado y tabla de un solo bloque
+            def tablas_impacto():
+                for s, clave in enumerate(SEGMENTOS):
+                    valores, metricas = evaluar_metricas(participantes[s][None, :], (clave,))
+                    tabla_metricas(t, valores, metricas)
+            resultados[f"nucleo.tablas_impacto{sufijo}"] = medir(tablas_impacto, repeticiones)
+
+        # El análisis de factores escala con el número de observaciones, no con la duración
+        rng = np.random.default_rng(42)
+        X = rng.random((poblacion, 4)) * [100, 100, 10, 50]
+        y = X @ [0.5, 0.3, -2, 0.8] + rng.standard_normal(poblacion) * 10
+        resultados[f"nucleo.pca[observaciones={poblacion}]"] = medir(
+            lambda: PCA(n_components=2).fit_transform(X), repeticiones)
+        resultados[f"nucleo.regresion[observaciones={poblacion}]"] = medir(
+            lambda: LinearRegression().fit(X[:, :1], y), repeticiones)
+    return resultados
+
+
+# --- Reejecuciones completas de las páginas (AppTest) ---
+def bench_paginas(repeticiones):
+    from streamlit.testing.v1 import AppTest
+
+    from simulacion.cache import cache_simulaciones
+    from simulacion.importaciones import iniciar_precarga
+
+    # app.py lanza la precarga de módulos en un hilo; se completa antes de medir para que no compita
+    # con las reejecuciones (en el servidor termina una sola vez por proceso, al arrancar)
+    precarga = iniciar_precarga()
+    if precarga is not None:
+        precarga.join()
+
+    resultados = {}
+    for pagina in PAGINAS:
+        for poblacion in POBLACIONES_PAGINAS:
+            for duracion in DURACIONES_PAGINAS:
+                app = AppTest.from_file(str(RAIZ / pagina), default_timeout=120)
+                app.session_state["poblacion_total_urc"] = poblacion
+                app.session_state["duracion_simulacion"] = duracion
+
+                def ejecutar():
+                    app.run()
+                    if app.exception:
+                        raise RuntimeError(f"{pagina} lanzó una excepción: {app.exception[0].value}")
+
+                sufijo = f"{pagina}[poblacion={poblacion},duracion={duracion}]"
+                resultados[f"pagina.fria.{sufijo}"] = medir(ejecutar, repeticiones, preparar=cache_simulaciones.limpiar)
+                resultados[f"pagina.reejecucion.{sufijo}"] = medir(ejecutar, repeticiones)
+    return resultados
+
+
+# --- Arranque en frío ---
+CODIGO_ARRANQUE = """
+import sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+AppTest.from_file({app!r}, default_timeout=120).run()
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+
+def bench_arranque(repeticiones):
+    """Ejecuta app.py en un intérprete nuevo cada vez: incluye la importación de todas las dependencias."""
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", CODIGO_ARRANQUE.format(raiz=str(RAIZ), app=str(RAIZ / "app.py"))],
+                                capture_output=True, text=True, check=True, cwd=RAIZ)
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    return {"arranque.app.py": {"mediana_ms": statistics.median(tiempos), "min_ms": min(tiempos)}}
+
+
+# --- Dimensionamiento de los módulos de gran volumen (grupo opcional) ---
+def volumen_libro_mayor(repeticiones):
+    """Genera y escribe el libro mayor de 50,000 estudiantes y 60 meses, y lo vuelve a agregar en flujo."""
+    from simulacion.agentes import ACCIONES_POR_MES
+    from simulacion.libro_mayor import agregar_libro_mayor, escribir_libro_mayor, generar_transacciones, verificar_cadena
+    from simulacion.logistico import N0_DEFECTO, simular_logistico
+
+    poblacion, meses = 50000, 60
+    participantes = simular_logistico(N0_DEFECTO, 0.3, np.array([0.2, 0.15, 0.3]) * poblacion, np.arange(meses + 1))
+    sufijo = f"[poblacion={poblacion},meses={meses}]"
+    with tempfile.TemporaryDirectory(prefix="libro_mayor_") as temporal:
+        directorio = Path(temporal) / "libro_mayor"
+
+        def escribir():
+            escribir_libro_mayor(generar_transacciones(participantes, [10, 1.0, 50], list(ACCIONES_POR_MES.values()),
+                                                       poblacion), directorio)
+
+        resultados = {f"volumen.libro_mayor.escritura{sufijo}": medir(
+            escribir, repeticiones, preparar=lambda: shutil.rmtree(directorio, ignore_errors=True))}
+        resultados[f"volumen.libro_mayor.agregacion{sufijo}"] = medir(
+            lambda: agregar_libro_mayor(directorio, poblacion), repeticiones)
+        if not verificar_cadena(directorio)[0]:
+            raise RuntimeError("La cadena de hashes del libro mayor no es válida")
+    return resultados
+
+
+def volumen_factores(repeticiones):
+    """Análisis de factores por bloques sobre una encuesta sintética de 5 millones de filas en Parquet."""
+    from simulacion.factores import FACTORES, OBJETIVO, analisis_factores_incremental, generar_encuesta_sintetica, iterar_bloques
+
+    filas = 5_000_000
+    with tempfile.TemporaryDirectory(prefix="encuesta_") as temporal:
+        ruta = str(Path(temporal) / "encuesta.parquet")
+        generar_encuesta_sintetica(ruta, filas)
+        return {f"volumen.factores.incremental[filas={filas}]": medir(
+            lambda: analisis_factores_incremental(iterar_bloques(ruta, [*FACTORES, OBJETIVO])), repeticiones)}
+
+
+def volumen_ingesta(repeticiones):
+    """Ingesta completa y calibración de 36 meses de registros (25,000 estudiantes), y la de un mes anexado."""
+    from simulacion.calibracion import DIRECTORIO_ESTADO
+    from simulacion.escenarios import SEGMENTOS
+    from simulacion.ingesta import calibrar, generar_registros_mes, ingerir
+    from simulacion.logistico import solucion_logistica
+
+    poblacion, meses = 25000, 36
+    rng = np.random.default_rng(42)
+    fracciones = np.array([SEGMENTOS[c]["fraccion_capacidad"] for c in SEGMENTOS])
+    curvas = solucion_logistica(10, np.array([0.3, 0.25, 0.2]), fracciones * poblacion, np.arange(meses + 1))
+    with tempfile.TemporaryDirectory(prefix="registros_") as temporal:
+        directorio, aparte = Path(temporal) / "registros", Path(temporal) / "aparte"
+        directorio.mkdir()
+        aparte.mkdir()
+        for m in range(meses + 1):
+            generar_registros_mes(directorio / f"eventos_{2020 + m // 12}_{m % 12 + 1:02d}.parquet",
+                                  2020 + m // 12, m % 12 + 1, curvas[:, m], poblacion, [3.0, 8.0, 1.0], rng)
+        ultimo = sorted(directorio.glob("*.parquet"))[-1]
+
+        def historico_sin_estado():
+            """Solo los `meses` históricos y sin estado de ingesta: el mes siguiente queda aparte."""
+            shutil.rmtree(directorio / DIRECTORIO_ESTADO, ignore_errors=True)
+            if ultimo.exists():
+                ultimo.rename(aparte / ultimo.name)
+
+        def historico_ingerido():
+            historico_sin_estado()
+            ingerir(directorio)
+            (aparte / ultimo.name).rename(ultimo)
+
+        sufijo = f"[poblacion={poblacion},meses={meses}]"
+        return {
+            f"volumen.ingesta.completa{sufijo}": medir(lambda: calibrar(directorio), repeticiones,
+                                                        preparar=historico_sin_estado),
+            f"volumen.ingesta.mes_anexado{sufijo}": medir(lambda: calibrar(directorio), repeticiones,
+                                                          preparar=historico_ingerido),
+        }
+
+
+def volumen_calibracion(repeticiones):
+    """Calibración multi-inicio de 500 cohortes sintéticas de 37 meses, en un proceso y en todos los núcleos."""
+    from simulacion.calibracion import calibrar_cohortes
+    from simulacion.logistico import solucion_logistica
+
+    cohortes = 500
+    rng = np.random.default_rng(42)
+    t = np.arange(37.0)
+    verdad = np.stack([rng.uniform(2, 50, cohortes), rng.uniform(0.05, 0.6, cohortes),
+                       rng.uniform(500, 20000, cohortes)], axis=1)
+    observado = solucion_logistica(verdad[:, 0], verdad[:, 1], verdad[:, 2], t)
+    observado += rng.normal(0, 1, observado.shape) * 0.01 * verdad[:, 2:3]
+    resultados = {}
+    for procesos in sorted({1, os.cpu_count() or 1}):
+        resultados[f"volumen.calibracion.cohortes[cohortes={cohortes},procesos={procesos}]"] = medir(
+            lambda: calibrar_cohortes(t, observado, procesos=procesos), repeticiones)
+    if not calibrar_cohortes(t, observado).convergio.mean() > 0.9:
+        raise RuntimeError("Menos del 90% de las cohortes sintéticas convergieron")
+    return resultados
+
+
+def volumen_tablas(repeticiones):
+    """
+    Construye las tablas de bandas Monte Carlo con 1,000 trayectorias y compara 20 consultas al azar
+    (dentro de los rangos de las páginas) con la simulación en línea: costo de cada camino y error de la tabla.
+    """
+    from simulacion.estocastico import simular_montecarlo
+    from simulacion.logistico import malla_temporal
+    from simulacion.tablas import SIGMAS_DEFECTO, TablasMontecarlo, construir_tablas
+
+    trayectorias, (sigma_r, sigma_K) = 1000, SIGMAS_DEFECTO[0]
+    rng = np.random.default_rng(0)
+    casos = [(rng.uniform(0.005, 0.2), rng.uniform(0.1, 1.0) * rng.choice([1000, 25000, 50000]),
+              malla_temporal(rng.choice(np.arange(12, 61, 6)))) for _ in range(20)]
+    sufijo = f"[trayectorias={trayectorias},casos={len(casos)}]"
+    with tempfile.TemporaryDirectory(prefix="tablas_") as directorio:
+        resultados = {f"volumen.tablas.construccion[trayectorias={trayectorias}]": medir(
+            lambda: construir_tablas(directorio, num_trayectorias=trayectorias), repeticiones)}
+        tablas = TablasMontecarlo(directorio)
+
+        def consultar():
+            return [tablas.bandas(10, r, K, t, trayectorias, sigma_r, sigma_K) for r, K, t in casos]
+
+        def simular():
+            return [simular_montecarlo(10, r, K, t, trayectorias, sigma_r, sigma_K, procesos=1) for r, K, t in casos]
+
+        resultados[f"volumen.tablas.consulta{sufijo}"] = medir(consultar, repeticiones)
+        resultados[f"volumen.tablas.simulacion{sufijo}"] = medir(simular, repeticiones)
+        # La tabla y la simulación usan el generador de forma distinta: coinciden dentro del error Monte Carlo,
+        # que con 1,000 trayectorias llega a unos pocos puntos porcentuales de K en los percentiles extremos
+        error = max(np.abs(getattr(interpolada, p) - getattr(simulada, p)).max() / K
+                    for interpolada, simulada, (_, K, _) in zip(consultar(), simular(), casos) for p in ("p5", "p50", "p95"))
+        if error > 0.1:
+            raise RuntimeError(f"Las bandas de la tabla se alejan {error:.2%} de K de la simulación en línea")
+    return resultados
+
+
+def volumen_almacen(repeticiones):
+    """Llena un almacén SQLite con 72,000 escenarios por lotes y mide la reutilización, los top-K y las diferencias."""
+    from simulacion.almacen import AlmacenEscenarios
+    from simulacion.escenarios import expandir_malla, normalizar_escenario
+
+    puntos, tam_lote = 20, 5000
+    malla = {"tasa_base_adopcion": np.linspace(0.01, 0.1, puntos).tolist(), "duracion_simulacion": [12, 24, 60],
+             "poblacion_total_urc": [1000, 25000, 50000], "cultural.factor": np.linspace(0.5, 2.0, puntos).tolist(),
+             "ambiental.fraccion_capacidad": np.linspace(0.1, 1.0, puntos).tolist()}
+    escenarios = [normalizar_escenario(e, indice=i) for i, e in enumerate(expandir_malla(malla))]
+    sufijo = f"[escenarios={len(escenarios)}]"
+    with tempfile.TemporaryDirectory(prefix="almacen_") as temporal:
+        ruta = Path(temporal) / "escenarios.sqlite"
+
+        def guardar_malla():
+            almacen = AlmacenEscenarios(ruta)
+            for desde in range(0, len(escenarios), tam_lote):
+                almacen.guardar(escenarios[desde:desde + tam_lote])
+
+        def sin_almacen():
+            for archivo in Path(temporal).glob("escenarios.sqlite*"):
+                archivo.unlink()
+
+        resultados = {f"volumen.almacen.guardar{sufijo}": medir(guardar_malla, repeticiones, preparar=sin_almacen)}
+        almacen = AlmacenEscenarios(ruta)
+        mejores = almacen.top(10)
+        resultados.update({
+            f"volumen.almacen.reutilizar_1000{sufijo}": medir(lambda: almacen.obtener_o_evaluar(escenarios[:1000]),
+                                                              repeticiones),
+            f"volumen.almacen.top10{sufijo}": medir(lambda: almacen.top(10), repeticiones),
+            f"volumen.almacen.top10_segmento{sufijo}": medir(
+                lambda: almacen.top(10, segmento="cultural", duracion_simulacion=24), repeticiones),
+            f"volumen.almacen.diferencias{sufijo}": medir(
+                lambda: almacen.diferencias(mejores[0]["id"], mejores[-1]["id"]), repeticiones),
+        })
+    return resultados
+
+
+def volumen_presupuesto(repeticiones):
+    """Reparto de 5 millones de monedas entre los segmentos (3 pasadas de 48³ asignaciones) a 36 meses."""
+    from simulacion.escenarios import PARAMETROS_GLOBALES, SEGMENTOS
+    from simulacion.presupuesto import optimizar_presupuesto
+
+    factores = [SEGMENTOS[c]["factor"] for c in SEGMENTOS]
+    fracciones = [SEGMENTOS[c]["fraccion_capacidad"] for c in SEGMENTOS]
+    return {"volumen.presupuesto.optimizar[presupuesto=5000000,duracion=36]": medir(
+        lambda: optimizar_presupuesto(5_000_000, PARAMETROS_GLOBALES["tasa_base_adopcion"], 36,
+                                      PARAMETROS_GLOBALES["poblacion_total_urc"], factores, fracciones), repeticiones)}
+
+
+def volumen_monetario(repeticiones):
+    """Economía de monedas día a día durante 60 meses con los valores por defecto; comprueba la conservación."""
+    from simulacion.escenarios import PARAMETROS_GLOBALES, SEGMENTOS
+    from simulacion.monetario import simular_monetario
+
+    factores = [SEGMENTOS[c]["factor"] for c in SEGMENTOS]
+    fracciones = [SEGMENTOS[c]["fraccion_capacidad"] for c in SEGMENTOS]
+    recompensas = [SEGMENTOS[c]["recompensa"] for c in SEGMENTOS]
+    meses = 60
+
+    def simular():
+        return simular_monetario(PARAMETROS_GLOBALES["tasa_base_adopcion"], meses,
+                                 PARAMETROS_GLOBALES["poblacion_total_urc"], factores, fracciones, recompensas)
+
+    resultados = {f"volumen.monetario.simular[meses={meses}]": medir(simular, repeticiones)}
+    resultado = simular()
+    retirado = resultado.circulante[-1] + resultado.canje.sum() + resultado.decaimiento.sum()
+    if not np.isclose(resultado.emision.sum(), retirado):
+        raise RuntimeError("Las monedas emitidas no coinciden con las circulantes, canjeadas y decaídas")
+    return resultados
+
+
+def volumen_red(repeticiones):
+    """Construye la red de 50,000 estudiantes (~2.5 millones de aristas) y difunde 60 meses con 3 segmentos."""
+    from simulacion.logistico import N0_DEFECTO
+    from simulacion.red import generar_red, simular_difusion
+
+    nodos, grado_medio, meses = 50_000, 100, 60
+    red = generar_red(nodos, grado_medio=grado_medio)
+    sufijo = f"[nodos={nodos},grado_medio={grado_medio}]"
+    return {
+        f"volumen.red.construccion{sufijo}": medir(lambda: generar_red(nodos, grado_medio=grado_medio), repeticiones),
+        f"volumen.red.difusion{sufijo[:-1]},meses={meses}]": medir(
+            lambda: simular_difusion(red, N0_DEFECTO, 0.05 * np.array([1.0, 1.5, 2.0]), np.array([0.2, 0.15, 0.3]),
+                                     meses), repeticiones),
+    }
+
+
+def bench_volumen(repeticiones):
+    """Corridas de dimensionamiento de los módulos que procesan grandes volúmenes en disco o en memoria."""
+    resultados = {}
+    for dimensionar in (volumen_libro_mayor, volumen_factores, volumen_ingesta, volumen_calibracion, volumen_almacen,
+                        volumen_presupuesto, volumen_monetario, volumen_red, volumen_tablas):
+        resultados.update(dimensionar(repeticiones))
+    return resultados
+
+
+# --- Comparación con la línea base ---
+def comparar(resultados, baseline, tolerancia, margen_ms):
+    """Devuelve la lista de regresiones: mediana > base × (1 + tolerancia) + margen absoluto."""
+    regresiones = []
+    for nombre, medida in resultados.items():
+        base = baseline.get(nombre)
+        if base is None:
+            continue
+        limite = base["mediana_ms"] * (1 + tolerancia) + margen_ms
+        if medida["mediana_ms"] > limite:
+            regresiones.append((nombre, base["mediana_ms"], medida["mediana_ms"], limite))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Suite de rendimiento de la aplicación NURC.")
+    parser.add_argument("--grupos", nargs="*", default=["nucleos", "paginas", "arranque"],
+                        choices=["nucleos", "paginas", "arranque", "volumen"])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--guardar-baseline", action="store_true", help="Reescribe la línea base con esta corrida")
+    parser.add_argument("--tolerancia", type=float, default=0.5, help="Holgura relativa antes de fallar (0.5 = +50%%)")
+    parser.add_argument("--margen-ms", type=float, default=2.0, help="Holgura absoluta para mediciones muy cortas")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda los resultados de esta corrida en un archivo")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(RAIZ))
+    grupos = {"nucleos": bench_nucleos, "paginas": bench_paginas, "arranque": bench_arranque, "volumen": bench_volumen}
+    resultados = {}
+    for grupo in args.grupos:
+        print(f"Ejecutando {grupo}...", file=sys.stderr)
+        resultados.update(grupos[grupo](args.repeticiones))
+
+    ancho = max(len(n) for n in resultados)
+    for nombre, medida in resultados.items():
+        print(f"{nombre:<{ancho}}  {medida['mediana_ms']:10.3f} ms  (mín. {medida['min_ms']:.3f} ms)")
+
+    if args.json:
+        args.json.write_text(json.dumps(resultados, indent=2, ensure_ascii=False))
+    if args.guardar_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(resultados)
+        baseline["_entorno"] = {"python": platform.python_version(), "plataforma": platform.platform(),
+                                "procesador": platform.processor() or platform.machine()}
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + "\n")
+        print(f"Línea base guardada en {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No existe {args.baseline}; ejecuta con --guardar-baseline para crearla.", file=sys.stderr)
+        return 0
+    regresiones = comparar(resultados, json.loads(args.baseline.read_text()), args.tolerancia, args.margen_ms)
+    for nombre, base, actual, limite in regresiones:
+        print(f"REGRESIÓN {nombre}: {actual:.3f} ms (base {base:.3f} ms, límite {limite:.3f} ms)", file=sys.stderr)
+    if regresiones:
+        print(f"{len(regresiones)} regresiones de rendimiento.", file=sys.stderr)
+        return 1
+    print("Sin regresiones respecto a la línea base.", file=sys.stderr)
+    return 0
@@ -1,20 +1,17 @@
 # pages/1_Cultural.py
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-from scipy.integrate import odeint
-
-# --- Función para simular el crecimiento logístico (Ecuaciones Diferenciales) ---
-def modelo_logistico(N, t, r, K):
-    """
-    N: Población actual
-    t: Tiempo
-    r: Tasa de crecimiento intrínseca
-    K: Capacidad de carga (población máxima)
-    """
-    dndt = r * N * (1 - N / K)
-    return dndt
+from simulacion.cache import memoizar
+from simulacion.componentes import (agentes_segmento, controles_agentes, controles_montecarlo, controles_red,
+                                    difusion_segmento, montecarlo_memoizado, panel_perfilado, valores_por_defecto)
+from simulacion.graficos import figura_con_bandas, figura_con_serie, optimizar_figura
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO, malla_temporal, puntos_resolucion, simular_logistico
+from simulacion.metricas import evaluar_metricas, tabla_metricas
+from simulacion.perfilado import iniciar_ejecucion, perfilar, seccion
+
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Cultura")
 
 # --- Contenido de la Página Cultural ---
 st.header("🎭 Incentivos para el Desarrollo Cultural")
@@ -28,38 +25,134 @@ como asistencia a eventos, talleres o creación artística dentro de la URC.
 tasa_base_adopcion = st.session_state.get('tasa_base_adopcion', 0.05)
 duracion_simulacion = st.session_state.get('duracion_simulacion', 24)
 poblacion_total_urc = st.session_state.get('poblacion_total_urc', 25000)
+resolucion_curvas = st.session_state.get('resolucion_curvas', "estandar")
+# Valores iniciales de los widgets: calibrados con los registros de participación, si los hay
+valores_cultural = valores_por_defecto("cultural", tasa_base_adopcion, poblacion_total_urc)
 
 
 st.subheader("Parámetros Culturales")
 factor_interes_cultural = st.slider(
-    "Factor de interés cultural (afecta adopción)", 0.5, 2.0, 1.0, 0.1,
+    "Factor de interés cultural (afecta adopción)", 0.5, 2.0, valores_cultural["factor"], 0.1,
     key="cultural_factor_interes" # Clave única para este slider
 )
 recompensa_evento_cultural = st.number_input(
     "Monedas por asistencia a evento", 1, 100, 10,
     key="cultural_recompensa_evento"
 )
-capacidad_carga_cultural = st.number_input(
-    "Máx. participantes culturales (%)", 0.1, 1.0, 0.2, 0.05,
+fraccion_capacidad_cultural = st.number_input(
+    "Máx. participantes culturales (%)", 0.1, 1.0, valores_cultural["fraccion_capacidad"], 0.05,
     key="cultural_capacidad_carga"
-) * poblacion_total_urc # Se multiplica por la población total de la URC
+)
+if valores_cultural["calibracion"]:
+    calibracion_cultural = valores_cultural["calibracion"]
+    st.caption(f"Valores iniciales calibrados con {calibracion_cultural['meses']} meses de registros desde "
+               f"{calibracion_cultural['primer_mes']}: r = {calibracion_cultural['r']:.3f}, K = {calibracion_cultural['K']:,.0f}, "
+               f"N0 = {calibracion_cultural['N0']:,.0f}.")
+
+# --- Cálculo memoizado del segmento ---
+# La trayectoria, la tabla de impacto y las figuras se guardan en una caché acotada (LRU/TTL)
+# indexada por los parámetros normalizados, así que repetir una configuración ya vista es un acierto.
+@memoizar()
+def simular_segmento_cultural(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                              factor_interes_cultural, fraccion_capacidad_cultural, recompensa_evento_cultural,
+                              resolucion_curvas="estandar", N0=N0_DEFECTO):
+    # pandas y plotly solo se importan si hay que construir las tablas y figuras (fallo de caché)
+    px = importar("plotly.express")
+    with seccion("Solución logística"):
+        t = malla_temporal(duracion_simulacion) # Malla temporal compartida que abarca toda la duración
+        r_cultural = tasa_base_adopcion * factor_interes_cultural # Tasa de crecimiento intrínseca ajustada
+        capacidad_carga_cultural = fraccion_capacidad_cultural * poblacion_total_urc # Se multiplica por la población total de la URC
+
+        # Solución cerrada del modelo logístico (sin integrador numérico)
+        participantes_culturales = simular_logistico(N0, r_cultural, capacidad_carga_cultural, t)
+        # La curva de adopción puede dibujarse sobre una malla más fina (semanal o diaria);
+        # las tablas de impacto se mantienen sobre la malla estándar
+        t_curva = malla_temporal(duracion_simulacion, puntos_resolucion(duracion_simulacion, resolucion_curvas))
+        participantes_curva = simular_logistico(N0, r_cultural, capacidad_carga_cultural, t_curva)
+
+    with seccion("Tabla de impacto (DataFrame)"):
+        # Métricas de impacto del registro declarativo (simulacion.metricas), evaluadas en una sola pasada
+        valores_impacto, metricas_impacto = evaluar_metricas(participantes_culturales[None, :], ("cultural",))
+        df_cultural_impacto = tabla_metricas(t, valores_impacto, metricas_impacto)
+
+    with seccion("Figuras (Plotly)"):
+        fig_cultural = px.line(x=t_curva, y=participantes_curva,
+                               labels={'x':'Meses de Simulación', 'y':'Número de Participantes Culturales'}, # Etiqueta mejorada
+                               title='Crecimiento de Participantes en Actividades Culturales',
+                               line_shape="spline") # Añade un poco de suavizado a la línea
+        fig_cultural.update_traces(mode='lines+markers')
+
+        fig_impacto_cultural = px.area(df_cultural_impacto, x="Mes de Simulación", y=[m.etiqueta for m in metricas_impacto],
+                                       title="Impacto Cultural Acumulado",
+                                       labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
+        # Reducción LTTB, WebGL y float32 para que las mallas finas no saturen el navegador
+        optimizar_figura(fig_cultural)
+        optimizar_figura(fig_impacto_cultural)
+    return t, participantes_culturales, fig_cultural, df_cultural_impacto, fig_impacto_cultural
+
+with seccion("Simulación del segmento"):
+    t, participantes_culturales, fig_cultural, df_cultural_impacto, fig_impacto_cultural = simular_segmento_cultural(
+        tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+        factor_interes_cultural, fraccion_capacidad_cultural, recompensa_evento_cultural, resolucion_curvas,
+        valores_cultural["N0"]
+    )
 
 # --- Simulación de Adopción Cultural (Ecuaciones Diferenciales) ---
 st.subheader("Simulación de Adopción de Incentivos Culturales")
 st.write("La simulación muestra el crecimiento de la participación cultural incentivada a lo largo del tiempo.")
-t = np.linspace(0, duracion_simulacion, 100) # 't' tiene 100 puntos y abarca toda la duración
-N0 = 10 # Población inicial de participantes
-r_cultural = tasa_base_adopcion * factor_interes_cultural # Tasa de crecimiento intrínseca ajustada
 
-sol_cultural = odeint(modelo_logistico, N0, t, args=(r_cultural, capacidad_carga_cultural))
-participantes_culturales = sol_cultural[:, 0]
+# Los controles estocástico, de agentes y de red solo afectan a esta gráfica: la sección es un fragmento con
+# entradas explícitas, así que al cambiarlos solo se vuelve a ejecutar esta parte de la página.
+@st.fragment
+@perfilar("Gráfica de adopción")
+def mostrar_adopcion_cultural(fig_cultural, t, N0, tasa_base_adopcion, factor_interes_cultural,
+                              fraccion_capacidad_cultural, recompensa_evento_cultural, poblacion_total_urc, duracion_simulacion):
+    fig_adopcion_cultural = fig_cultural
+
+    # Modo estocástico opcional: bandas P5–P95 alrededor de la curva determinista
+    parametros_mc = controles_montecarlo("cultural")
+    if parametros_mc:
+        bandas_cultural = montecarlo_memoizado(N0, tasa_base_adopcion * factor_interes_cultural,
+                                               fraccion_capacidad_cultural * poblacion_total_urc, t, **parametros_mc)
+        fig_adopcion_cultural = figura_con_bandas(fig_adopcion_cultural, bandas_cultural, ["Cultural"])
+
+    # Alternativa basada en agentes: un estudiante por agente con su propia billetera
+    agentes_activo = controles_agentes("cultural")
+    if agentes_activo:
+        resultado_agentes_cultural = agentes_segmento("Cultural", poblacion_total_urc, tasa_base_adopcion * factor_interes_cultural,
+                                                      fraccion_capacidad_cultural, recompensa_evento_cultural, duracion_simulacion, N0)
+        fig_adopcion_cultural = figura_con_serie(fig_adopcion_cultural, resultado_agentes_cultural.meses,
+                                                 resultado_agentes_cultural.participantes[0], "Simulación por agentes")
 
-fig_cultural = px.line(x=t, y=participantes_culturales,
-                       labels={'x':'Meses de Simulación', 'y':'Número de Participantes Culturales'}, # Etiqueta mejorada
-                       title='Crecimiento de Participantes en Actividades Culturales',
-                       line_shape="spline") # Añade un poco de suavizado a la línea
-fig_cultural.update_traces(mode='lines+markers')
-st.plotly_chart(fig_cultural)
+    # Difusión entre compañeros: la adopción se propaga por los contactos de la red social de estudiantes
+    parametros_red = controles_red("cultural")
+    if parametros_red:
+        resultado_red_cultural = difusion_segmento(poblacion_total_urc, tasa_base_adopcion * factor_interes_cultural,
+                                                   fraccion_capacidad_cultural, duracion_simulacion, N0, **parametros_red)
+        fig_adopcion_cultural = figura_con_serie(fig_adopcion_cultural, resultado_red_cultural.meses,
+                                                 resultado_red_cultural.participantes[0], "Difusión en red",
+                                                 color="#00CC96", dash="dash")
+
+    st.plotly_chart(fig_adopcion_cultural)
+    if parametros_mc:
+        st.caption(f"Rango P5–P95 de participantes al final de la simulación: "
+                   f"{int(bandas_cultural.p5[-1]):,} – {int(bandas_cultural.p95[-1]):,} "
+                   f"({bandas_cultural.num_trayectorias:,} trayectorias).")
+    if agentes_activo:
+        saldos_cultural = resultado_agentes_cultural.estado.saldo
+        saldos_participantes_cultural = saldos_cultural[saldos_cultural > 0]
+        st.caption(f"Simulación por agentes: **{int(resultado_agentes_cultural.participantes[0, -1]):,}** participantes finales, "
+                   f"**{resultado_agentes_cultural.monedas_emitidas.sum():,.0f}** monedas emitidas; saldo mediano por "
+                   f"estudiante con saldo: **{np.median(saldos_participantes_cultural) if saldos_participantes_cultural.size else 0:,.1f}**.")
+    if parametros_red:
+        logistico_final_cultural = simular_logistico(N0, tasa_base_adopcion * factor_interes_cultural,
+                                                     fraccion_capacidad_cultural * poblacion_total_urc, [duracion_simulacion])[-1]
+        st.caption(f"Difusión en red ({resultado_red_cultural.num_nodos:,} estudiantes, {resultado_red_cultural.num_aristas:,} contactos): "
+                   f"**{int(resultado_red_cultural.participantes[0, -1]):,}** participantes finales frente a "
+                   f"**{int(logistico_final_cultural):,}** del modelo logístico (población bien mezclada).")
+
+mostrar_adopcion_cultural(fig_cultural, t, valores_cultural["N0"], tasa_base_adopcion, factor_interes_cultural,
+                          fraccion_capacidad_cultural, recompensa_evento_cultural, poblacion_total_urc, duracion_simulacion)
 
 st.markdown(f"""
 **Análisis:**
@@ -71,22 +164,13 @@ asistido, lo que busca fomentar la interacción y el aprecio cultural.
 # --- Visualización de Impacto Cultural (ejemplo de datos) ---
 st.subheader("Impacto Social Cultural Proyectado")
 st.write("Se muestra un ejemplo del impacto acumulado de la participación cultural en la URC.")
-# Datos hipotéticos para el impacto cultural. 't' es usado directamente para el eje de tiempo.
-eventos_por_mes = (participantes_culturales / 10).astype(int) # Asumiendo 10 estudiantes por evento en promedio
-obras_creadas = (participantes_culturales / 50).astype(int) # Asumiendo una obra por cada 50 participantes
-
-df_cultural_impacto = pd.DataFrame({
-    "Mes de Simulación": t, # Corregido: Usar 't' directamente para el eje de tiempo
-    "Eventos Asistidos (acum.)": np.cumsum(eventos_por_mes),
-    "Obras/Contenido Creado (acum.)": np.cumsum(obras_creadas)
-})
-fig_impacto_cultural = px.area(df_cultural_impacto, x="Mes de Simulación", y=["Eventos Asistidos (acum.)", "Obras/Contenido Creado (acum.)"],
-                               title="Impacto Cultural Acumulado",
-                               labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
-st.plotly_chart(fig_impacto_cultural)
+with seccion("Gráfica de impacto"):
+    st.plotly_chart(fig_impacto_cultural)
 
 st.markdown("""
 **Métricas Clave:** La simulación proyecta un aumento significativo en la asistencia a eventos y la generación
 de contenido cultural original, demostrando cómo la moneda puede enriquecer el ambiente artístico y creativo de la universidad.
 """)
-df_cultural_impacto
\ No newline at end of file
+df_cultural_impacto
+
+panel_perfilado()
@@ -1,20 +1,17 @@
 # pages/2_Medio_Ambiente.py
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-from scipy.integrate import odeint
-
-# --- Función para simular el crecimiento logístico (Ecuaciones Diferenciales) ---
-def modelo_logistico(N, t, r, K):
-    """
-    N: Población actual
-    t: Tiempo
-    r: Tasa de crecimiento intrínseca
-    K: Capacidad de carga (población máxima)
-    """
-    dndt = r * N * (1 - N / K)
-    return dndt
+from simulacion.cache import memoizar
+from simulacion.componentes import (agentes_segmento, controles_agentes, controles_montecarlo, controles_red,
+                                    difusion_segmento, montecarlo_memoizado, panel_perfilado, valores_por_defecto)
+from simulacion.graficos import figura_con_bandas, figura_con_serie, optimizar_figura
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO, malla_temporal, puntos_resolucion, simular_logistico
+from simulacion.metricas import evaluar_metricas, tabla_metricas
+from simulacion.perfilado import iniciar_ejecucion, perfilar, seccion
+
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Sostenibilidad")
 
 # --- Contenido de la Página Medio Ambiente ---
 st.header("🌳 Incentivos para el Cuidado del Medio Ambiente")
@@ -28,37 +25,132 @@ dentro y fuera del campus de la URC.
 tasa_base_adopcion = st.session_state.get('tasa_base_adopcion', 0.05)
 duracion_simulacion = st.session_state.get('duracion_simulacion', 24)
 poblacion_total_urc = st.session_state.get('poblacion_total_urc', 25000)
+resolucion_curvas = st.session_state.get('resolucion_curvas', "estandar")
+# Valores iniciales de los widgets: calibrados con los registros de participación, si los hay
+valores_ambiental = valores_por_defecto("ambiental", tasa_base_adopcion, poblacion_total_urc)
 
 st.subheader("Parámetros Medio Ambientales")
 factor_conciencia_ambiental = st.slider(
-    "Factor de conciencia ambiental (afecta adopción)", 0.5, 2.0, 1.0, 0.1,
+    "Factor de conciencia ambiental (afecta adopción)", 0.5, 2.0, valores_ambiental["factor"], 0.1,
     key="ambiental_factor_conciencia"
 )
 recompensa_reciclaje_kg = st.number_input(
     "Monedas por kg reciclado", 0.1, 5.0, 1.0, 0.1,
     key="ambiental_recompensa_reciclaje"
 )
-capacidad_carga_ambiental = st.number_input(
-    "Máx. participantes ambientales (%)", 0.1, 1.0, 0.15, 0.05,
+fraccion_capacidad_ambiental = st.number_input(
+    "Máx. participantes ambientales (%)", 0.1, 1.0, valores_ambiental["fraccion_capacidad"], 0.05,
     key="ambiental_capacidad_carga"
-) * poblacion_total_urc
+)
+if valores_ambiental["calibracion"]:
+    calibracion_ambiental = valores_ambiental["calibracion"]
+    st.caption(f"Valores iniciales calibrados con {calibracion_ambiental['meses']} meses de registros desde "
+               f"{calibracion_ambiental['primer_mes']}: r = {calibracion_ambiental['r']:.3f}, K = {calibracion_ambiental['K']:,.0f}, "
+               f"N0 = {calibracion_ambiental['N0']:,.0f}.")
+
+# --- Cálculo memoizado del segmento ---
+# Trayectoria, tabla de impacto y figuras en caché LRU/TTL indexada por los parámetros normalizados.
+@memoizar()
+def simular_segmento_ambiental(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                               factor_conciencia_ambiental, fraccion_capacidad_ambiental, recompensa_reciclaje_kg,
+                               resolucion_curvas="estandar", N0=N0_DEFECTO):
+    # pandas y plotly solo se importan si hay que construir las tablas y figuras (fallo de caché)
+    px = importar("plotly.express")
+    with seccion("Solución logística"):
+        t = malla_temporal(duracion_simulacion) # Malla temporal compartida que abarca toda la duración
+        r_ambiental = tasa_base_adopcion * factor_conciencia_ambiental
+        capacidad_carga_ambiental = fraccion_capacidad_ambiental * poblacion_total_urc
+
+        # Solución cerrada del modelo logístico (sin integrador numérico)
+        participantes_ambientales = simular_logistico(N0, r_ambiental, capacidad_carga_ambiental, t)
+        # La curva de adopción puede dibujarse sobre una malla más fina (semanal o diaria);
+        # las tablas de impacto se mantienen sobre la malla estándar
+        t_curva = malla_temporal(duracion_simulacion, puntos_resolucion(duracion_simulacion, resolucion_curvas))
+        participantes_curva = simular_logistico(N0, r_ambiental, capacidad_carga_ambiental, t_curva)
+
+    with seccion("Tabla de impacto (DataFrame)"):
+        # Métricas de impacto del registro declarativo (simulacion.metricas), evaluadas en una sola pasada
+        valores_impacto, metricas_impacto = evaluar_metricas(participantes_ambientales[None, :], ("ambiental",))
+        df_ambiental_impacto = tabla_metricas(t, valores_impacto, metricas_impacto)
+
+    with seccion("Figuras (Plotly)"):
+        fig_ambiental = px.line(x=t_curva, y=participantes_curva,
+                                    labels={'x':'Meses de Simulación', 'y':'Número de Participantes Ambientales'}, # Etiqueta mejorada
+                                    title='Crecimiento de Participantes en Iniciativas Ambientales',
+                                    line_shape="spline")
+        fig_ambiental.update_traces(mode='lines+markers')
+
+        fig_impacto_ambiental = px.area(df_ambiental_impacto, x="Mes de Simulación", y=[m.etiqueta for m in metricas_impacto],
+                                            title="Impacto Medio Ambiental Acumulado",
+                                            labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
+        # Reducción LTTB, WebGL y float32 para que las mallas finas no saturen el navegador
+        optimizar_figura(fig_ambiental)
+        optimizar_figura(fig_impacto_ambiental)
+    return t, participantes_ambientales, fig_ambiental, df_ambiental_impacto, fig_impacto_ambiental
+
+with seccion("Simulación del segmento"):
+    t, participantes_ambientales, fig_ambiental, df_ambiental_impacto, fig_impacto_ambiental = simular_segmento_ambiental(
+        tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+        factor_conciencia_ambiental, fraccion_capacidad_ambiental, recompensa_reciclaje_kg, resolucion_curvas,
+        valores_ambiental["N0"]
+    )
 
 # --- Simulación de Adopción Ambiental (Ecuaciones Diferenciales) ---
 st.subheader("Simulación de Adopción de Incentivos Ambientales")
 st.write("La simulación muestra el crecimiento de la participación en iniciativas medioambientales a lo largo del tiempo.")
-t = np.linspace(0, duracion_simulacion, 100) # 't' tiene 100 puntos y abarca toda la duración
-N0 = 10 # Población inicial de participantes
-r_ambiental = tasa_base_adopcion * factor_conciencia_ambiental
 
-sol_ambiental = odeint(modelo_logistico, N0, t, args=(r_ambiental, capacidad_carga_ambiental))
-participantes_ambientales = sol_ambiental[:, 0]
+# Los controles estocástico, de agentes y de red solo afectan a esta gráfica: la sección es un fragmento con
+# entradas explícitas, así que al cambiarlos solo se vuelve a ejecutar esta parte de la página.
+@st.fragment
+@perfilar("Gráfica de adopción")
+def mostrar_adopcion_ambiental(fig_ambiental, t, N0, tasa_base_adopcion, factor_conciencia_ambiental,
+                               fraccion_capacidad_ambiental, recompensa_reciclaje_kg, poblacion_total_urc, duracion_simulacion):
+    fig_adopcion_ambiental = fig_ambiental
+
+    # Modo estocástico opcional: bandas P5–P95 alrededor de la curva determinista
+    parametros_mc = controles_montecarlo("ambiental")
+    if parametros_mc:
+        bandas_ambiental = montecarlo_memoizado(N0, tasa_base_adopcion * factor_conciencia_ambiental,
+                                                fraccion_capacidad_ambiental * poblacion_total_urc, t, **parametros_mc)
+        fig_adopcion_ambiental = figura_con_bandas(fig_adopcion_ambiental, bandas_ambiental, ["Medio Ambiente"])
+
+    # Alternativa basada en agentes: un estudiante por agente con su propia billetera
+    agentes_activo = controles_agentes("ambiental")
+    if agentes_activo:
+        resultado_agentes_ambiental = agentes_segmento("Medio Ambiente", poblacion_total_urc, tasa_base_adopcion * factor_conciencia_ambiental,
+                                                       fraccion_capacidad_ambiental, recompensa_reciclaje_kg, duracion_simulacion, N0)
+        fig_adopcion_ambiental = figura_con_serie(fig_adopcion_ambiental, resultado_agentes_ambiental.meses,
+                                                  resultado_agentes_ambiental.participantes[0], "Simulación por agentes")
 
-fig_ambiental = px.line(x=t, y=participantes_ambientales,
-                            labels={'x':'Meses de Simulación', 'y':'Número de Participantes Ambientales'}, # Etiqueta mejorada
-                            title='Crecimiento de Participantes en Iniciativas Ambientales',
-                            line_shape="spline")
-fig_ambiental.update_traces(mode='lines+markers')
-st.plotly_chart(fig_ambiental)
+    # Difusión entre compañeros: la adopción se propaga por los contactos de la red social de estudiantes
+    parametros_red = controles_red("ambiental")
+    if parametros_red:
+        resultado_red_ambiental = difusion_segmento(poblacion_total_urc, tasa_base_adopcion * factor_conciencia_ambiental,
+                                                    fraccion_capacidad_ambiental, duracion_simulacion, N0, **parametros_red)
+        fig_adopcion_ambiental = figura_con_serie(fig_adopcion_ambiental, resultado_red_ambiental.meses,
+                                                  resultado_red_ambiental.participantes[0], "Difusión en red",
+                                                  color="#00CC96", dash="dash")
+
+    st.plotly_chart(fig_adopcion_ambiental)
+    if parametros_mc:
+        st.caption(f"Rango P5–P95 de participantes al final de la simulación: "
+                   f"{int(bandas_ambiental.p5[-1]):,} – {int(bandas_ambiental.p95[-1]):,} "
+                   f"({bandas_ambiental.num_trayectorias:,} trayectorias).")
+    if agentes_activo:
+        saldos_ambiental = resultado_agentes_ambiental.estado.saldo
+        saldos_participantes_ambiental = saldos_ambiental[saldos_ambiental > 0]
+        st.caption(f"Simulación por agentes: **{int(resultado_agentes_ambiental.participantes[0, -1]):,}** participantes finales, "
+                   f"**{resultado_agentes_ambiental.monedas_emitidas.sum():,.0f}** monedas emitidas; saldo mediano por "
+                   f"estudiante con saldo: **{np.median(saldos_participantes_ambiental) if saldos_participantes_ambiental.size else 0:,.1f}**.")
+    if parametros_red:
+        logistico_final_ambiental = simular_logistico(N0, tasa_base_adopcion * factor_conciencia_ambiental,
+                                                      fraccion_capacidad_ambiental * poblacion_total_urc, [duracion_simulacion])[-1]
+        st.caption(f"Difusión en red ({resultado_red_ambiental.num_nodos:,} estudiantes, {resultado_red_ambiental.num_aristas:,} contactos): "
+                   f"**{int(resultado_red_ambiental.participantes[0, -1]):,}** participantes finales frente a "
+                   f"**{int(logistico_final_ambiental):,}** del modelo logístico (población bien mezclada).")
+
+mostrar_adopcion_ambiental(fig_ambiental, t, valores_ambiental["N0"], tasa_base_adopcion, factor_conciencia_ambiental,
+                           fraccion_capacidad_ambiental, recompensa_reciclaje_kg, poblacion_total_urc, duracion_simulacion)
 
 st.markdown(f"""
 **Análisis:**
@@ -70,21 +162,12 @@ promoviendo activamente un campus más verde y sostenible.
 # --- Visualización de Impacto Ambiental (ejemplo de datos) ---
 st.subheader("Impacto Medio Ambiental Proyectado")
 st.write("Se muestra un ejemplo del impacto acumulado de las acciones medioambientales en la URC.")
-# Datos hipotéticos para el impacto ambiental. 't' es usado directamente para el eje de tiempo.
-kg_reciclados_por_mes = (participantes_ambientales * 0.5).astype(int) # Asumiendo 0.5 kg por participante/mes
-arboles_plantados_equivalente = (participantes_ambientales / 20).astype(int) # Asumiendo 1 árbol por cada 20 participantes
-
-df_ambiental_impacto = pd.DataFrame({
-    "Mes de Simulación": t, # Corregido: Usar 't' directamente para el eje de tiempo
-    "Kg Reciclados (acum.)": np.cumsum(kg_reciclados_por_mes),
-    "Árboles Plantados (equiv. acum.)": np.cumsum(arboles_plantados_equivalente)
-})
-fig_impacto_ambiental = px.area(df_ambiental_impacto, x="Mes de Simulación", y=["Kg Reciclados (acum.)", "Árboles Plantados (equiv. acum.)"],
-                                    title="Impacto Medio Ambiental Acumulado",
-                                    labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
-st.plotly_chart(fig_impacto_ambiental)
+with seccion("Gráfica de impacto"):
+    st.plotly_chart(fig_impacto_ambiental)
 
 st.markdown("""
 **Métricas Clave:** La simulación proyecta una mejora tangible en la gestión de residuos y una contribución
 significativa a la reforestación o reducción de la huella de carbono, fomentando una cultura de sostenibilidad en la comunidad universitaria.
 """)
+
+panel_perfilado()
@@ -1,20 +1,17 @@
 # pages/3_Desempeno_Escolar.py
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-from scipy.integrate import odeint
-
-# --- Función para simular el crecimiento logístico (Ecuaciones Diferenciales) ---
-def modelo_logistico(N, t, r, K):
-    """
-    N: Población actual
-    t: Tiempo
-    r: Tasa de crecimiento intrínseca
-    K: Capacidad de carga (población máxima)
-    """
-    dndt = r * N * (1 - N / K)
-    return dndt
+from simulacion.cache import memoizar
+from simulacion.componentes import (agentes_segmento, controles_agentes, controles_montecarlo, controles_red,
+                                    difusion_segmento, montecarlo_memoizado, panel_perfilado, valores_por_defecto)
+from simulacion.graficos import figura_con_bandas, figura_con_serie, optimizar_figura
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO, malla_temporal, puntos_resolucion, simular_logistico
+from simulacion.metricas import evaluar_metricas, tabla_metricas
+from simulacion.perfilado import iniciar_ejecucion, perfilar, seccion
+
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Dedicación Escolar")
 
 # --- Contenido de la Página Desempeño Escolar ---
 st.header("📚 Incentivos para el Desempeño Escolar")
@@ -28,38 +25,132 @@ dentro de la URC.
 tasa_base_adopcion = st.session_state.get('tasa_base_adopcion', 0.05)
 duracion_simulacion = st.session_state.get('duracion_simulacion', 24)
 poblacion_total_urc = st.session_state.get('poblacion_total_urc', 25000)
+resolucion_curvas = st.session_state.get('resolucion_curvas', "estandar")
+# Valores iniciales de los widgets: calibrados con los registros de participación, si los hay
+valores_academico = valores_por_defecto("academico", tasa_base_adopcion, poblacion_total_urc)
 
 st.subheader("Parámetros de Desempeño Escolar")
 factor_motivacion_academica = st.slider(
-    "Factor de motivación académica (afecta adopción)", 0.5, 2.0, 1.0, 0.1,
+    "Factor de motivación académica (afecta adopción)", 0.5, 2.0, valores_academico["factor"], 0.1,
     key="academico_factor_motivacion"
 )
 recompensa_calif_excelente = st.number_input(
     "Monedas por calificación > 90/100", 20, 200, 50,
     key="academico_recompensa_calif"
 )
-capacidad_carga_academica = st.number_input(
-    "Máx. estudiantes con mejora académica (%)", 0.1, 1.0, 0.3, 0.05,
+fraccion_capacidad_academica = st.number_input(
+    "Máx. estudiantes con mejora académica (%)", 0.1, 1.0, valores_academico["fraccion_capacidad"], 0.05,
     key="academico_capacidad_carga"
-) * poblacion_total_urc
+)
+if valores_academico["calibracion"]:
+    calibracion_academico = valores_academico["calibracion"]
+    st.caption(f"Valores iniciales calibrados con {calibracion_academico['meses']} meses de registros desde "
+               f"{calibracion_academico['primer_mes']}: r = {calibracion_academico['r']:.3f}, K = {calibracion_academico['K']:,.0f}, "
+               f"N0 = {calibracion_academico['N0']:,.0f}.")
+
+# --- Cálculo memoizado del segmento ---
+# Trayectoria, tabla de impacto y figuras en caché LRU/TTL indexada por los parámetros normalizados.
+@memoizar()
+def simular_segmento_academico(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                               factor_motivacion_academica, fraccion_capacidad_academica, recompensa_calif_excelente,
+                               resolucion_curvas="estandar", N0=N0_DEFECTO):
+    # pandas y plotly solo se importan si hay que construir las tablas y figuras (fallo de caché)
+    px = importar("plotly.express")
+    with seccion("Solución logística"):
+        t = malla_temporal(duracion_simulacion) # Malla temporal compartida que abarca toda la duración
+        r_academica = tasa_base_adopcion * factor_motivacion_academica
+        capacidad_carga_academica = fraccion_capacidad_academica * poblacion_total_urc
+
+        # Solución cerrada del modelo logístico (sin integrador numérico)
+        participantes_academicos = simular_logistico(N0, r_academica, capacidad_carga_academica, t)
+        # La curva de adopción puede dibujarse sobre una malla más fina (semanal o diaria);
+        # las tablas de impacto se mantienen sobre la malla estándar
+        t_curva = malla_temporal(duracion_simulacion, puntos_resolucion(duracion_simulacion, resolucion_curvas))
+        participantes_curva = simular_logistico(N0, r_academica, capacidad_carga_academica, t_curva)
+
+    with seccion("Tabla de impacto (DataFrame)"):
+        # Métricas de impacto del registro declarativo (simulacion.metricas), evaluadas en una sola pasada
+        valores_impacto, metricas_impacto = evaluar_metricas(participantes_academicos[None, :], ("academico",))
+        df_academico_impacto = tabla_metricas(t, valores_impacto, metricas_impacto)
+
+    with seccion("Figuras (Plotly)"):
+        fig_academica = px.line(x=t_curva, y=participantes_curva,
+                                    labels={'x':'Meses de Simulación', 'y':'Número de Estudiantes con Desempeño Mejorado'}, # Etiqueta mejorada
+                                    title='Crecimiento de Estudiantes con Desempeño Académico Mejorado',
+                                    line_shape="spline")
+        fig_academica.update_traces(mode='lines+markers')
 
+        fig_impacto_academico = px.area(df_academico_impacto, x="Mes de Simulación", y=[m.etiqueta for m in metricas_impacto],
+                                            title="Impacto en el Desempeño Escolar Acumulado",
+                                            labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
+        # Reducción LTTB, WebGL y float32 para que las mallas finas no saturen el navegador
+        optimizar_figura(fig_academica)
+        optimizar_figura(fig_impacto_academico)
+    return t, participantes_academicos, fig_academica, df_academico_impacto, fig_impacto_academico
+
+with seccion("Simulación del segmento"):
+    t, participantes_academicos, fig_academica, df_academico_impacto, fig_impacto_academico = simular_segmento_academico(
+        tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+        factor_motivacion_academica, fraccion_capacidad_academica, recompensa_calif_excelente, resolucion_curvas,
+        valores_academico["N0"]
+    )
 
 # --- Simulación de Adopción Académica (Ecuaciones Diferenciales) ---
 st.subheader("Simulación de Mejora en Desempeño Escolar")
 st.write("La simulación muestra el crecimiento de estudiantes con desempeño escolar mejorado o excelente a lo largo del tiempo.")
-t = np.linspace(0, duracion_simulacion, 100) # 't' tiene 100 puntos y abarca toda la duración
-N0 = 10 # Población inicial
-r_academica = tasa_base_adopcion * factor_motivacion_academica
 
-sol_academica = odeint(modelo_logistico, N0, t, args=(r_academica, capacidad_carga_academica))
-participantes_academicos = sol_academica[:, 0]
+# Los controles estocástico, de agentes y de red solo afectan a esta gráfica: la sección es un fragmento con
+# entradas explícitas, así que al cambiarlos solo se vuelve a ejecutar esta parte de la página.
+@st.fragment
+@perfilar("Gráfica de adopción")
+def mostrar_adopcion_academico(fig_academica, t, N0, tasa_base_adopcion, factor_motivacion_academica,
+                               fraccion_capacidad_academica, recompensa_calif_excelente, poblacion_total_urc, duracion_simulacion):
+    fig_adopcion_academico = fig_academica
+
+    # Modo estocástico opcional: bandas P5–P95 alrededor de la curva determinista
+    parametros_mc = controles_montecarlo("academico")
+    if parametros_mc:
+        bandas_academico = montecarlo_memoizado(N0, tasa_base_adopcion * factor_motivacion_academica,
+                                                fraccion_capacidad_academica * poblacion_total_urc, t, **parametros_mc)
+        fig_adopcion_academico = figura_con_bandas(fig_adopcion_academico, bandas_academico, ["Desempeño Escolar"])
+
+    # Alternativa basada en agentes: un estudiante por agente con su propia billetera
+    agentes_activo = controles_agentes("academico")
+    if agentes_activo:
+        resultado_agentes_academico = agentes_segmento("Desempeño Escolar", poblacion_total_urc, tasa_base_adopcion * factor_motivacion_academica,
+                                                       fraccion_capacidad_academica, recompensa_calif_excelente, duracion_simulacion, N0)
+        fig_adopcion_academico = figura_con_serie(fig_adopcion_academico, resultado_agentes_academico.meses,
+                                                  resultado_agentes_academico.participantes[0], "Simulación por agentes")
 
-fig_academica = px.line(x=t, y=participantes_academicos,
-                            labels={'x':'Meses de Simulación', 'y':'Número de Estudiantes con Desempeño Mejorado'}, # Etiqueta mejorada
-                            title='Crecimiento de Estudiantes con Desempeño Académico Mejorado',
-                            line_shape="spline")
-fig_academica.update_traces(mode='lines+markers')
-st.plotly_chart(fig_academica)
+    # Difusión entre compañeros: la adopción se propaga por los contactos de la red social de estudiantes
+    parametros_red = controles_red("academico")
+    if parametros_red:
+        resultado_red_academico = difusion_segmento(poblacion_total_urc, tasa_base_adopcion * factor_motivacion_academica,
+                                                    fraccion_capacidad_academica, duracion_simulacion, N0, **parametros_red)
+        fig_adopcion_academico = figura_con_serie(fig_adopcion_academico, resultado_red_academico.meses,
+                                                  resultado_red_academico.participantes[0], "Difusión en red",
+                                                  color="#00CC96", dash="dash")
+
+    st.plotly_chart(fig_adopcion_academico)
+    if parametros_mc:
+        st.caption(f"Rango P5–P95 de participantes al final de la simulación: "
+                   f"{int(bandas_academico.p5[-1]):,} – {int(bandas_academico.p95[-1]):,} "
+                   f"({bandas_academico.num_trayectorias:,} trayectorias).")
+    if agentes_activo:
+        saldos_academico = resultado_agentes_academico.estado.saldo
+        saldos_participantes_academico = saldos_academico[saldos_academico > 0]
+        st.caption(f"Simulación por agentes: **{int(resultado_agentes_academico.participantes[0, -1]):,}** participantes finales, "
+                   f"**{resultado_agentes_academico.monedas_emitidas.sum():,.0f}** monedas emitidas; saldo mediano por "
+                   f"estudiante con saldo: **{np.median(saldos_participantes_academico) if saldos_participantes_academico.size else 0:,.1f}**.")
+    if parametros_red:
+        logistico_final_academico = simular_logistico(N0, tasa_base_adopcion * factor_motivacion_academica,
+                                                      fraccion_capacidad_academica * poblacion_total_urc, [duracion_simulacion])[-1]
+        st.caption(f"Difusión en red ({resultado_red_academico.num_nodos:,} estudiantes, {resultado_red_academico.num_aristas:,} contactos): "
+                   f"**{int(resultado_red_academico.participantes[0, -1]):,}** participantes finales frente a "
+                   f"**{int(logistico_final_academico):,}** del modelo logístico (población bien mezclada).")
+
+mostrar_adopcion_academico(fig_academica, t, valores_academico["N0"], tasa_base_adopcion, factor_motivacion_academica,
+                           fraccion_capacidad_academica, recompensa_calif_excelente, poblacion_total_urc, duracion_simulacion)
 
 st.markdown(f"""
 **Análisis:**
@@ -71,22 +162,13 @@ aproximadamente **{int(participantes_academicos[-1]):,}** estudiantes. Se otorga
 # --- Visualización de Impacto Académico (ejemplo de datos) ---
 st.subheader("Impacto en el Desempeño Escolar Proyectado")
 st.write("Se muestra un ejemplo del impacto acumulado en el desempeño escolar en la URC.")
-# Datos hipotéticos para el impacto académico. 't' es usado directamente para el eje de tiempo.
-proyectos_investigacion_por_mes = (participantes_academicos / 10).astype(int) # 1 proyecto por cada 10 estudiantes
-tutorias_impartidas = (participantes_academicos / 5).astype(int) # 1 tutoria por cada 5 estudiantes
-
-df_academico_impacto = pd.DataFrame({
-    "Mes de Simulación": t, # Corregido: Usar 't' directamente para el eje de tiempo
-    "Proyectos Investigación (acum.)": np.cumsum(proyectos_investigacion_por_mes),
-    "Tutorías Impartidas (acum.)": np.cumsum(tutorias_impartidas)
-})
-fig_impacto_academico = px.area(df_academico_impacto, x="Mes de Simulación", y=["Proyectos Investigación (acum.)", "Tutorías Impartidas (acum.)"],
-                                    title="Impacto en el Desempeño Escolar Acumulado",
-                                    labels={"value": "Cantidad Acumulada", "variable": "Métrica de Impacto"})
-st.plotly_chart(fig_impacto_academico)
+with seccion("Gráfica de impacto"):
+    st.plotly_chart(fig_impacto_academico)
 
 st.markdown("""
 **Métricas Clave:** La simulación proyecta un aumento en la calidad académica, evidenciado por
 la generación de proyectos de investigación y el apoyo entre compañeros a través de tutorías,
 fortaleciendo el ambiente de aprendizaje colaborativo.
 """)
+
+panel_perfilado()
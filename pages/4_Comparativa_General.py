@@ -1,22 +1,24 @@
 # pages/4_Comparativa_General.py
+import os
+import tempfile
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-from sklearn.decomposition import PCA # Para demostrar un PCA simplificado
-from sklearn.linear_model import LinearRegression # Para una regresión simple
-from scipy.integrate import odeint
-
-# --- Función para simular el crecimiento logístico (Ecuaciones Diferenciales) ---
-def modelo_logistico(N, t, r, K):
-    """
-    N: Población actual
-    t: Tiempo
-    r: Tasa de crecimiento intrínseca
-    K: Capacidad de carga (población máxima)
-    """
-    dndt = r * N * (1 - N / K)
-    return dndt
+from simulacion.acoplado import simular_acoplado
+from simulacion.agentes import ACCIONES_POR_MES
+from simulacion.barrido import barrido_parametros, cache_barridos
+from simulacion.cache import memoizar
+from simulacion.componentes import controles_montecarlo, montecarlo_memoizado, panel_perfilado, valores_por_defecto
+from simulacion.escenarios import SEGMENTOS
+from simulacion.factores import FACTORES, OBJETIVO, analisis_factores_incremental, iterar_bloques
+from simulacion.graficos import figura_con_bandas, optimizar_figura
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO, malla_temporal, puntos_resolucion, simular_logistico
+from simulacion.metricas import evaluar_metricas
+from simulacion.perfilado import iniciar_ejecucion, perfilar, seccion
+
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Comparativa General")
 
 # --- Contenido de la Página Comparativa General ---
 st.header("📊 Comparativa General de los Segmentos")
@@ -30,6 +32,7 @@ Aquí también se exploran análisis de factores y consideraciones generales de
 tasa_base_adopcion = st.session_state.get('tasa_base_adopcion', 0.05)
 duracion_simulacion = st.session_state.get('duracion_simulacion', 24)
 poblacion_total_urc = st.session_state.get('poblacion_total_urc', 25000)
+resolucion_curvas = st.session_state.get('resolucion_curvas', "estandar")
 
 st.subheader("Adopción de Incentivos por Segmento")
 st.write("Visualiza cómo la participación en cada área se proyecta a crecer a lo largo del tiempo.")
@@ -38,47 +41,129 @@ st.write("Visualiza cómo la participación en cada área se proyecta a crecer a
 # si el usuario no ha ajustado los sliders en las páginas individuales.
 # Esto es una simplificación; en una app más robusta, se podrían guardar los últimos valores en session_state
 # para que la comparativa refleje los ajustes hechos en cada página.
-factor_interes_cultural_comp = st.session_state.get('cultural_factor_interes', 1.0)
-capacidad_carga_cultural_comp = st.session_state.get('cultural_capacidad_carga', 0.2) * poblacion_total_urc
-
-factor_conciencia_ambiental_comp = st.session_state.get('ambiental_factor_conciencia', 1.0)
-capacidad_carga_ambiental_comp = st.session_state.get('ambiental_capacidad_carga', 0.15) * poblacion_total_urc
-
-factor_motivacion_academica_comp = st.session_state.get('academico_factor_motivacion', 1.0)
-capacidad_carga_academica_comp = st.session_state.get('academico_capacidad_carga', 0.3) * poblacion_total_urc
-
-
-t = np.linspace(0, duracion_simulacion, 100)
-N0 = 10 # Población inicial para todos los segmentos
-
-# Simulación para Cultural
-r_cultural_comp = tasa_base_adopcion * factor_interes_cultural_comp
-sol_cultural_comp = odeint(modelo_logistico, N0, t, args=(r_cultural_comp, capacidad_carga_cultural_comp))
-participantes_culturales_comp = sol_cultural_comp[:, 0]
-
-# Simulación para Medio Ambiente
-r_ambiental_comp = tasa_base_adopcion * factor_conciencia_ambiental_comp
-sol_ambiental_comp = odeint(modelo_logistico, N0, t, args=(r_ambiental_comp, capacidad_carga_ambiental_comp))
-participantes_ambientales_comp = sol_ambiental_comp[:, 0]
-
-# Simulación para Desempeño Escolar
-r_academica_comp = tasa_base_adopcion * factor_motivacion_academica_comp
-sol_academica_comp = odeint(modelo_logistico, N0, t, args=(r_academica_comp, capacidad_carga_academica_comp))
-participantes_academicos_comp = sol_academica_comp[:, 0]
-
-df_comparativa_adopcion = pd.DataFrame({
-    "Mes": t,
-    "Cultural": participantes_culturales_comp,
-    "Medio Ambiente": participantes_ambientales_comp,
-    "Desempeño Escolar": participantes_academicos_comp
-})
-
-fig_comparativa_adopcion = px.line(df_comparativa_adopcion, x="Mes", y=["Cultural", "Medio Ambiente", "Desempeño Escolar"],
-                                   labels={'value':'Número de Participantes', 'variable':'Segmento'},
-                                   title='Crecimiento de Participantes por Segmento',
-                                   line_shape="spline")
-fig_comparativa_adopcion.update_traces(mode='lines')
-st.plotly_chart(fig_comparativa_adopcion)
+# Los valores por defecto son los calibrados con los registros de participación, si los hay.
+valores_comp = {clave: valores_por_defecto(clave, tasa_base_adopcion, poblacion_total_urc)
+                for clave in ("cultural", "ambiental", "academico")}
+N0_comp = tuple(valores["N0"] for valores in valores_comp.values()) # Población inicial de cada segmento
+
+factor_interes_cultural_comp = st.session_state.get('cultural_factor_interes', valores_comp["cultural"]["factor"])
+fraccion_capacidad_cultural_comp = st.session_state.get('cultural_capacidad_carga', valores_comp["cultural"]["fraccion_capacidad"])
+
+factor_conciencia_ambiental_comp = st.session_state.get('ambiental_factor_conciencia', valores_comp["ambiental"]["factor"])
+fraccion_capacidad_ambiental_comp = st.session_state.get('ambiental_capacidad_carga', valores_comp["ambiental"]["fraccion_capacidad"])
+
+factor_motivacion_academica_comp = st.session_state.get('academico_factor_motivacion', valores_comp["academico"]["factor"])
+fraccion_capacidad_academica_comp = st.session_state.get('academico_capacidad_carga', valores_comp["academico"]["fraccion_capacidad"])
+
+factores_comp = (factor_interes_cultural_comp, factor_conciencia_ambiental_comp, factor_motivacion_academica_comp)
+fracciones_comp = (fraccion_capacidad_cultural_comp, fraccion_capacidad_ambiental_comp, fraccion_capacidad_academica_comp)
+recompensas_comp = (st.session_state.get('cultural_recompensa_evento', 10),
+                    st.session_state.get('ambiental_recompensa_reciclaje', 1.0),
+                    st.session_state.get('academico_recompensa_calif', 50))
+
+# --- Cálculo memoizado de la comparativa ---
+# Trayectorias, puntajes y figuras en caché LRU/TTL indexada por los parámetros normalizados.
+@memoizar()
+def simular_comparativa(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores, fracciones_capacidad,
+                        resolucion_curvas="estandar", N0=N0_DEFECTO):
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    with seccion("Solución logística"):
+        t = malla_temporal(duracion_simulacion)
+        N0 = np.asarray(N0) # Población inicial (común o una por segmento)
+
+        # Los tres segmentos se resuelven en una sola evaluación vectorizada (una fila por segmento)
+        r_comp = tasa_base_adopcion * np.asarray(factores)
+        capacidades_comp = np.asarray(fracciones_capacidad) * poblacion_total_urc
+        participantes_culturales_comp, participantes_ambientales_comp, participantes_academicos_comp = simular_logistico(
+            N0, r_comp, capacidades_comp, t
+        )
+
+        # Las figuras pueden usar una malla más fina (semanal o diaria); la tabla y los puntajes usan la estándar
+        t_curva = malla_temporal(duracion_simulacion, puntos_resolucion(duracion_simulacion, resolucion_curvas))
+        participantes_curva = simular_logistico(N0, r_comp, capacidades_comp, t_curva)
+
+    with seccion("Tablas y puntajes (DataFrame)"):
+        df_comparativa_adopcion = pd.DataFrame({
+            "Mes": t,
+            "Cultural": participantes_culturales_comp,
+            "Medio Ambiente": participantes_ambientales_comp,
+            "Desempeño Escolar": participantes_academicos_comp
+        })
+        df_curvas = pd.DataFrame({"Mes": t_curva, **dict(zip(["Cultural", "Medio Ambiente", "Desempeño Escolar"], participantes_curva))})
+
+        # Calcular puntajes simplificados (se podrían usar métricas más complejas)
+        # El puntaje se basa en el porcentaje de la población total de URC que participa en cada segmento.
+        # Un factor de 1000 se usa para escalar a un número más legible para el scorecard.
+        score_cultural = int((participantes_culturales_comp[-1] / poblacion_total_urc) * 1000)
+        score_ambiental = int((participantes_ambientales_comp[-1] / poblacion_total_urc) * 1000)
+        score_academico = int((participantes_academicos_comp[-1] / poblacion_total_urc) * 1000)
+
+        # El puntaje total es la suma de los puntajes individuales
+        score_total = score_cultural + score_ambiental + score_academico
+
+        # Calcula un score total por cada punto de la malla de las figuras ('t_curva')
+        scores_cultural_t, scores_ambiental_t, scores_academico_t = (participantes_curva / poblacion_total_urc) * 1000
+        score_total_evol = scores_cultural_t + scores_ambiental_t + scores_academico_t
+
+        df_scorecard_evol = pd.DataFrame({
+            "Mes": t_curva,
+            "Score Total": score_total_evol
+        })
+
+        # Impacto final de todas las métricas del registro (simulacion.metricas), los tres segmentos en una pasada
+        valores_impacto, metricas_impacto = evaluar_metricas(
+            np.stack([participantes_culturales_comp, participantes_ambientales_comp, participantes_academicos_comp]),
+            list(SEGMENTOS)
+        )
+        df_impacto_comp = pd.DataFrame({
+            "Segmento": [SEGMENTOS[m.segmento]["nombre"] for m in metricas_impacto],
+            "Métrica": [m.etiqueta for m in metricas_impacto],
+            "Valor al final": valores_impacto[:, -1],
+        })
+
+    with seccion("Figuras (Plotly)"):
+        fig_comparativa_adopcion = px.line(df_curvas, x="Mes", y=["Cultural", "Medio Ambiente", "Desempeño Escolar"],
+                                           labels={'value':'Número de Participantes', 'variable':'Segmento'},
+                                           title='Crecimiento de Participantes por Segmento',
+                                           line_shape="spline")
+        fig_comparativa_adopcion.update_traces(mode='lines')
+        fig_scorecard_evol = px.line(df_scorecard_evol, x="Mes", y="Score Total",
+                                     title='Evolución del Scorecard Total de Incentivos',
+                                     labels={'Score Total':'Puntaje Acumulado'},
+                                     line_shape="spline")
+        # Reducción LTTB, WebGL y float32 para que las mallas finas no saturen el navegador
+        optimizar_figura(fig_comparativa_adopcion)
+        optimizar_figura(fig_scorecard_evol)
+    scores = (score_cultural, score_ambiental, score_academico, score_total)
+    return df_comparativa_adopcion, fig_comparativa_adopcion, scores, fig_scorecard_evol, df_impacto_comp
+
+with seccion("Simulación de la comparativa"):
+    df_comparativa_adopcion, fig_comparativa_adopcion, scores, fig_scorecard_evol, df_impacto_comp = simular_comparativa(
+        tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+        factores_comp, fracciones_comp, resolucion_curvas, N0_comp,
+    )
+score_cultural, score_ambiental, score_academico, score_total = scores
+
+# Cada sección con controles propios es un fragmento con entradas explícitas (los parámetros de los que
+# depende): al mover uno de sus widgets solo se vuelve a ejecutar esa sección, no la página completa.
+@st.fragment
+@perfilar("Gráfica de adopción")
+def mostrar_adopcion_comparativa(fig_comparativa_adopcion, meses, N0_comp, tasa_base_adopcion, factores_comp,
+                                 fracciones_comp, poblacion_total_urc):
+    # Modo estocástico opcional: bandas P5–P95 de los tres segmentos en una sola corrida vectorizada
+    parametros_mc = controles_montecarlo("comparativa")
+    if parametros_mc:
+        bandas_comp = montecarlo_memoizado(
+            np.array(N0_comp), tasa_base_adopcion * np.array(factores_comp),
+            np.array(fracciones_comp) * poblacion_total_urc, meses, **parametros_mc
+        )
+        st.plotly_chart(figura_con_bandas(fig_comparativa_adopcion, bandas_comp, ["Cultural", "Medio Ambiente", "Desempeño Escolar"]))
+    else:
+        st.plotly_chart(fig_comparativa_adopcion)
+
+mostrar_adopcion_comparativa(fig_comparativa_adopcion, df_comparativa_adopcion["Mes"].to_numpy(), N0_comp,
+                             tasa_base_adopcion, factores_comp, fracciones_comp, poblacion_total_urc)
 
 # --- Scorecard General de Incentivos ---
 st.subheader("🏆 Scorecard General de Incentivos URC")
@@ -89,16 +174,6 @@ ofreciendo una vista unificada del desempeño y la adopción. Los puntajes son p
 
 col1, col2, col3, col4 = st.columns(4)
 
-# Calcular puntajes simplificados (se podrían usar métricas más complejas)
-# El puntaje se basa en el porcentaje de la población total de URC que participa en cada segmento.
-# Un factor de 1000 se usa para escalar a un número más legible para el scorecard.
-score_cultural = int((participantes_culturales_comp[-1] / poblacion_total_urc) * 1000)
-score_ambiental = int((participantes_ambientales_comp[-1] / poblacion_total_urc) * 1000)
-score_academico = int((participantes_academicos_comp[-1] / poblacion_total_urc) * 1000)
-
-# El puntaje total es la suma de los puntajes individuales
-score_total = score_cultural + score_ambiental + score_academico
-
 with col1:
     st.metric(label="Cultural", value=f"{score_cultural} Pts")
 with col2:
@@ -114,94 +189,366 @@ st.markdown("""
 
 # Gráfico de la evolución del Scorecard Total (ejemplo)
 st.subheader("Evolución Proyectada del Scorecard Total")
-# Calcula un score total por cada punto en el tiempo 't'
-scores_cultural_t = (participantes_culturales_comp / poblacion_total_urc) * 1000
-scores_ambiental_t = (participantes_ambientales_comp / poblacion_total_urc) * 1000
-scores_academico_t = (participantes_academicos_comp / poblacion_total_urc) * 1000
-score_total_evol = scores_cultural_t + scores_ambiental_t + scores_academico_t
-
-df_scorecard_evol = pd.DataFrame({
-    "Mes": t,
-    "Score Total": score_total_evol
-})
-fig_scorecard_evol = px.line(df_scorecard_evol, x="Mes", y="Score Total",
-                             title='Evolución del Scorecard Total de Incentivos',
-                             labels={'Score Total':'Puntaje Acumulado'},
-                             line_shape="spline")
-st.plotly_chart(fig_scorecard_evol)
+with seccion("Gráfica del scorecard"):
+    st.plotly_chart(fig_scorecard_evol)
+
+# Métricas de impacto de los tres segmentos al final de la simulación (mismos supuestos que las páginas)
+st.subheader("Impacto Acumulado por Segmento")
+st.dataframe(df_impacto_comp, hide_index=True)
+
+
+# --- Modelo Acoplado entre Segmentos ---
+st.subheader("🔗 Modelo Acoplado entre Segmentos")
+st.write("Los tres segmentos compiten por la misma población de estudiantes. En el modelo acoplado se resuelven como un "
+         "solo sistema: cada coeficiente de interacción indica cuánto frena (positivo) o impulsa (negativo) "
+         "la participación de un segmento (columna) al de otro (fila).")
+
+SEGMENTOS_NOMBRES = ["Cultural", "Medio Ambiente", "Desempeño Escolar"]
+COEFICIENTE_MIN, COEFICIENTE_MAX = -2.0, 2.0 # Rango de los coeficientes de interacción editables
+
+@memoizar()
+@perfilar("Solución del modelo acoplado")
+def simular_comparativa_acoplada(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores,
+                                 fracciones_capacidad, matriz, restringir_poblacion, N0=N0_DEFECTO):
+    pd = importar("pandas")
+    t = malla_temporal(duracion_simulacion)
+    participantes_acoplados = simular_acoplado(
+        tasa_base_adopcion * np.asarray(factores), np.asarray(fracciones_capacidad) * poblacion_total_urc,
+        np.asarray(matriz), t, poblacion_total=poblacion_total_urc if restringir_poblacion else None, N0=N0,
+    )
+    return pd.DataFrame({"Mes": t, **dict(zip(SEGMENTOS_NOMBRES, participantes_acoplados))})
+
+@st.fragment
+@perfilar("Modelo acoplado")
+def mostrar_modelo_acoplado(df_comparativa_adopcion, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                            factores_comp, fracciones_comp, N0_comp):
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    if st.toggle("Activar modelo acoplado", key="comparativa_acoplado"):
+        df_interaccion = st.data_editor(
+            pd.DataFrame(np.eye(len(SEGMENTOS_NOMBRES)), index=SEGMENTOS_NOMBRES, columns=SEGMENTOS_NOMBRES),
+            key="comparativa_matriz_interaccion",
+            column_config={nombre: st.column_config.NumberColumn(min_value=COEFICIENTE_MIN, max_value=COEFICIENTE_MAX,
+                                                                 step=0.05)
+                           for nombre in SEGMENTOS_NOMBRES},
+        )
+        # Las celdas vacías cuentan como segmentos sin interacción (antes producían curvas NaN)
+        matriz_acoplada = df_interaccion.fillna(0).clip(COEFICIENTE_MIN, COEFICIENTE_MAX).to_numpy(dtype=float)
+        np.fill_diagonal(matriz_acoplada, 1.0) # La autointeracción define la capacidad de carga propia
+        restringir_poblacion = st.checkbox("Restringir a la población total compartida", value=True,
+                                           key="comparativa_restriccion_poblacion")
+
+        try:
+            df_acoplado = simular_comparativa_acoplada(
+                tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                factores_comp, fracciones_comp, matriz_acoplada, restringir_poblacion, N0_comp,
+            )
+        except RuntimeError as error:
+            # Con refuerzos fuertes (coeficientes negativos) y sin la restricción de población el sistema explota
+            st.error(f"{error}. Reduce los coeficientes negativos o activa la restricción de población.")
+            return
+        df_acoplado_largo = pd.concat([
+            df_acoplado.melt(id_vars="Mes", var_name="Segmento", value_name="Participantes").assign(Modelo="Acoplado"),
+            df_comparativa_adopcion.melt(id_vars="Mes", var_name="Segmento", value_name="Participantes").assign(Modelo="Independiente"),
+        ])
+        fig_acoplado = px.line(df_acoplado_largo, x="Mes", y="Participantes", color="Segmento", line_dash="Modelo",
+                               title="Participantes por Segmento: Modelo Acoplado vs. Independiente")
+        st.plotly_chart(optimizar_figura(fig_acoplado))
+
+mostrar_modelo_acoplado(df_comparativa_adopcion, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                        factores_comp, fracciones_comp, N0_comp)
+
+
+# --- Modo Barrido de Parámetros (Mapas de Sensibilidad) ---
+st.subheader("🔎 Barrido de Parámetros y Mapas de Sensibilidad")
+st.write("Evalúa de una sola vez toda la malla de tasa de adopción × factor del segmento × capacidad máxima × duración, "
+         "en lugar de mover los sliders una configuración a la vez.")
+
+ETIQUETAS_BARRIDO = {
+    "tasa_base_adopcion": "Tasa base de adopción",
+    "factor_segmento": "Factor del segmento",
+    "fraccion_capacidad": "Máx. participantes (%)",
+    "duracion_simulacion": "Duración (meses)",
+}
+SEGMENTOS_COMP = {
+    "Cultural": (factor_interes_cultural_comp, fraccion_capacidad_cultural_comp),
+    "Medio Ambiente": (factor_conciencia_ambiental_comp, fraccion_capacidad_ambiental_comp),
+    "Desempeño Escolar": (factor_motivacion_academica_comp, fraccion_capacidad_academica_comp),
+}
+
+@memoizar(cache_barridos)
+@perfilar("Evaluación del barrido")
+def ejecutar_barrido(poblacion_total_urc, segmento, puntos_por_eje, paso_duracion, segmentos_fijos):
+    return barrido_parametros(
+        tasas=np.linspace(0.01, 0.1, puntos_por_eje),
+        factores=np.linspace(0.5, 2.0, puntos_por_eje),
+        fracciones=np.linspace(0.1, 1.0, puntos_por_eje),
+        duraciones=np.arange(12, 61, paso_duracion),
+        poblacion_total_urc=poblacion_total_urc,
+        segmentos_fijos=segmentos_fijos,
+    )
+
+@st.fragment
+@perfilar("Barrido de parámetros")
+def mostrar_barrido(poblacion_total_urc, segmentos_comp):
+    px = importar("plotly.express")
+    if st.checkbox("Activar modo barrido", key="comparativa_modo_barrido"):
+        col_b1, col_b2, col_b3 = st.columns(3)
+        with col_b1:
+            segmento_barrido = st.selectbox("Segmento a barrer", list(segmentos_comp), key="barrido_segmento")
+        with col_b2:
+            puntos_por_eje = st.slider("Puntos por eje continuo", 5, 60, 20, 5, key="barrido_puntos")
+        with col_b3:
+            paso_duracion = st.selectbox("Paso de duración (meses)", [6, 3, 1], key="barrido_paso_duracion")
+        col_b4, col_b5 = st.columns(2)
+        with col_b4:
+            eje_x = st.selectbox("Eje X del mapa", list(ETIQUETAS_BARRIDO), index=0,
+                                 format_func=ETIQUETAS_BARRIDO.get, key="barrido_eje_x")
+        with col_b5:
+            eje_y = st.selectbox("Eje Y del mapa", [e for e in ETIQUETAS_BARRIDO if e != eje_x], index=0,
+                                 format_func=ETIQUETAS_BARRIDO.get, key="barrido_eje_y")
+
+        # Los demás segmentos conservan su configuración actual y suman su puntaje al total
+        segmentos_fijos = tuple(v for k, v in segmentos_comp.items() if k != segmento_barrido)
+        resultado_barrido = ejecutar_barrido(poblacion_total_urc, segmento_barrido, puntos_por_eje,
+                                             paso_duracion, segmentos_fijos)
+        ejes_barrido = resultado_barrido.ejes()
+
+        st.write(f"Escenarios evaluados: **{resultado_barrido.num_escenarios:,}**. "
+                 "Cada celda muestra el mejor valor alcanzable sobre los ejes no representados.")
+        col_m1, col_m2 = st.columns(2)
+        for col, metrica, titulo in ((col_m1, "participantes_finales", f"Participantes finales ({segmento_barrido})"),
+                                     (col_m2, "score_total", "Score Total del Scorecard")):
+            fig_mapa = px.imshow(resultado_barrido.mapa(metrica, eje_x, eje_y),
+                                 x=ejes_barrido[eje_x], y=ejes_barrido[eje_y],
+                                 labels={'x': ETIQUETAS_BARRIDO[eje_x], 'y': ETIQUETAS_BARRIDO[eje_y], 'color': titulo},
+                                 title=titulo, aspect="auto", origin="lower",
+                                 color_continuous_scale=px.colors.sequential.Viridis)
+            with col:
+                st.plotly_chart(fig_mapa)
+
+        mejor = resultado_barrido.mejor_escenario()
+        st.markdown(f"""
+**Mejor configuración encontrada para {segmento_barrido}:** tasa base **{mejor['tasa_base_adopcion']:.3f}**,
+factor **{mejor['factor_segmento']:.2f}**, capacidad máxima **{mejor['fraccion_capacidad']:.0%}** y
+duración de **{int(mejor['duracion_simulacion'])}** meses, con un Score Total de **{mejor['score_total']} Pts**.
+""")
+
+mostrar_barrido(poblacion_total_urc, SEGMENTOS_COMP)
+
+
+# --- Optimización del Presupuesto de Recompensas ---
+st.subheader("💰 Optimización del Presupuesto de Recompensas")
+st.write("Dado un presupuesto total de monedas para toda la simulación, busca las recompensas por segmento que "
+         "maximizan el Score Total. Se supone que el factor de cada segmento crece con la raíz de la recompensa "
+         "relativa a la de referencia (acotado al rango de los sliders), y que cada acción recompensada emite monedas.")
+
+@memoizar()
+@perfilar("Búsqueda de la asignación")
+def optimizar_recompensas(presupuesto, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores,
+                          fracciones_capacidad, N0=N0_DEFECTO):
+    presupuesto_mod = importar("simulacion.presupuesto")
+    return presupuesto_mod.optimizar_presupuesto(presupuesto, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                                                 factores, fracciones_capacidad, N0)
+
+@st.fragment
+@perfilar("Optimización del presupuesto")
+def mostrar_optimizacion_presupuesto(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores_comp,
+                                     fracciones_comp, recompensas_comp, N0_comp):
+    if not st.checkbox("Optimizar la asignación del presupuesto", key="comparativa_optimizar_presupuesto"):
+        return
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    presupuesto_mod = importar("simulacion.presupuesto")
+    # Costo y puntaje de las recompensas actuales, como punto de comparación
+    costos_actuales, scores_actuales, _ = presupuesto_mod.evaluar_recompensas(
+        np.array(recompensas_comp, dtype=float)[:, None], tasa_base_adopcion, duracion_simulacion,
+        poblacion_total_urc, factores_comp, fracciones_comp, N0_comp)
+    costo_actual, score_actual = float(costos_actuales.sum()), int(scores_actuales.sum())
+    presupuesto = st.number_input("Presupuesto total de monedas", 0, 100_000_000, 1_000_000, 50_000,
+                                  key="comparativa_presupuesto")
+    st.caption(f"Las recompensas actuales emitirían {costo_actual:,.0f} monedas para un Score Total de {score_actual} Pts.")
+
+    resultado = optimizar_recompensas(presupuesto, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                                      factores_comp, fracciones_comp, N0_comp)
+    if resultado is None:
+        st.warning("El presupuesto no alcanza para ninguna asignación.")
+        return
+    col_p1, col_p2, col_p3 = st.columns(3)
+    with col_p1:
+        st.metric(label="Score Total Óptimo", value=f"{resultado.score_total} Pts",
+                  delta=f"{resultado.score_total - score_actual:+d} vs. recompensas actuales")
+    with col_p2:
+        st.metric(label="Monedas Emitidas", value=f"{resultado.costo_total:,.0f}",
+                  delta=f"{resultado.costo_total / presupuesto:.0%} del presupuesto" if presupuesto else None,
+                  delta_color="off")
+    with col_p3:
+        st.metric(label="Asignaciones Evaluadas", value=f"{resultado.candidatos_evaluados:,}")
+    st.dataframe(pd.DataFrame({
+        "Segmento": SEGMENTOS_NOMBRES,
+        "Recompensa Actual": recompensas_comp,
+        "Recompensa Recomendada": resultado.recompensas.round(2),
+        "Factor Efectivo": resultado.factores.round(2),
+        "Monedas Emitidas": resultado.costos.round(0),
+        "Participantes Finales": resultado.participantes_finales.astype(int),
+        "Puntaje": resultado.scores,
+    }), hide_index=True)
+
+    # Frontera eficiente: el mayor puntaje alcanzable con cada nivel de gasto
+    fig_frontera = px.line(x=resultado.frontera_costo, y=resultado.frontera_score, line_shape="hv",
+                           labels={'x': 'Monedas emitidas', 'y': 'Score Total máximo'},
+                           title='Frontera Presupuesto–Score Total')
+    fig_frontera.add_vline(x=presupuesto, line_dash="dash", annotation_text="Presupuesto")
+    st.plotly_chart(optimizar_figura(fig_frontera))
+
+mostrar_optimizacion_presupuesto(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores_comp,
+                                 fracciones_comp, recompensas_comp, N0_comp)
 
 
 # --- Análisis de Factores (PCA o Regresión Simple como ejemplo) ---
 st.subheader("Análisis de Factores de Aceptación (Ejemplo con datos simulados)")
 st.write("Este es un ejemplo simplificado de cómo se podría usar Estadística Multivariada (PCA) e IA (Regresión) para entender los factores que influyen en la aceptación general de la moneda o en la participación en los segmentos.")
 
-# Generar datos simulados para un análisis de factores
-np.random.seed(42) # Para reproducibilidad
-num_observaciones = 100
-confianza_usuario = np.random.rand(num_observaciones) * 100 # 0-100%
-digitalizacion = np.random.rand(num_observaciones) * 100 # 0-100%
-regulaciones = np.random.rand(num_observaciones) * 10 # 1-10 (escala arbitraria)
-marketing = np.random.rand(num_observaciones) * 50 # 0-50 (impacto de campañas)
-aceptacion_moneda = (0.5 * confianza_usuario + 0.3 * digitalizacion - 2 * regulaciones +
-                     0.8 * marketing + np.random.randn(num_observaciones) * 10)
-aceptacion_moneda = np.clip(aceptacion_moneda, 0, 100) # Limitar a 0-100%
-
-df_factores = pd.DataFrame({
-    'Confianza Usuario': confianza_usuario,
-    'Digitalización': digitalizacion,
-    'Regulaciones (escala 1-10)': regulaciones,
-    'Marketing/Promoción': marketing,
-    'Aceptación Moneda (%)': aceptacion_moneda
-})
-
-# Mostrar tabla de datos simulados
-if st.checkbox("Mostrar datos simulados para análisis de factores"):
-    st.dataframe(df_factores.head())
-
-# PCA (Análisis de Componentes Principales)
-st.markdown("##### Análisis de Componentes Principales (PCA)")
-st.write("Identifica las variables más relevantes o las combinaciones de factores que explican la mayor varianza en la aceptación de la moneda.")
-features = ['Confianza Usuario', 'Digitalización', 'Regulaciones (escala 1-10)', 'Marketing/Promoción']
-X = df_factores[features]
-
-pca = PCA(n_components=2) # Reducir a 2 componentes para visualización 2D
-principal_components = pca.fit_transform(X)
-df_pca = pd.DataFrame(data=principal_components, columns=['Componente Principal 1', 'Componente Principal 2'])
-df_pca['Aceptación Moneda (%)'] = df_factores['Aceptación Moneda (%)'] # Añadir la variable de color
-
-fig_pca = px.scatter(df_pca, x='Componente Principal 1', y='Componente Principal 2',
-                     title='PCA de Factores de Aceptación',
-                     color='Aceptación Moneda (%)', # Colorear por el nivel de aceptación
-                     color_continuous_scale=px.colors.sequential.Viridis,
-                     hover_data=df_pca.columns # Mostrar detalles al pasar el ratón
-                     )
-st.plotly_chart(fig_pca)
-st.write(f"Varianza explicada por las 2 componentes principales: {pca.explained_variance_ratio_.sum():.2f}")
-st.write("La PCA ayuda a entender qué combinaciones de factores influyen más en la aceptación general de la moneda.")
-
-# Regresión Múltiple (Ejemplo de IA para predicción)
-st.markdown("##### Predicción de Aceptación (Regresión Lineal Simple)")
-st.write("Demuestra cómo se podría predecir la aceptación de la moneda basada en uno de los factores clave, como la confianza del usuario.")
-# Seleccionamos una variable predictora para un ejemplo simple de regresión
-x_reg = df_factores[['Confianza Usuario']]
-y_reg = df_factores['Aceptación Moneda (%)']
-model = LinearRegression()
-model.fit(x_reg, y_reg)
-y_pred = model.predict(x_reg)
-
-fig_reg = px.scatter(df_factores, x='Confianza Usuario', y='Aceptación Moneda (%)',
-                     title='Aceptación de la Moneda vs. Confianza del Usuario (Ejemplo Predictivo)',
-                     labels={'Confianza Usuario': 'Confianza del Usuario (%)', 'Aceptación Moneda (%)': 'Aceptación de la Moneda (%)'})
-# Añadir la línea de regresión
-fig_reg.add_trace(px.line(x=x_reg['Confianza Usuario'], y=y_pred, color_discrete_sequence=['red'],
-                          labels={'x':'Confianza Usuario', 'y':'Aceptacion Predicha'}).data[0])
-st.plotly_chart(fig_reg)
-st.write(f"Ecuación de regresión simplificada: Aceptación = {model.coef_[0]:.2f} * Confianza + {model.intercept_:.2f}")
-st.markdown("""
-Este modelo simple ilustra cómo la inteligencia artificial (en este caso, una regresión lineal)
-podría ser utilizada para predecir la aceptación o el comportamiento de la moneda basándose en factores clave,
-ayudando a tomar decisiones informadas.
-""")
+features = FACTORES
+
+# Análisis de una encuesta en disco: una sola pasada por bloques (PCA y regresión exactos sobre todas las filas).
+# La fecha de modificación y el tamaño forman parte de la clave: si el archivo cambia, se vuelve a analizar.
+@memoizar()
+@perfilar("Análisis de la encuesta por bloques")
+def analizar_encuesta(ruta, modificado, tamano):
+    return analisis_factores_incremental(iterar_bloques(ruta, [*FACTORES, OBJETIVO]))
+
+# Datos simulados y su ajuste: no dependen de ningún parámetro de la página, así que se generan y
+# ajustan una sola vez y quedan en caché (mostrar la tabla ya no regenera los datos ni reajusta los modelos).
+@memoizar()
+def simular_datos_factores(num_observaciones=100, semilla=42):
+    pd = importar("pandas")
+    # Generar datos simulados para un análisis de factores
+    np.random.seed(semilla) # Para reproducibilidad
+    confianza_usuario = np.random.rand(num_observaciones) * 100 # 0-100%
+    digitalizacion = np.random.rand(num_observaciones) * 100 # 0-100%
+    regulaciones = np.random.rand(num_observaciones) * 10 # 1-10 (escala arbitraria)
+    marketing = np.random.rand(num_observaciones) * 50 # 0-50 (impacto de campañas)
+    aceptacion_moneda = (0.5 * confianza_usuario + 0.3 * digitalizacion - 2 * regulaciones +
+                         0.8 * marketing + np.random.randn(num_observaciones) * 10)
+    aceptacion_moneda = np.clip(aceptacion_moneda, 0, 100) # Limitar a 0-100%
+
+    return pd.DataFrame({
+        'Confianza Usuario': confianza_usuario,
+        'Digitalización': digitalizacion,
+        'Regulaciones (escala 1-10)': regulaciones,
+        'Marketing/Promoción': marketing,
+        'Aceptación Moneda (%)': aceptacion_moneda
+    })
+
+@memoizar()
+@perfilar("Ajuste PCA y regresión (sklearn)")
+def ajustar_factores_simulados(num_observaciones=100, semilla=42):
+    df_factores = simular_datos_factores(num_observaciones, semilla)
+    # scikit-learn es la importación más costosa de la app: se difiere hasta que esta sección se dibuja
+    PCA = importar("sklearn.decomposition", "PCA") # Para demostrar un PCA simplificado
+    LinearRegression = importar("sklearn.linear_model", "LinearRegression") # Para una regresión simple
+
+    X = df_factores[features]
+    pca = PCA(n_components=2) # Reducir a 2 componentes para visualización 2D
+    principal_components = pca.fit_transform(X)
+    varianza_explicada = pca.explained_variance_ratio_.sum()
+
+    # Seleccionamos una variable predictora para un ejemplo simple de regresión
+    x_reg = df_factores[['Confianza Usuario']]
+    y_reg = df_factores['Aceptación Moneda (%)']
+    model = LinearRegression()
+    model.fit(x_reg, y_reg)
+    return principal_components, varianza_explicada, model.coef_[0], model.intercept_
+
+# La sección no depende de los parámetros de simulación: es un fragmento sin entradas, así que cambiar
+# el origen de los datos o mostrar la tabla solo vuelve a ejecutar esta sección.
+@st.fragment
+@perfilar("Análisis de factores")
+def mostrar_analisis_factores():
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    # Origen de los datos: la muestra simulada en memoria o una exportación de encuestas en disco (CSV/Parquet)
+    # que se recorre por bloques, de modo que su tamaño no está limitado por la memoria del servidor.
+    origen_factores = st.radio("Origen de los datos", ["Datos simulados", "Encuesta en disco (por bloques)"],
+                               horizontal=True, key="comparativa_origen_factores")
+
+    if origen_factores == "Datos simulados":
+        df_factores = simular_datos_factores()
+
+        # Mostrar tabla de datos simulados
+        if st.checkbox("Mostrar datos simulados para análisis de factores"):
+            st.dataframe(df_factores.head())
+
+        principal_components, varianza_explicada, coeficiente_reg, intercepto_reg = ajustar_factores_simulados()
+        x_reg = df_factores[['Confianza Usuario']]
+    else:
+        ruta_encuesta = st.text_input("Ruta del archivo de encuestas en el servidor (.csv o .parquet)",
+                                      key="comparativa_ruta_encuesta")
+
+        df_factores = None
+        if not ruta_encuesta:
+            st.info(f"Indica un archivo con las columnas: {', '.join([*FACTORES, OBJETIVO])}.")
+        elif not os.path.isfile(ruta_encuesta):
+            st.error(f"No se encontró el archivo `{ruta_encuesta}`.")
+        else:
+            estado_encuesta = os.stat(ruta_encuesta)
+            try:
+                with st.spinner("Analizando la encuesta por bloques..."):
+                    resultado_factores = analizar_encuesta(ruta_encuesta, estado_encuesta.st_mtime, estado_encuesta.st_size)
+            except (KeyError, ValueError) as error:
+                st.error(f"No se pudo analizar el archivo: {error}")
+            else:
+                # Las gráficas usan una muestra uniforme; la varianza y los coeficientes se calculan sobre todas las filas
+                df_factores = resultado_factores.muestra
+                st.caption(f"{resultado_factores.num_filas:,} filas analizadas; las gráficas muestran "
+                           f"{len(df_factores):,} filas elegidas al azar.")
+                if st.checkbox("Mostrar muestra de la encuesta"):
+                    st.dataframe(df_factores.head())
+
+                principal_components = resultado_factores.transformar(df_factores[features])
+                varianza_explicada = resultado_factores.varianza_explicada.sum()
+                x_reg = df_factores[['Confianza Usuario']]
+                coeficiente_reg, intercepto_reg = resultado_factores.coeficientes[0], resultado_factores.intercepto
+
+    if df_factores is not None:
+        # PCA (Análisis de Componentes Principales)
+        st.markdown("##### Análisis de Componentes Principales (PCA)")
+        st.write("Identifica las variables más relevantes o las combinaciones de factores que explican la mayor varianza en la aceptación de la moneda.")
+
+        df_pca = pd.DataFrame(data=principal_components, columns=['Componente Principal 1', 'Componente Principal 2'])
+        df_pca['Aceptación Moneda (%)'] = df_factores['Aceptación Moneda (%)'] # Añadir la variable de color
+
+        fig_pca = px.scatter(df_pca, x='Componente Principal 1', y='Componente Principal 2',
+                             title='PCA de Factores de Aceptación',
+                             color='Aceptación Moneda (%)', # Colorear por el nivel de aceptación
+                             color_continuous_scale=px.colors.sequential.Viridis,
+                             hover_data=df_pca.columns # Mostrar detalles al pasar el ratón
+                             )
+        st.plotly_chart(fig_pca)
+        st.write(f"Varianza explicada por las 2 componentes principales: {varianza_explicada:.2f}")
+        st.write("La PCA ayuda a entender qué combinaciones de factores influyen más en la aceptación general de la moneda.")
+
+        # Regresión Múltiple (Ejemplo de IA para predicción)
+        st.markdown("##### Predicción de Aceptación (Regresión Lineal Simple)")
+        st.write("Demuestra cómo se podría predecir la aceptación de la moneda basada en uno de los factores clave, como la confianza del usuario.")
+        y_pred = coeficiente_reg * x_reg['Confianza Usuario'].to_numpy() + intercepto_reg
+
+        fig_reg = px.scatter(df_factores, x='Confianza Usuario', y='Aceptación Moneda (%)',
+                             title='Aceptación de la Moneda vs. Confianza del Usuario (Ejemplo Predictivo)',
+                             labels={'Confianza Usuario': 'Confianza del Usuario (%)', 'Aceptación Moneda (%)': 'Aceptación de la Moneda (%)'})
+        # Añadir la línea de regresión
+        fig_reg.add_trace(px.line(x=x_reg['Confianza Usuario'], y=y_pred, color_discrete_sequence=['red'],
+                                  labels={'x':'Confianza Usuario', 'y':'Aceptacion Predicha'}).data[0])
+        st.plotly_chart(fig_reg)
+        st.write(f"Ecuación de regresión simplificada: Aceptación = {coeficiente_reg:.2f} * Confianza + {intercepto_reg:.2f}")
+        st.markdown("""
+        Este modelo simple ilustra cómo la inteligencia artificial (en este caso, una regresión lineal)
+        podría ser utilizada para predecir la aceptación o el comportamiento de la moneda basándose en factores clave,
+        ayudando a tomar decisiones informadas.
+        """)
+
+mostrar_analisis_factores()
 
 # --- Consideraciones de Base de Datos y Seguridad (Texto Descriptivo) ---
 st.subheader("Consideraciones de Base de Datos y Seguridad")
@@ -212,6 +559,124 @@ Para el manejo de los datos de la moneda digital de incentivos en un entorno rea
 * **Seguridad:** Se implementarían algoritmos criptográficos robustos (como hashing SHA-256 para la integridad de datos, y firmas digitales para autenticación de transacciones) para proteger la integridad de las transacciones y la privacidad de los datos de los estudiantes. El uso de autenticación multifactor (MFA) para el acceso a las billeteras y auditorías regulares de seguridad serían esenciales.
 """)
 
+# --- Libro Mayor Simulado (Transacciones de la Moneda) ---
+st.markdown("##### Libro Mayor Simulado de Transacciones")
+st.write("Genera un registro solo-anexión de emisiones, ganancias y gastos a partir de la simulación, "
+         "almacenado en lotes Parquet encadenados con SHA-256. Los agregados se calculan recorriendo los lotes uno a uno.")
+
+@memoizar()
+@perfilar("Generación del libro mayor")
+def simular_libro_mayor(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores, fracciones_capacidad, recompensas,
+                        N0=N0_DEFECTO):
+    libro_mayor = importar("simulacion.libro_mayor") # pyarrow se importa solo si se usa esta sección
+    meses = np.arange(int(duracion_simulacion) + 1)
+    participantes_mensuales = simular_logistico(np.asarray(N0), tasa_base_adopcion * np.asarray(factores),
+                                                np.asarray(fracciones_capacidad) * poblacion_total_urc, meses)
+    # El directorio temporal se borra aunque la generación o la agregación fallen
+    with tempfile.TemporaryDirectory(prefix="nurc_libro_mayor_") as directorio:
+        libro_mayor.escribir_libro_mayor(libro_mayor.generar_transacciones(participantes_mensuales, recompensas,
+                                                                           list(ACCIONES_POR_MES.values()), poblacion_total_urc),
+                                         directorio)
+        agregados = libro_mayor.agregar_libro_mayor(directorio, poblacion_total_urc)
+        agregados["cadena_valida"], _ = libro_mayor.verificar_cadena(directorio)
+        agregados["lotes"] = len(libro_mayor.leer_cadena(directorio))
+    return agregados
+
+@st.fragment
+@perfilar("Libro mayor")
+def mostrar_libro_mayor(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores_comp, fracciones_comp,
+                        recompensas_comp, N0_comp):
+    if st.checkbox("Simular libro mayor de transacciones", key="comparativa_libro_mayor"):
+        pd = importar("pandas")
+        agregados_libro = simular_libro_mayor(
+            tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+            factores_comp, fracciones_comp, recompensas_comp, N0_comp,
+        )
+        col_l1, col_l2, col_l3, col_l4 = st.columns(4)
+        with col_l1:
+            st.metric(label="Transacciones", value=f"{sum(agregados_libro['transacciones'].values()):,}")
+        with col_l2:
+            st.metric(label="Monedas Emitidas", value=f"{agregados_libro['emitido']:,.0f}")
+        with col_l3:
+            st.metric(label="Suministro Circulante", value=f"{agregados_libro['suministro_circulante']:,.0f}")
+        with col_l4:
+            st.metric(label="Cadena SHA-256", value="Válida" if agregados_libro["cadena_valida"] else "Alterada",
+                      delta=f"{agregados_libro['lotes']} lotes")
+        st.dataframe(pd.DataFrame({
+            "Segmento": ["Cultural", "Medio Ambiente", "Desempeño Escolar"],
+            "Monedas Emitidas": agregados_libro["emitido_por_segmento"][:3],
+            "Monedas Ganadas por Estudiantes": agregados_libro["ganado_por_segmento"][:3],
+        }))
+
+mostrar_libro_mayor(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores_comp, fracciones_comp,
+                    recompensas_comp, N0_comp)
+
+# --- Escenarios Guardados (Almacén SQLite) ---
+st.markdown("##### Escenarios Guardados")
+st.write("Guarda la configuración actual con sus resultados en un almacén local (SQLite) que sobrevive a la sesión. "
+         "Un escenario ya evaluado con los mismos parámetros se reutiliza en lugar de recalcularse.")
+
+# La configuración que se muestra en esta página, en el formato de `simulacion.escenarios`
+escenario_actual = {
+    "tasa_base_adopcion": tasa_base_adopcion, "duracion_simulacion": duracion_simulacion,
+    "poblacion_total_urc": poblacion_total_urc,
+    "segmentos": {clave: {"factor": factor, "fraccion_capacidad": fraccion, "recompensa": recompensa, "N0": N0}
+                  for clave, factor, fraccion, recompensa, N0
+                  in zip(("cultural", "ambiental", "academico"), factores_comp, fracciones_comp, recompensas_comp, N0_comp)},
+}
+
+@st.fragment
+@perfilar("Escenarios guardados")
+def mostrar_escenarios_guardados(escenario_actual):
+    if not st.checkbox("Mostrar escenarios guardados", key="comparativa_escenarios_guardados"):
+        return
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    almacen = importar("simulacion.almacen").abrir_almacen()
+    col_e1, col_e2 = st.columns([3, 1])
+    with col_e1:
+        nombre_escenario = st.text_input("Nombre del escenario", key="comparativa_nombre_escenario")
+    with col_e2:
+        st.write("")
+        if st.button("Guardar escenario actual", key="comparativa_guardar_escenario"):
+            registro, = almacen.obtener_o_evaluar([{**escenario_actual, "nombre": nombre_escenario or None}])
+            st.success(f"Escenario #{registro['id']} guardado ({registro['metricas']['score_total']} Pts).")
+    st.caption(f"{almacen.contar():,} escenarios en `{almacen.ruta}`.")
+
+    col_e3, col_e4 = st.columns(2)
+    with col_e3:
+        segmento_top = st.selectbox("Ordenar por puntaje de", [None, "cultural", "ambiental", "academico"],
+                                    format_func=lambda c: "Score Total" if c is None else SEGMENTOS[c]["nombre"],
+                                    key="comparativa_top_segmento")
+    with col_e4:
+        k_top = st.number_input("Escenarios a mostrar", 1, 100, 10, key="comparativa_top_k")
+    mejores = almacen.top(k_top, segmento=segmento_top)
+    if not mejores:
+        return
+    st.dataframe(mejores, hide_index=True, column_config={"creado": None})
+
+    # Diferencias lado a lado entre dos de los escenarios listados
+    etiquetas = {fila["id"]: f"#{fila['id']} {fila['nombre'] or ''} ({fila['score_total']} Pts)" for fila in mejores}
+    col_e5, col_e6 = st.columns(2)
+    with col_e5:
+        id_a = st.selectbox("Escenario A", list(etiquetas), format_func=etiquetas.get, key="comparativa_diff_a")
+    with col_e6:
+        id_b = st.selectbox("Escenario B", list(etiquetas), index=min(1, len(etiquetas) - 1), format_func=etiquetas.get,
+                            key="comparativa_diff_b")
+    filas_diff, registro_a, registro_b = almacen.diferencias(id_a, id_b)
+    st.dataframe([fila for fila in filas_diff if fila["a"] != fila["b"]] or filas_diff, hide_index=True)
+    if registro_a["trayectorias"] is not None and registro_b["trayectorias"] is not None:
+        df_diff = pd.concat([
+            pd.DataFrame({"Mes": registro["meses"], **dict(zip(SEGMENTOS_NOMBRES, registro["trayectorias"]))})
+            .melt(id_vars="Mes", var_name="Segmento", value_name="Participantes").assign(Escenario=etiquetas[id_escenario])
+            for id_escenario, registro in ((id_a, registro_a), (id_b, registro_b))
+        ])
+        fig_diff = px.line(df_diff, x="Mes", y="Participantes", color="Segmento", line_dash="Escenario",
+                           title="Participantes por Segmento: Escenario A vs. B")
+        st.plotly_chart(optimizar_figura(fig_diff))
+
+mostrar_escenarios_guardados(escenario_actual)
+
 st.subheader("Dilemas Clave a Considerar")
 st.markdown("""
 La implementación de una moneda de incentivos en un entorno universitario plantea varios desafíos importantes:
@@ -224,3 +689,5 @@ La implementación de una moneda de incentivos en un entorno universitario plant
 * **Privacidad de Datos:** ¿Cómo se protegen los datos de participación y desempeño de los estudiantes que se recogen para otorgar incentivos, garantizando su privacidad frente a terceros y a la propia universidad?
     * **Soluciones potenciales:** Anonimización de datos siempre que sea posible, almacenamiento seguro con cifrado, políticas de privacidad claras y transparentes, cumplimiento de regulaciones de protección de datos (ej. LFPDPPP en México), control del usuario sobre sus datos.
 """)
+
+panel_perfilado()
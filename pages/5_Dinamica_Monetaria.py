@@ -0,0 +1,159 @@
+# pages/5_Dinamica_Monetaria.py
+import streamlit as st
+import numpy as np
+from simulacion.cache import memoizar
+from simulacion.componentes import panel_perfilado, valores_por_defecto
+from simulacion.graficos import optimizar_figura
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO
+from simulacion.perfilado import iniciar_ejecucion, perfilar, seccion
+
+# Cada reejecución del script se mide por secciones (panel "Perfilado" de la barra lateral)
+iniciar_ejecucion("Dinámica Monetaria")
+
+# --- Contenido de la Página Dinámica Monetaria ---
+st.header("🪙 Dinámica Monetaria de la Moneda Digital")
+st.markdown("""
+Esta sección modela la moneda en sí misma, día a día: las monedas que se emiten al pagar las recompensas
+de cada segmento, el circulante en manos de estudiantes y comercios del campus, el gasto, el canje en la
+tesorería y la pérdida de valor con el tiempo, junto con la distribución del saldo entre todos los estudiantes.
+""")
+
+# Parámetros globales y de los segmentos (los ajustados en cada página, o sus valores por defecto)
+tasa_base_adopcion = st.session_state.get('tasa_base_adopcion', 0.05)
+duracion_simulacion = st.session_state.get('duracion_simulacion', 24)
+poblacion_total_urc = st.session_state.get('poblacion_total_urc', 25000)
+
+valores_mon = {clave: valores_por_defecto(clave, tasa_base_adopcion, poblacion_total_urc)
+               for clave in ("cultural", "ambiental", "academico")}
+N0_mon = tuple(valores["N0"] for valores in valores_mon.values())
+factores_mon = (st.session_state.get('cultural_factor_interes', valores_mon["cultural"]["factor"]),
+                st.session_state.get('ambiental_factor_conciencia', valores_mon["ambiental"]["factor"]),
+                st.session_state.get('academico_factor_motivacion', valores_mon["academico"]["factor"]))
+fracciones_mon = (st.session_state.get('cultural_capacidad_carga', valores_mon["cultural"]["fraccion_capacidad"]),
+                  st.session_state.get('ambiental_capacidad_carga', valores_mon["ambiental"]["fraccion_capacidad"]),
+                  st.session_state.get('academico_capacidad_carga', valores_mon["academico"]["fraccion_capacidad"]))
+recompensas_mon = (st.session_state.get('cultural_recompensa_evento', 10),
+                   st.session_state.get('ambiental_recompensa_reciclaje', 1.0),
+                   st.session_state.get('academico_recompensa_calif', 50))
+
+st.subheader("Supuestos de Circulación")
+col_m1, col_m2, col_m3 = st.columns(3)
+with col_m1:
+    tasa_gasto_mensual = st.slider("Saldo que gasta cada estudiante por mes (%)", 0, 100, 30, 5,
+                                   key="monetario_tasa_gasto") / 100
+with col_m2:
+    tasa_canje_mensual = st.slider("Saldo que canjean los comercios por mes (%)", 0, 100, 50, 5,
+                                   key="monetario_tasa_canje") / 100
+with col_m3:
+    decaimiento_anual = st.slider("Pérdida de valor de los saldos por año (%)", 0, 50, 5, 1,
+                                  key="monetario_decaimiento") / 100
+st.caption(f"Recompensas de las páginas: {recompensas_mon[0]} monedas por evento, {recompensas_mon[1]} por kg "
+           f"reciclado y {recompensas_mon[2]} por calificación > 90/100.")
+
+# --- Cálculo memoizado de la dinámica monetaria ---
+# Series diarias, distribución de saldos y figuras en caché LRU/TTL indexada por los parámetros normalizados.
+@memoizar()
+def simular_dinamica_monetaria(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores,
+                               fracciones_capacidad, recompensas, tasa_gasto_mensual, tasa_canje_mensual,
+                               decaimiento_anual, N0=N0_DEFECTO):
+    monetario = importar("simulacion.monetario")
+    pd = importar("pandas")
+    px = importar("plotly.express")
+    with seccion("Modelo monetario diario"):
+        resultado = monetario.simular_monetario(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                                                factores, fracciones_capacidad, recompensas, N0,
+                                                tasa_gasto_mensual, tasa_canje_mensual, decaimiento_anual)
+    meses = resultado.meses
+
+    with seccion("Figuras (Plotly)"):
+        fig_circulante = px.area(pd.DataFrame({
+            "Mes de Simulación": meses,
+            "Saldo de estudiantes": resultado.saldo_estudiantes,
+            "Saldo de comercios": resultado.saldo_comercios,
+        }), x="Mes de Simulación", y=["Saldo de estudiantes", "Saldo de comercios"],
+            title="Monedas en Circulación", labels={"value": "Monedas", "variable": "Tenedor"})
+        emitido = np.cumsum(resultado.emision.sum(axis=0))
+        retirado = np.cumsum(resultado.canje + resultado.decaimiento)
+        fig_circulante.add_scatter(x=meses, y=emitido, mode="lines", name="Emitido (acum.)", line=dict(dash="dash"))
+        fig_circulante.add_scatter(x=meses, y=retirado, mode="lines", name="Canjeado + decaído (acum.)",
+                                   line=dict(dash="dot"))
+
+        df_flujos = pd.DataFrame({"Mes de Simulación": meses, "Gasto": resultado.gasto, "Canje": resultado.canje,
+                                  "Decaimiento": resultado.decaimiento})
+        for nombre, emision_segmento in zip(resultado.nombres, resultado.emision):
+            df_flujos[f"Emisión {nombre}"] = emision_segmento
+        fig_flujos = px.line(df_flujos.iloc[:-1], x="Mes de Simulación", y=list(df_flujos.columns[1:]),
+                             title="Flujos Diarios de Monedas", labels={"value": "Monedas por día", "variable": "Flujo"})
+
+        fig_velocidad = px.line(x=meses, y=resultado.velocidad, title="Velocidad de Circulación (anualizada)",
+                                labels={'x': 'Mes de Simulación', 'y': 'Veces que circula cada moneda por año'})
+
+        df_cuantiles = pd.DataFrame({"Mes de Simulación": meses})
+        for q, serie in zip(monetario.CUANTILES, resultado.cuantiles):
+            df_cuantiles[f"P{q * 100:g}"] = serie
+        fig_cuantiles = px.line(df_cuantiles, x="Mes de Simulación", y=list(df_cuantiles.columns[1:]),
+                                title="Distribución del Saldo por Estudiante (toda la población)",
+                                labels={"value": "Monedas por estudiante", "variable": "Percentil"})
+
+        # Histograma final sin el intervalo de saldo 0 (quienes nunca participaron dominarían la escala)
+        con_saldo = slice(1, None)
+        fig_histograma = px.bar(x=resultado.bordes[con_saldo], y=resultado.histograma_final[con_saldo],
+                                title="Saldos al Final de la Simulación (estudiantes con saldo)",
+                                labels={'x': 'Saldo (monedas)', 'y': 'Estudiantes'})
+        fig_histograma.update_traces(marker_line_width=0)
+
+        for fig in (fig_circulante, fig_flujos, fig_velocidad, fig_cuantiles):
+            optimizar_figura(fig)
+    return resultado, fig_circulante, fig_flujos, fig_velocidad, fig_cuantiles, fig_histograma
+
+with seccion("Simulación monetaria"):
+    resultado_mon, fig_circulante, fig_flujos, fig_velocidad, fig_cuantiles, fig_histograma = simular_dinamica_monetaria(
+        tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores_mon, fracciones_mon, recompensas_mon,
+        tasa_gasto_mensual, tasa_canje_mensual, decaimiento_anual, N0_mon
+    )
+
+# --- Oferta y circulación ---
+st.subheader("Oferta de la Moneda")
+st.write(f"Simulación diaria de {resultado_mon.dias[-1]:,} días: lo emitido por las recompensas se reparte entre "
+         f"los saldos de estudiantes y comercios, y sale de circulación al canjearse o perder valor.")
+col_k1, col_k2, col_k3, col_k4 = st.columns(4)
+with col_k1:
+    st.metric(label="Monedas Emitidas", value=f"{resultado_mon.emision.sum():,.0f}")
+with col_k2:
+    st.metric(label="Circulante Final", value=f"{resultado_mon.circulante[-1]:,.0f}")
+with col_k3:
+    st.metric(label="Velocidad Final", value=f"{resultado_mon.velocidad[-1]:.1f} / año")
+with col_k4:
+    st.metric(label="Saldo Medio por Estudiante", value=f"{resultado_mon.saldo_medio[-1]:,.1f}")
+
+with seccion("Gráficas de oferta"):
+    st.plotly_chart(fig_circulante)
+    st.plotly_chart(fig_flujos)
+    st.plotly_chart(fig_velocidad)
+
+# --- Distribución de saldos ---
+st.subheader("Distribución de Saldos entre Estudiantes")
+st.write("Percentiles del saldo por estudiante cada día, sobre toda la población (incluye a quienes no participan).")
+
+@st.fragment
+@perfilar("Gráficas de distribución")
+def mostrar_distribucion(fig_cuantiles, fig_histograma, resultado_mon):
+    vista = st.radio("Vista", ["Percentiles en el tiempo", "Histograma final"], horizontal=True,
+                     key="monetario_vista_distribucion")
+    st.plotly_chart(fig_cuantiles if vista == "Percentiles en el tiempo" else fig_histograma)
+    st.caption(f"Al final de la simulación, **{resultado_mon.fraccion_con_saldo[-1]:.1%}** de los estudiantes tiene saldo; "
+               f"coeficiente de Gini de los saldos: **{resultado_mon.gini[-1]:.2f}**. Los percentiles tienen una "
+               f"resolución de {resultado_mon.bordes[1]:,.2f} monedas.")
+
+mostrar_distribucion(fig_cuantiles, fig_histograma, resultado_mon)
+
+st.markdown(f"""
+**Análisis:**
+Con un gasto del **{tasa_gasto_mensual:.0%}** mensual del saldo y un canje del **{tasa_canje_mensual:.0%}** mensual por
+parte de los comercios, el circulante llega a **{resultado_mon.circulante[-1]:,.0f}** monedas, de las
+**{resultado_mon.emision.sum():,.0f}** emitidas. Un gasto más alto acelera la circulación, pero también devuelve
+antes las monedas a la tesorería a través del canje.
+""")
+
+panel_perfilado()
@@ -0,0 +1,2 @@
+# simulacion/__init__.py
+# Motor de simulación compartido por las páginas de la aplicación NURC.
@@ -0,0 +1,7 @@
+# simulacion/__main__.py
+import sys
+
+from simulacion.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# simulacion/almacen.py
+# Almacén local de escenarios sobre SQLite: parámetros, métricas y trayectorias comprimidas,
+# indexados por hash de parámetros, por puntaje total y por segmento.
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from simulacion.cache import normalizar
+from simulacion.escenarios import SEGMENTOS, evaluar_escenarios
+from simulacion.logistico import N0_DEFECTO, PUNTOS_MALLA
+
+RUTA_ALMACEN = os.environ.get("NURC_ALMACEN_ESCENARIOS", str(Path.home() / ".nurc" / "escenarios.sqlite"))
+PARAMETROS_SEGMENTO = ("factor", "fraccion_capacidad", "recompensa", "N0")
+TAM_CONSULTA = 500 # Hashes por consulta IN (...) al buscar lotes de escenarios
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS escenarios (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL UNIQUE,
+    nombre TEXT,
+    creado REAL NOT NULL,
+    tasa_base_adopcion REAL NOT NULL,
+    duracion_simulacion INTEGER NOT NULL,
+    poblacion_total_urc INTEGER NOT NULL,
+    puntos_malla INTEGER NOT NULL,
+    score_total INTEGER NOT NULL,
+    parametros TEXT NOT NULL,
+    metricas TEXT NOT NULL,
+    trayectorias BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_escenarios_score ON escenarios (score_total DESC);
+CREATE TABLE IF NOT EXISTS segmentos (
+    escenario_id INTEGER NOT NULL REFERENCES escenarios (id) ON DELETE CASCADE,
+    segmento TEXT NOT NULL,
+    factor REAL NOT NULL,
+    fraccion_capacidad REAL NOT NULL,
+    recompensa REAL NOT NULL,
+    N0 REAL NOT NULL,
+    participantes_finales REAL NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (escenario_id, segmento)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_segmentos_score ON segmentos (segmento, score DESC);
+CREATE INDEX IF NOT EXISTS idx_segmentos_parametros ON segmentos (segmento, factor, fraccion_capacidad);
+"""
+
+
+# --- Identidad y codificación de un escenario ---
+def parametros_canonicos(escenario, puntos_malla=PUNTOS_MALLA, N0=N0_DEFECTO):
+    """Parámetros que determinan el resultado (sin el nombre), con los flotantes redondeados como en la caché."""
+    return {
+        "tasa_base_adopcion": normalizar(float(escenario["tasa_base_adopcion"])),
+        "duracion_simulacion": int(escenario["duracion_simulacion"]),
+        "poblacion_total_urc": int(escenario["poblacion_total_urc"]),
+        "puntos_malla": int(puntos_malla),
+        "segmentos": {clave: {p: normalizar(float(escenario["segmentos"][clave].get(p, N0 if p == "N0" else 0)))
+                              for p in PARAMETROS_SEGMENTO}
+                      for clave in SEGMENTOS},
+    }
+
+
+def hash_parametros(parametros):
+    """Huella de 16 bytes (SHA-256 truncado) del JSON canónico de los parámetros."""
+    return hashlib.sha256(_json(parametros).encode()).digest()[:16]
+
+
+def comprimir_trayectorias(trayectorias):
+    """
+    Comprime curvas float32 (segmentos × puntos), o un lote (escenarios × segmentos × puntos) a una
+    lista de blobs. Las curvas son suaves, así que se guardan las diferencias (módulo 2³²) entre los
+    patrones de bits de puntos consecutivos, agrupando los bytes por significancia antes de zlib:
+    la reconstrucción es exacta y ocupa cerca de la mitad que los float32 comprimidos tal cual.
+    """
+    arreglo = np.asarray(trayectorias, dtype=np.float32)
+    lote = arreglo.reshape((-1,) + arreglo.shape[-2:])
+    diferencias = np.diff(lote.view(np.uint32), axis=-1, prepend=np.uint32(0)) # Aritmética módulo 2³²
+    planos = np.ascontiguousarray(diferencias.view(np.uint8).reshape(diferencias.shape + (4,)).transpose(0, 3, 1, 2))
+    encabezado = np.array(arreglo.shape[-2:], dtype=np.int32).tobytes()
+    blobs = [encabezado + zlib.compress(p.tobytes(), 6) for p in planos]
+    return blobs if arreglo.ndim == 3 else blobs[0]
+
+
+def descomprimir_trayectorias(datos):
+    forma = tuple(int(n) for n in np.frombuffer(datos[:8], dtype=np.int32))
+    planos = np.frombuffer(zlib.decompress(datos[8:]), dtype=np.uint8).reshape((4,) + forma)
+    diferencias = np.ascontiguousarray(planos.transpose(1, 2, 0)).view(np.uint32)[..., 0]
+    return np.cumsum(diferencias, axis=-1, dtype=np.uint32).view(np.float32)
+
+
+class AlmacenEscenarios:
+    """
+    Escenarios evaluados guardados en un archivo SQLite. Cada operación abre su propia conexión,
+    así que una instancia se puede compartir entre las sesiones (hilos) de Streamlit y entre procesos.
+    """
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with self._conexion() as conexion:
+            conexion.execute("PRAGMA page_size = 16384") # Solo tiene efecto al crear el archivo
+            conexion.execute("PRAGMA journal_mode = WAL") # Lectores concurrentes mientras se escribe
+            conexion.executescript(_ESQUEMA)
+
+    @contextmanager
+    def _conexion(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        conexion.row_factory = sqlite3.Row
+        conexion.execute("PRAGMA foreign_keys = ON")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        try:
+            with conexion: # Una transacción por operación
+                yield conexion
+        finally:
+            conexion.close()
+
+    # --- Escritura ---
+    def guardar(self, escenarios, puntos_malla=PUNTOS_MALLA, N0=N0_DEFECTO, trayectorias=True):
+        """
+        Evalúa y guarda un lote de escenarios normalizados (ver `normalizar_escenario`).
+        Los que ya estaban guardados con los mismos parámetros se conservan. Devuelve sus ids en orden.
+        """
+        hashes, ids = self._asegurar(escenarios, puntos_malla, N0, trayectorias)
+        return [ids[h] for h in hashes]
+
+    def obtener_o_evaluar(self, escenarios, puntos_malla=PUNTOS_MALLA, N0=N0_DEFECTO, trayectorias=True):
+        """
+        Devuelve el registro de cada escenario (ver `cargar`), en el mismo orden. Los que ya están en el
+        almacén se leen; solo los nuevos se evalúan, en un único lote vectorizado, y se guardan.
+        """
+        hashes, ids = self._asegurar(escenarios, puntos_malla, N0, trayectorias)
+        registros = self.cargar_varios(set(ids.values()))
+        return [registros[ids[h]] for h in hashes]
+
+    def _asegurar(self, escenarios, puntos_malla, N0, trayectorias):
+        """Evalúa y guarda los escenarios que faltan; devuelve (hash de cada escenario, {hash: id})."""
+        parametros = [parametros_canonicos(e, puntos_malla, N0) for e in escenarios]
+        hashes = [hash_parametros(p) for p in parametros]
+        ids = self._ids_por_hash(set(hashes))
+        nuevos = {}
+        for i, h in enumerate(hashes):
+            if h not in ids:
+                nuevos.setdefault(h, i) # Los duplicados dentro del lote se evalúan una sola vez
+        if nuevos:
+            indices = list(nuevos.values())
+            columnas = evaluar_escenarios([escenarios[i] for i in indices], puntos_malla=puntos_malla, N0=N0,
+                                          incluir_trayectorias=trayectorias)
+            ids.update(self._insertar([escenarios[i] for i in indices], [parametros[i] for i in indices],
+                                      [hashes[i] for i in indices], columnas))
+        return hashes, ids
+
+    def _insertar(self, escenarios, parametros, hashes, columnas):
+        curvas = columnas.pop("_trayectorias", None)
+        columnas.pop("_meses", None)
+        metricas_claves = [c for c in columnas if c.endswith("_acum") or c.endswith("_participantes_finales")
+                           or c.startswith("score_")]
+        ahora = time.time()
+        blobs = comprimir_trayectorias(curvas) if curvas is not None else [None] * len(hashes)
+        filas = []
+        for i, (escenario, p, h) in enumerate(zip(escenarios, parametros, hashes)):
+            metricas = {c: columnas[c][i].item() for c in metricas_claves}
+            filas.append((h, escenario.get("nombre"), ahora, p["tasa_base_adopcion"], p["duracion_simulacion"],
+                          p["poblacion_total_urc"], p["puntos_malla"], metricas["score_total"],
+                          _json(p), _json(metricas), blobs[i]))
+        ids = {}
+        with self._conexion() as conexion:
+            for fila in filas:
+                # Otro proceso pudo guardar el mismo escenario entre la búsqueda y esta escritura
+                cursor = conexion.execute(
+                    "INSERT INTO escenarios (hash, nombre, creado, tasa_base_adopcion, duracion_simulacion, "
+                    "poblacion_total_urc, puntos_malla, score_total, parametros, metricas, trayectorias) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (hash) DO NOTHING", fila)
+                if cursor.rowcount:
+                    ids[fila[0]] = cursor.lastrowid
+            conexion.executemany(
+                "INSERT INTO segmentos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(ids[h], clave, *(p["segmentos"][clave][q] for q in PARAMETROS_SEGMENTO),
+                  columnas[f"{clave}_participantes_finales"][i].item(), columnas[f"score_{clave}"][i].item())
+                 for i, (p, h) in enumerate(zip(parametros, hashes)) if h in ids for clave in SEGMENTOS])
+        faltantes = set(hashes) - ids.keys()
+        if faltantes:
+            ids.update(self._ids_por_hash(faltantes))
+        return ids
+
+    def eliminar(self, ids):
+        with self._conexion() as conexion:
+            conexion.executemany("DELETE FROM escenarios WHERE id = ?", [(int(i),) for i in ids])
+
+    # --- Lectura ---
+    def _ids_por_hash(self, hashes):
+        hashes, ids = list(hashes), {}
+        with self._conexion() as conexion:
+            for inicio in range(0, len(hashes), TAM_CONSULTA):
+                bloque = hashes[inicio:inicio + TAM_CONSULTA]
+                consulta = f"SELECT hash, id FROM escenarios WHERE hash IN ({', '.join('?' * len(bloque))})"
+                ids.update((bytes(h), i) for h, i in conexion.execute(consulta, bloque))
+        return ids
+
+    def buscar(self, escenario, puntos_malla=PUNTOS_MALLA, N0=N0_DEFECTO):
+        """Registro guardado con los mismos parámetros que `escenario`, o None."""
+        h = hash_parametros(parametros_canonicos(escenario, puntos_malla, N0))
+        i = self._ids_por_hash([h]).get(h)
+        return None if i is None else self.cargar(i)
+
+    @staticmethod
+    def _registro(fila):
+        registro = {"id": fila["id"], "hash": bytes(fila["hash"]).hex(), "nombre": fila["nombre"], "creado": fila["creado"],
+                    "parametros": json.loads(fila["parametros"]), "metricas": json.loads(fila["metricas"]),
+                    "trayectorias": None, "meses": None}
+        if fila["trayectorias"] is not None:
+            registro["trayectorias"] = descomprimir_trayectorias(fila["trayectorias"])
+            registro["meses"] = np.linspace(0, fila["duracion_simulacion"], registro["trayectorias"].shape[-1])
+        return registro
+
+    def cargar(self, id_escenario):
+        """Parámetros, métricas y trayectorias (segmentos × puntos) de un escenario guardado."""
+        registro = self.cargar_varios([id_escenario]).get(int(id_escenario))
+        if registro is None:
+            raise KeyError(f"No hay un escenario con id {id_escenario}")
+        return registro
+
+    def cargar_varios(self, ids):
+        ids, registros = [int(i) for i in ids], {}
+        with self._conexion() as conexion:
+            for inicio in range(0, len(ids), TAM_CONSULTA):
+                bloque = ids[inicio:inicio + TAM_CONSULTA]
+                consulta = f"SELECT * FROM escenarios WHERE id IN ({', '.join('?' * len(bloque))})"
+                registros.update((fila["id"], self._registro(fila)) for fila in conexion.execute(consulta, bloque))
+        return registros
+
+    def contar(self):
+        with self._conexion() as conexion:
+            return conexion.execute("SELECT COUNT(*) FROM escenarios").fetchone()[0]
+
+    def top(self, k=10, segmento=None, duracion_simulacion=None, poblacion_total_urc=None):
+        """
+        Los `k` escenarios con mayor puntaje: `score_total`, o el puntaje de `segmento` si se indica.
+        Ambos recorridos usan un índice ordenado por puntaje, así que no dependen del tamaño del almacén.
+        Devuelve filas resumidas (sin trayectorias).
+        """
+        filtros, valores = [], []
+        for columna, valor in (("e.duracion_simulacion", duracion_simulacion), ("e.poblacion_total_urc", poblacion_total_urc)):
+            if valor is not None:
+                filtros.append(f"{columna} = ?")
+                valores.append(int(valor))
+        columnas = ("e.id, e.nombre, e.tasa_base_adopcion, e.duracion_simulacion, e.poblacion_total_urc, "
+                    "e.score_total, e.creado")
+        if segmento is None:
+            consulta = f"SELECT {columnas} FROM escenarios e"
+            orden = "e.score_total DESC, e.id"
+        else:
+            consulta = (f"SELECT {columnas}, s.factor, s.fraccion_capacidad, s.score AS score_segmento "
+                        "FROM segmentos s JOIN escenarios e ON e.id = s.escenario_id")
+            filtros.insert(0, "s.segmento = ?")
+            valores.insert(0, segmento)
+            orden = "s.score DESC, e.id"
+        if filtros:
+            consulta += " WHERE " + " AND ".join(filtros)
+        with self._conexion() as conexion:
+            return [dict(fila) for fila in conexion.execute(f"{consulta} ORDER BY {orden} LIMIT ?", [*valores, int(k)])]
+
+    def diferencias(self, id_a, id_b):
+        """
+        Comparación lado a lado de dos escenarios: una fila por parámetro o métrica con los valores
+        de cada uno y su diferencia (b − a), más los dos registros completos para graficar sus curvas.
+        """
+        a, b = self.cargar(id_a), self.cargar(id_b)
+        filas = []
+        for grupo in ("parametros", "metricas"):
+            planos_a, planos_b = _aplanar(a[grupo]), _aplanar(b[grupo])
+            for campo in dict.fromkeys([*planos_a, *planos_b]):
+                valor_a, valor_b = planos_a.get(campo), planos_b.get(campo)
+                diferencia = valor_b - valor_a if isinstance(valor_a, (int, float)) and isinstance(valor_b, (int, float)) else None
+                filas.append({"tipo": grupo, "campo": campo, "a": valor_a, "b": valor_b, "diferencia": diferencia})
+        return filas, a, b
+
+
+@functools.lru_cache(maxsize=None)
+def abrir_almacen(ruta=RUTA_ALMACEN):
+    """Instancia compartida por proceso para cada archivo (el esquema se verifica una sola vez)."""
+    return AlmacenEscenarios(ruta)
+
+
+def _json(datos):
+    return json.dumps(datos, sort_keys=True, separators=(",", ":"))
+
+
+def _aplanar(datos, prefijo=""):
+    """{'segmentos': {'cultural': {'factor': 1}}} -> {'segmentos.cultural.factor': 1}"""
+    plano = {}
+    for clave, valor in datos.items():
+        if isinstance(valor, dict):
+            plano.update(_aplanar(valor, f"{prefijo}{clave}."))
+        else:
+            plano[f"{prefijo}{clave}"] = valor
+    return plano
+
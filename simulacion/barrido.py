@@ -0,0 +1,86 @@
+# simulacion/barrido.py
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.cache import CacheResultados
+from simulacion.logistico import N0_DEFECTO, solucion_logistica
+
+EJES_BARRIDO = ("tasa_base_adopcion", "factor_segmento", "fraccion_capacidad", "duracion_simulacion")
+
+# Los barridos pueden ocupar decenas de MB, así que usan su propia caché con pocas entradas
+cache_barridos = CacheResultados(max_entradas=8)
+
+
+@dataclass
+class ResultadoBarrido:
+    """
+    Resultado de un barrido de parámetros. Los arreglos tienen forma
+    (tasas, factores, fracciones, duraciones), en el orden de `EJES_BARRIDO`.
+    """
+    tasas: np.ndarray
+    factores: np.ndarray
+    fracciones: np.ndarray
+    duraciones: np.ndarray
+    participantes_finales: np.ndarray # Participantes al final de la simulación del segmento barrido
+    score_total: np.ndarray # Puntaje total del scorecard (segmento barrido + segmentos fijos)
+
+    @property
+    def num_escenarios(self):
+        return self.score_total.size
+
+    def ejes(self):
+        return dict(zip(EJES_BARRIDO, (self.tasas, self.factores, self.fracciones, self.duraciones)))
+
+    def mejor_escenario(self):
+        """Parámetros y resultados del escenario con mayor `score_total`."""
+        indice = np.unravel_index(np.argmax(self.score_total), self.score_total.shape)
+        escenario = {nombre: valores[i].item() for (nombre, valores), i in zip(self.ejes().items(), indice)}
+        escenario["participantes_finales"] = float(self.participantes_finales[indice])
+        escenario["score_total"] = int(self.score_total[indice])
+        return escenario
+
+    def mapa(self, metrica, eje_x, eje_y):
+        """
+        Proyección 2-D de `metrica` ('participantes_finales' o 'score_total') sobre dos ejes.
+        Los ejes restantes se reducen con el máximo, es decir, cada celda muestra el mejor
+        valor alcanzable con esa combinación de `eje_x` y `eje_y`.
+        """
+        datos = getattr(self, metrica)
+        ix, iy = EJES_BARRIDO.index(eje_x), EJES_BARRIDO.index(eje_y)
+        otros = tuple(i for i in range(len(EJES_BARRIDO)) if i not in (ix, iy))
+        reducido = datos.max(axis=otros)
+        # Tras reducir, los ejes conservan su orden relativo; se transpone para dejar (y, x)
+        return reducido if iy < ix else reducido.T
+
+
+def score_segmento(participantes_finales, poblacion_total_urc):
+    """Puntaje del scorecard de un segmento: porcentaje de la población participante × 1000, truncado."""
+    return np.floor(participantes_finales / poblacion_total_urc * 1000).astype(np.int32)
+
+
+def barrido_parametros(tasas, factores, fracciones, duraciones, poblacion_total_urc,
+                       segmentos_fijos=(), N0=N0_DEFECTO):
+    """
+    Evalúa toda la malla tasa × factor × fracción de capacidad × duración en un solo
+    cálculo vectorizado (solución cerrada evaluada solo en el mes final).
+
+    segmentos_fijos: pares (factor, fraccion_capacidad) de los demás segmentos, que
+    siguen la tasa y la duración del barrido y suman su puntaje al `score_total`.
+    """
+    tasas = np.asarray(tasas, dtype=float)
+    factores = np.asarray(factores, dtype=float)
+    fracciones = np.asarray(fracciones, dtype=float)
+    duraciones = np.asarray(duraciones, dtype=float)
+
+    r = tasas[:, None, None] * factores[None, :, None] # (A, F, 1)
+    K = fracciones[None, None, :] * poblacion_total_urc # (1, 1, C)
+    participantes_finales = solucion_logistica(N0, r, K, duraciones) # (A, F, C, D)
+    score_total = score_segmento(participantes_finales, poblacion_total_urc)
+
+    for factor, fraccion in segmentos_fijos:
+        finales_fijo = solucion_logistica(N0, tasas * factor, fraccion * poblacion_total_urc, duraciones) # (A, D)
+        score_total += score_segmento(finales_fijo, poblacion_total_urc)[:, None, None, :]
+
+    return ResultadoBarrido(tasas, factores, fracciones, duraciones,
+                            participantes_finales.astype(np.float32), score_total)
@@ -0,0 +1,89 @@
+# simulacion/cache.py
+import functools
+import threading
+
+import numpy as np
+from cachetools import TTLCache
+
+# --- Normalización de entradas ---
+def normalizar(valor, decimales=9):
+    """
+    Convierte una entrada de widget en una clave estable y hasheable.
+    Los flotantes se redondean para que 0.1 * 3 y 0.3 produzcan la misma clave.
+    """
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return round(float(valor), decimales)
+    if isinstance(valor, np.ndarray):
+        return tuple(normalizar(v, decimales) for v in valor.ravel().tolist()) + (valor.shape,)
+    if isinstance(valor, (list, tuple)):
+        return tuple(normalizar(v, decimales) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, normalizar(v, decimales)) for k, v in valor.items()))
+    return valor
+
+
+# --- Caché de resultados con expulsión LRU/TTL ---
+class CacheResultados:
+    """
+    Caché acotada en tamaño (LRU) y en tiempo de vida (TTL), compartida por todas las
+    sesiones del proceso. Lleva contadores de aciertos y fallos.
+    """
+
+    def __init__(self, max_entradas=256, ttl_segundos=3600):
+        self._cache = TTLCache(maxsize=max_entradas, ttl=ttl_segundos)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener_o_calcular(self, clave, calcular):
+        with self._lock:
+            try:
+                valor = self._cache[clave]
+                self.aciertos += 1
+                return valor
+            except KeyError:
+                self.fallos += 1
+        valor = calcular() # Se calcula fuera del candado para no bloquear otras sesiones
+        with self._lock:
+            self._cache[clave] = valor
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._cache.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "entradas": len(self._cache),
+                "max_entradas": int(self._cache.maxsize),
+            }
+
+
+cache_simulaciones = CacheResultados()
+
+
+def memoizar(cache=cache_simulaciones):
+    """
+    Decorador que memoiza una función de cálculo en `cache`, usando como clave
+    el nombre de la función y sus argumentos normalizados.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            clave = (funcion.__module__, funcion.__qualname__,
+                     normalizar(args), normalizar(kwargs))
+            return cache.obtener_o_calcular(clave, lambda: funcion(*args, **kwargs))
+        envoltura.cache = cache
+        return envoltura
+    return decorador
@@ -0,0 +1,241 @@
+# simulacion/calibracion.py
+# Ajuste de los parámetros del modelo logístico (N0, r, K) a series observadas de participantes.
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from simulacion.importaciones import importar
+
+
+PARAMETROS = ("N0", "r", "K")
+# Límites de búsqueda (el ajuste trabaja con el logaritmo de cada parámetro, que así siempre es positivo)
+LIMITES = {"N0": (1e-3, 1e9), "r": (1e-4, 10.0), "K": (1.0, 1e10)}
+NUM_INICIOS = 16 # Puntos de partida por cohorte
+MAX_ITERACIONES = 200
+TOLERANCIA = 1e-8 # Mejora relativa mínima del error para seguir iterando
+NIVEL_CONFIANZA = 0.95
+
+
+# --- Modelo y derivadas analíticas ---
+def jacobiano_logistico(N0, r, K, t):
+    """
+    Solución cerrada N(t) y sus derivadas respecto a (N0, r, K). Con E = exp(-r t) y D = N0 + (K - N0) E:
+        dN/dN0 = K² E / D²,   dN/dr = K N0 (K - N0) t E / D²,   dN/dK = N0² (1 - E) / D²
+    Los parámetros se combinan por broadcasting; devuelve N con forma `(..., len(t))` y J con `(..., len(t), 3)`.
+    """
+    N0, r, K = (np.asarray(p, dtype=float)[..., None] for p in (N0, r, K))
+    with np.errstate(over="ignore", under="ignore"):
+        E = np.exp(-r * t)
+        D = N0 + (K - N0) * E
+        D2 = D * D
+        N = K * N0 / D
+        J = np.stack([K * K * E / D2, K * N0 * (K - N0) * t * E / D2, N0 * N0 * (1 - E) / D2], axis=-1)
+    return N, J
+
+
+@dataclass
+class ResultadoCalibracion:
+    """Parámetros ajustados por cohorte; los arreglos `(C, 3)` siguen el orden de `PARAMETROS`."""
+    parametros: np.ndarray # (C, 3)
+    error_estandar: np.ndarray # (C, 3) por el método delta; NaN si la cohorte no tiene grados de libertad
+    ic_inferior: np.ndarray
+    ic_superior: np.ndarray
+    rmse: np.ndarray # (C,)
+    convergio: np.ndarray # (C,) bool
+    iteraciones: int
+
+    def como_dict(self, i=0):
+        """Resultado de la cohorte `i` como diccionario serializable en JSON."""
+        resultado = {nombre: float(self.parametros[i, j]) for j, nombre in enumerate(PARAMETROS)}
+        for j, nombre in enumerate(PARAMETROS):
+            resultado[f"ee_{nombre}"] = float(self.error_estandar[i, j])
+            resultado[f"ic_{nombre}"] = [float(self.ic_inferior[i, j]), float(self.ic_superior[i, j])]
+        resultado["rmse"] = float(self.rmse[i])
+        resultado["convergio"] = bool(self.convergio[i])
+        return resultado
+
+
+# --- Ajuste por lotes: Levenberg–Marquardt vectorizado sobre cohortes × puntos de partida ---
+def _inicios(observado, num_inicios, rng):
+    """Puntos de partida log-uniformes alrededor de lo observado en cada cohorte: (C, S, 3) en escala logarítmica."""
+    maximo = np.maximum(np.nanmax(observado, axis=1), 1.0)
+    primero = np.maximum(np.where(np.isfinite(observado[:, 0]), observado[:, 0], 1.0), 1.0)
+    bajos = np.log(np.stack([primero / 10, np.full_like(maximo, 0.01), maximo], axis=-1))
+    altos = np.log(np.stack([primero * 10, np.full_like(maximo, 2.0), maximo * 5], axis=-1))
+    # Hipercubo latino: cada parámetro recorre todos sus estratos en orden aleatorio
+    estratos = np.stack([rng.permuted(np.tile(np.arange(num_inicios), (len(maximo), 1)), axis=1) for _ in PARAMETROS], axis=-1)
+    u = (estratos + rng.random(estratos.shape)) / num_inicios
+    return bajos[:, None, :] + u * (altos - bajos)[:, None, :]
+
+
+def _levenberg_marquardt(theta, t, observado, pesos, max_iteraciones, tolerancia):
+    """
+    Itera LM en paralelo para P problemas independientes: `theta` (P, 3) en escala logarítmica y
+    `observado`/`pesos` (P, T). En cada iteración solo se trabaja con los problemas que siguen activos.
+    Devuelve theta, error cuadrático y convergencia por problema, y el número de iteraciones.
+    """
+    inferior = np.log([LIMITES[p][0] for p in PARAMETROS])
+    superior = np.log([LIMITES[p][1] for p in PARAMETROS])
+
+    def evaluar(theta, observado, pesos):
+        p = np.exp(theta)
+        N, J = jacobiano_logistico(p[:, 0], p[:, 1], p[:, 2], t)
+        residuos = np.where(pesos, N - observado, 0.0)
+        return residuos, J * p[:, None, :] * pesos[..., None], (residuos * residuos).sum(axis=1)
+
+    theta = theta.copy()
+    residuos, J, error = evaluar(theta, observado, pesos)
+    amortiguamiento = np.full(len(theta), 1e-3)
+    convergio = np.zeros(len(theta), dtype=bool)
+    activos = np.arange(len(theta))
+    identidad = np.eye(3)
+    iteracion = 0
+    while len(activos) and iteracion < max_iteraciones:
+        iteracion += 1
+        Jt = J[activos].transpose(0, 2, 1)
+        JtJ = Jt @ J[activos]
+        gradiente = (Jt @ residuos[activos, :, None])[..., 0]
+        # Escalado de Marquardt: se amortigua en proporción a la diagonal de JᵀJ
+        diagonal = np.diagonal(JtJ, axis1=1, axis2=2)[:, None, :] * identidad + 1e-12 * identidad
+        paso = -np.linalg.solve(JtJ + amortiguamiento[activos, None, None] * diagonal, gradiente[..., None])[..., 0]
+        paso = np.where(np.isfinite(paso), paso, 0.0)
+        candidato = np.clip(theta[activos] + paso, inferior, superior)
+        residuos_c, J_c, error_c = evaluar(candidato, observado[activos], pesos[activos])
+
+        mejora = np.isfinite(error_c) & (error_c < error[activos])
+        aceptados = activos[mejora]
+        # Converge si la mejora relativa o el paso ya son despreciables, o si ningún paso reduce el error
+        fin = np.where(mejora, (error[activos] - error_c) <= tolerancia * error[activos],
+                       amortiguamiento[activos] > 1e10)
+        fin |= np.abs(candidato - theta[activos]).max(axis=1) < 1e-10 # Incluye el caso de un límite activo
+        theta[aceptados], residuos[aceptados], J[aceptados], error[aceptados] = (
+            candidato[mejora], residuos_c[mejora], J_c[mejora], error_c[mejora])
+        amortiguamiento[activos] = np.where(mejora, amortiguamiento[activos] / 3, amortiguamiento[activos] * 4)
+        convergio[activos[fin]] = True
+        activos = activos[~fin]
+    return theta, error, convergio, iteracion
+
+
+def _calibrar_bloque(t, observado, num_inicios, semilla, max_iteraciones, tolerancia, nivel_confianza):
+    """Ajusta un bloque de cohortes (C, T) en un solo conjunto de operaciones vectorizadas."""
+    rng = np.random.default_rng(semilla)
+    pesos = np.isfinite(observado)
+    observado = np.where(pesos, observado, 0.0)
+    theta = _inicios(np.where(pesos, observado, np.nan), num_inicios, rng)
+    C, S = theta.shape[:2]
+    theta, error, convergio, iteraciones = _levenberg_marquardt(
+        theta.reshape(C * S, 3), t, np.repeat(observado, S, axis=0), np.repeat(pesos, S, axis=0),
+        max_iteraciones, tolerancia)
+    theta, error, convergio = theta.reshape(C, S, 3), error.reshape(C, S), convergio.reshape(C, S)
+
+    # Mejor punto de partida de cada cohorte
+    mejor = np.argmin(np.where(np.isfinite(error), error, np.inf), axis=1)
+    filas = np.arange(len(observado))
+    parametros = np.exp(theta[filas, mejor])
+    error, convergio = error[filas, mejor], convergio[filas, mejor]
+
+    # Intervalos de confianza: cov = s² (JᵀJ)⁻¹ con el jacobiano respecto al logaritmo de los parámetros,
+    # mejor condicionado que en la escala original; los intervalos exp(θ ± q·ee_θ) son siempre positivos
+    _, J = jacobiano_logistico(parametros[:, 0], parametros[:, 1], parametros[:, 2], t)
+    J = J * parametros[:, None, :] * pesos[..., None]
+    n = pesos.sum(axis=1)
+    grados_libertad = n - len(PARAMETROS)
+    JtJ = J.transpose(0, 2, 1) @ J
+    try:
+        inversa = np.linalg.inv(JtJ)
+    except np.linalg.LinAlgError: # Alguna cohorte sin información sobre un parámetro
+        inversa = np.linalg.pinv(JtJ, hermitian=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s2 = error / grados_libertad
+        error_log = np.sqrt(np.clip(np.diagonal(inversa, axis1=1, axis2=2), 0, None) * s2[:, None])
+    error_log[grados_libertad <= 0] = np.nan
+    cuantil = importar("scipy.stats", "t").ppf(0.5 + nivel_confianza / 2, np.maximum(grados_libertad, 1))[:, None]
+    with np.errstate(over="ignore"):
+        ic_inferior, ic_superior = parametros * np.exp(-cuantil * error_log), parametros * np.exp(cuantil * error_log)
+    return (parametros, parametros * error_log, ic_inferior, ic_superior,
+            np.sqrt(error / np.maximum(n, 1)), convergio, iteraciones)
+
+
+def calibrar_cohortes(t, observado, num_inicios=NUM_INICIOS, semilla=42, max_iteraciones=MAX_ITERACIONES,
+                      tolerancia=TOLERANCIA, nivel_confianza=NIVEL_CONFIANZA, procesos=1, tam_bloque=256):
+    """
+    Ajusta (N0, r, K) a cada fila de `observado` (C cohortes × T tiempos; NaN = sin dato) con la
+    solución cerrada y su jacobiano analítico. Todas las cohortes y `num_inicios` puntos de partida
+    por cohorte avanzan juntos en un Levenberg–Marquardt vectorizado; con `procesos` > 1 los bloques
+    de `tam_bloque` cohortes se reparten entre procesos.
+    """
+    t = np.asarray(t, dtype=float)
+    observado = np.atleast_2d(np.asarray(observado, dtype=float))
+    inicios_bloques = range(0, len(observado), tam_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(inicios_bloques))
+    argumentos = [(t, observado[i:i + tam_bloque], num_inicios, semilla_bloque, max_iteraciones, tolerancia, nivel_confianza)
+                  for i, semilla_bloque in zip(inicios_bloques, semillas)]
+    if procesos > 1 and len(argumentos) > 1:
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+            bloques = list(pool.map(_calibrar_bloque, *zip(*argumentos)))
+    else:
+        bloques = [_calibrar_bloque(*a) for a in argumentos]
+    partes = list(zip(*bloques))
+    return ResultadoCalibracion(*(np.concatenate(p) for p in partes[:6]), iteraciones=max(partes[6]))
+
+
+def ajustar_logistico(t, N):
+    """
+    Ajusta (N0, r, K) a una sola serie `N` observada en los tiempos `t` (meses). Devuelve un diccionario
+    con los parámetros, sus errores estándar e intervalos de confianza y el error cuadrático medio.
+    """
+    return calibrar_cohortes(t, np.asarray(N, dtype=float)[None, :]).como_dict(0)
+
+
+# --- Calibración persistida junto a los registros de participación ---
+DIRECTORIO_ESTADO = ".nurc_ingesta" # Subdirectorio de estado dentro del directorio de registros
+ARCHIVO_CALIBRACION = "calibracion.json"
+
+
+def ruta_calibracion(directorio_registros):
+    return Path(directorio_registros) / DIRECTORIO_ESTADO / ARCHIVO_CALIBRACION
+
+
+def cargar_calibracion(directorio_registros):
+    """Parámetros calibrados por segmento ({clave: {N0, r, K, ...}}), o {} si aún no se ha calibrado."""
+    ruta = ruta_calibracion(directorio_registros)
+    if not ruta.is_file():
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    # Recalibración por lotes: una fila por (cohorte, mes) en CSV/Parquet -> parámetros con intervalos de confianza
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Calibra (N0, r, K) para muchas cohortes a la vez.")
+    parser.add_argument("entrada", help="CSV o Parquet con columnas cohorte, mes, participantes")
+    parser.add_argument("--salida", default=None, help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument("--inicios", type=int, default=NUM_INICIOS)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pd = importar("pandas")
+    columnas = ["cohorte", "mes", "participantes"]
+    if args.entrada.lower().endswith(".parquet"):
+        tabla = pd.read_parquet(args.entrada, columns=columnas)
+    else:
+        tabla = pd.read_csv(args.entrada, usecols=columnas)
+    series = tabla.pivot_table(index="cohorte", columns="mes", values="participantes", aggfunc="sum")
+    nombres, t, observado = series.index.to_list(), series.columns.to_numpy(dtype=float), series.to_numpy(dtype=float)
+
+    resultado = calibrar_cohortes(t, observado, num_inicios=args.inicios, procesos=args.procesos)
+    print(f"{len(nombres):,} cohortes calibradas ({resultado.convergio.mean():.1%} convergieron, "
+          f"{resultado.iteraciones} iteraciones máx.)")
+    if args.salida:
+        tabla = pd.DataFrame([{"cohorte": nombre, **resultado.como_dict(i)} for i, nombre in enumerate(nombres)])
+        for nombre in PARAMETROS: # Los intervalos se guardan como dos columnas
+            tabla[[f"ic_{nombre}_inf", f"ic_{nombre}_sup"]] = pd.DataFrame(tabla.pop(f"ic_{nombre}").to_list())
+        (tabla.to_parquet if args.salida.lower().endswith(".parquet") else tabla.to_csv)(args.salida, index=False)
+        print(f"Resultados: {args.salida}")
@@ -0,0 +1,93 @@
+# simulacion/cli.py
+# Ejecución por lotes de escenarios sin Streamlit:
+#   python -m simulacion escenarios.toml --salida resultados/ --procesos 8
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from simulacion.escenarios import SEGMENTOS, cargar_escenarios, evaluar_escenarios
+
+
+def _tablas_lote(escenarios, puntos_malla, incluir_trayectorias):
+    """Evalúa un bloque de escenarios y devuelve (tabla_resumen, tabla_trayectorias | None)."""
+    columnas = evaluar_escenarios(escenarios, puntos_malla=puntos_malla, incluir_trayectorias=incluir_trayectorias)
+    trayectorias = columnas.pop("_trayectorias", None)
+    meses = columnas.pop("_meses", None)
+    resumen = pa.table(columnas)
+    if trayectorias is None:
+        return resumen, None
+
+    num_escenarios, num_segmentos, num_puntos = trayectorias.shape
+    tabla_trayectorias = pa.table({
+        "nombre": np.repeat(np.asarray(columnas["nombre"], dtype=object), num_segmentos * num_puntos),
+        "duracion_simulacion": np.repeat(columnas["duracion_simulacion"], num_segmentos * num_puntos),
+        "segmento": np.tile(np.repeat(np.array(list(SEGMENTOS), dtype=object), num_puntos), num_escenarios),
+        "mes": np.repeat(meses[:, None, :], num_segmentos, axis=1).ravel().astype(np.float32),
+        "participantes": trayectorias.ravel().astype(np.float32),
+    })
+    return resumen, tabla_trayectorias
+
+
+def _bloques(escenarios, tam_bloque):
+    for inicio in range(0, len(escenarios), tam_bloque):
+        yield escenarios[inicio:inicio + tam_bloque]
+
+
+def ejecutar(escenarios, salida, procesos=None, tam_bloque=2000, puntos_malla=100,
+             incluir_trayectorias=False, particion=("duracion_simulacion",)):
+    """
+    Reparte los escenarios en bloques sobre un grupo de procesos y escribe cada bloque en
+    Parquet particionado en cuanto termina, sin acumular todos los resultados en memoria.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    bloques = list(_bloques(escenarios, tam_bloque))
+    argumentos = ([b, puntos_malla, incluir_trayectorias] for b in bloques)
+
+    def escribir(numero, resumen, trayectorias):
+        plantilla = f"bloque-{numero:06d}-{{i}}.parquet"
+        pq.write_to_dataset(resumen, os.path.join(salida, "resumen"), partition_cols=list(particion),
+                            basename_template=plantilla)
+        if trayectorias is not None:
+            pq.write_to_dataset(trayectorias, os.path.join(salida, "trayectorias"), partition_cols=list(particion),
+                                basename_template=plantilla)
+
+    if procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for numero, (resumen, trayectorias) in enumerate(pool.map(_tablas_lote, *zip(*argumentos))):
+                escribir(numero, resumen, trayectorias)
+    else:
+        for numero, args in enumerate(argumentos):
+            escribir(numero, *_tablas_lote(*args))
+    return len(bloques)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulacion",
+        description="Evalúa escenarios de la moneda de incentivos NURC y escribe los resultados en Parquet.")
+    parser.add_argument("escenarios", help="Archivo de escenarios (.json, .toml o .yaml)")
+    parser.add_argument("--salida", default="resultados", help="Directorio del dataset Parquet (por defecto: resultados)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de trabajo (por defecto: todos los núcleos)")
+    parser.add_argument("--tam-bloque", type=int, default=2000, help="Escenarios por bloque de trabajo")
+    parser.add_argument("--puntos-malla", type=int, default=100, help="Puntos de la malla temporal por escenario")
+    parser.add_argument("--trayectorias", action="store_true", help="Escribe también las curvas completas por segmento")
+    parser.add_argument("--particion", nargs="*", default=["duracion_simulacion"],
+                        help="Columnas de partición del dataset (por defecto: duracion_simulacion)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    escenarios = cargar_escenarios(args.escenarios)
+    num_bloques = ejecutar(escenarios, args.salida, procesos=args.procesos, tam_bloque=args.tam_bloque,
+                           puntos_malla=args.puntos_malla, incluir_trayectorias=args.trayectorias,
+                           particion=args.particion)
+    duracion = time.perf_counter() - inicio
+    print(f"{len(escenarios):,} escenarios en {num_bloques} bloques evaluados en {duracion:.2f} s "
+          f"({len(escenarios) / duracion:,.0f} escenarios/s) -> {args.salida}", file=sys.stderr)
+    return 0
@@ -0,0 +1,177 @@
+# simulacion/componentes.py
+# Controles de Streamlit compartidos por varias páginas.
+import os
+import time
+
+import numpy as np
+import streamlit as st
+
+from simulacion.agentes import ACCIONES_POR_MES, SegmentoAgentes, simular_agentes
+from simulacion.cache import memoizar
+from simulacion.calibracion import cargar_calibracion, ruta_calibracion
+from simulacion.escenarios import SEGMENTOS
+from simulacion.estocastico import MODOS_ESTOCASTICOS, simular_montecarlo
+from simulacion.importaciones import importar
+from simulacion.logistico import N0_DEFECTO
+from simulacion.perfilado import MAX_EJECUCIONES, finalizar_ejecucion, historial_perfiles, memoria_activa
+from simulacion.tablas import abrir_tablas
+
+# Las bandas Monte Carlo se memoizan igual que las trayectorias deterministas
+_montecarlo_simulado = memoizar()(simular_montecarlo)
+
+
+def montecarlo_memoizado(N0, r, K, t, **parametros_mc):
+    """
+    Bandas Monte Carlo servidas desde las tablas precalculadas (memoria mapeada, compartida por todos los
+    procesos) cuando cubren el caso; si no, se simulan y se memoizan en la caché del proceso.
+    """
+    tablas = abrir_tablas()
+    bandas = tablas.bandas(N0, r, K, t, **parametros_mc) if tablas is not None else None
+    return bandas if bandas is not None else _montecarlo_simulado(N0, r, K, t, **parametros_mc)
+
+
+def controles_montecarlo(prefijo):
+    """
+    Muestra el interruptor del modo estocástico y sus parámetros.
+    Devuelve los argumentos para `simular_montecarlo`, o None si el modo está apagado.
+    """
+    if not st.toggle("Modo estocástico (Monte Carlo)", key=f"{prefijo}_mc_activo"):
+        return None
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        num_trayectorias = st.select_slider("Trayectorias", [1000, 5000, 10000, 20000, 50000],
+                                            value=10000, key=f"{prefijo}_mc_trayectorias")
+    with col2:
+        sigma_r = st.slider("Incertidumbre en r (σ)", 0.0, 0.5, 0.2, 0.05, key=f"{prefijo}_mc_sigma_r")
+    with col3:
+        sigma_K = st.slider("Incertidumbre en K (σ)", 0.0, 0.5, 0.1, 0.05, key=f"{prefijo}_mc_sigma_K")
+    with col4:
+        modo = st.selectbox("Modelo", MODOS_ESTOCASTICOS, key=f"{prefijo}_mc_modo",
+                            format_func={"parametros": "Ruido en r y K", "sde": "Ecuación estocástica (SDE)"}.get)
+    sigma_ruido = 0.0
+    if modo == "sde":
+        sigma_ruido = st.slider("Volatilidad por paso (σ·N·dW)", 0.0, 0.5, 0.1, 0.05, key=f"{prefijo}_mc_sigma_ruido")
+    return dict(num_trayectorias=num_trayectorias, sigma_r=sigma_r, sigma_K=sigma_K,
+                sigma_ruido=sigma_ruido, modo=modo)
+
+
+@memoizar()
+def agentes_segmento(nombre, num_agentes, r, fraccion_capacidad, recompensa, duracion_meses, N0=N0_DEFECTO):
+    """Simulación por agentes de un solo segmento, memoizada por sus parámetros."""
+    segmento = SegmentoAgentes(nombre, r, fraccion_capacidad, recompensa, ACCIONES_POR_MES[nombre])
+    return simular_agentes(num_agentes, [segmento], duracion_meses, N0=int(round(N0)))
+
+
+def controles_agentes(prefijo):
+    """Interruptor para superponer la curva de la simulación basada en agentes."""
+    return st.toggle("Simulación basada en agentes (un agente por estudiante)", key=f"{prefijo}_agentes_activo")
+
+
+# --- Difusión sobre la red social de estudiantes ---
+@memoizar()
+def red_estudiantes(num_nodos, grado_medio, homofilia, ruta="", modificado=None):
+    """Red importada de `ruta` (con su fecha de modificación en la clave) o red sintética de grupos."""
+    red = importar("simulacion.red")
+    if ruta:
+        return red.cargar_red(ruta, num_nodos)
+    return red.generar_red(num_nodos, grado_medio, homofilia=homofilia)
+
+
+@memoizar()
+def difusion_segmento(num_nodos, r, fraccion_capacidad, duracion_meses, N0=N0_DEFECTO, grado_medio=40,
+                      homofilia=0.8, ruta="", modificado=None):
+    """Difusión de un solo segmento sobre la red de estudiantes, memoizada por sus parámetros."""
+    red = importar("simulacion.red")
+    return red.simular_difusion(red_estudiantes(num_nodos, grado_medio, homofilia, ruta, modificado),
+                                N0, r, fraccion_capacidad, duracion_meses)
+
+
+def controles_red(prefijo):
+    """
+    Interruptor de la difusión en red y sus parámetros: red sintética (grado medio y homofilia) o
+    importada (NURC_RED_ESTUDIANTES por defecto). Devuelve los argumentos de red para
+    `difusion_segmento`, o None si está apagada o el archivo no existe.
+    """
+    if not st.toggle("Difusión en la red social de estudiantes", key=f"{prefijo}_red_activo"):
+        return None
+    ruta = st.text_input("Red importada (.npz de scipy o CSV de aristas; vacío = red sintética)",
+                         os.environ.get("NURC_RED_ESTUDIANTES", ""), key=f"{prefijo}_red_ruta").strip()
+    if ruta:
+        if not os.path.isfile(ruta):
+            st.error("El archivo de la red no existe.")
+            return None
+        return dict(ruta=ruta, modificado=os.path.getmtime(ruta))
+    col1, col2 = st.columns(2)
+    with col1:
+        grado_medio = st.slider("Contactos promedio por estudiante", 10, 100, 40, 10, key=f"{prefijo}_red_grado")
+    with col2:
+        homofilia = st.slider("Contactos dentro del propio grupo", 0.0, 1.0, 0.8, 0.1, key=f"{prefijo}_red_homofilia",
+                              help="0 = red bien mezclada (se aproxima al modelo logístico); 1 = solo dentro del grupo.")
+    return dict(grado_medio=grado_medio, homofilia=homofilia)
+
+
+# --- Valores por defecto calibrados con registros de participación ---
+def directorio_registros():
+    """Directorio de registros elegido en la barra lateral (o en NURC_DATOS_PARTICIPACION)."""
+    return st.session_state.get("directorio_participacion") or os.environ.get("NURC_DATOS_PARTICIPACION", "")
+
+
+@memoizar()
+def _calibracion_guardada(directorio, modificado):
+    return cargar_calibracion(directorio)
+
+
+def valores_por_defecto(clave, tasa_base_adopcion, poblacion_total_urc):
+    """
+    Valores iniciales de los widgets de un segmento. Sin calibración son los de `SEGMENTOS`; con ella,
+    factor = r / tasa base y fracción = K / población, redondeados y recortados a los rangos de los widgets.
+    """
+    valores = {"factor": SEGMENTOS[clave]["factor"], "fraccion_capacidad": SEGMENTOS[clave]["fraccion_capacidad"],
+               "N0": N0_DEFECTO, "calibracion": None}
+    directorio = directorio_registros()
+    ruta = ruta_calibracion(directorio) if directorio else None
+    if ruta is None or not ruta.is_file():
+        return valores
+    calibracion = _calibracion_guardada(directorio, ruta.stat().st_mtime).get(clave)
+    if calibracion:
+        valores["factor"] = float(np.clip(round(calibracion["r"] / tasa_base_adopcion, 1), 0.5, 2.0))
+        valores["fraccion_capacidad"] = float(np.clip(round(round(calibracion["K"] / poblacion_total_urc / 0.05) * 0.05, 2), 0.1, 1.0))
+        valores["N0"] = max(float(calibracion["N0"]), 1.0)
+        valores["calibracion"] = calibracion
+    return valores
+
+
+# --- Panel de perfilado ---
+def panel_perfilado(num_ejecuciones=10):
+    """
+    Expansor de la barra lateral con las últimas reejecuciones medidas: tiempo de pared, de CPU y
+    pico de memoria por sección, y la exportación del historial completo en JSON y CSV.
+    Se llama al final de cada página para que incluya la reejecución en curso.
+    """
+    finalizar_ejecucion()
+    with st.sidebar.expander("Perfilado de reejecuciones"):
+        # tracemalloc es de todo el proceso: se configura al arrancar el servidor, no desde cada sesión
+        estado_memoria = "activo" if memoria_activa() else "inactivo (arranca el servidor con `NURC_PERFILADO_MEMORIA=1`)"
+        st.caption(f"Pico de memoria (tracemalloc): {estado_memoria}")
+        num_ejecuciones = st.slider("Reejecuciones a mostrar", 1, MAX_EJECUCIONES, num_ejecuciones,
+                                    key="perfilado_num_ejecuciones")
+        ejecuciones = historial_perfiles.ultimas(num_ejecuciones)
+        if not ejecuciones:
+            st.write("Aún no hay reejecuciones medidas.")
+            return
+        st.dataframe([{"Página": e.pagina, "Inicio": time.strftime("%H:%M:%S", time.localtime(e.inicio)),
+                       "Pared (ms)": round(e.pared_ms, 1), "CPU (ms)": round(e.cpu_ms, 1)}
+                      for e in reversed(ejecuciones)], hide_index=True)
+        ultima = ejecuciones[-1]
+        st.write(f"Secciones de la última reejecución ({ultima.pagina}):")
+        st.dataframe([{"Sección": "· " * m.nivel + m.seccion, "Pared (ms)": round(m.pared_ms, 1),
+                       "CPU (ms)": round(m.cpu_ms, 1),
+                       "Pico (KiB)": None if m.pico_kib is None else round(m.pico_kib, 1)}
+                      for m in ultima.secciones], hide_index=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", historial_perfiles.exportar_json(), "perfilado.json", "application/json",
+                               key="perfilado_json")
+        with col2:
+            st.download_button("CSV", historial_perfiles.exportar_csv(), "perfilado.csv", "text/csv",
+                               key="perfilado_csv")
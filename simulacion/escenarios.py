@@ -0,0 +1,159 @@
+# simulacion/escenarios.py
+# Evaluación de escenarios fuera de Streamlit: trayectorias, métricas de impacto y scorecard.
+import itertools
+import json
+from pathlib import Path
+
+import numpy as np
+
+from simulacion.logistico import N0_DEFECTO, PUNTOS_MALLA, solucion_logistica
+from simulacion.metricas import evaluar_metricas, metricas_de
+
+PARAMETROS_GLOBALES = {
+    "tasa_base_adopcion": 0.05,
+    "duracion_simulacion": 24,
+    "poblacion_total_urc": 25000,
+}
+
+# Valores por defecto de cada segmento (los mismos que los widgets de las páginas) y sus
+# métricas de impacto como tasa por participante, antes de truncar a entero y acumular
+# (tomadas del registro declarativo de simulacion.metricas).
+SEGMENTOS = {
+    "cultural": {
+        "nombre": "Cultural",
+        "factor": 1.0, "fraccion_capacidad": 0.2, "recompensa": 10,
+        "metricas": {m.nombre: m.tasa for m in metricas_de(("cultural",))},
+    },
+    "ambiental": {
+        "nombre": "Medio Ambiente",
+        "factor": 1.0, "fraccion_capacidad": 0.15, "recompensa": 1.0,
+        "metricas": {m.nombre: m.tasa for m in metricas_de(("ambiental",))},
+    },
+    "academico": {
+        "nombre": "Desempeño Escolar",
+        "factor": 1.0, "fraccion_capacidad": 0.3, "recompensa": 50,
+        "metricas": {m.nombre: m.tasa for m in metricas_de(("academico",))},
+    },
+}
+
+
+# --- Lectura de archivos de escenarios ---
+def _leer_archivo(ruta):
+    ruta = Path(ruta)
+    sufijo = ruta.suffix.lower()
+    if sufijo == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    if sufijo == ".toml":
+        try:
+            import tomllib
+        except ModuleNotFoundError: # Python < 3.11
+            import toml
+            return toml.load(ruta)
+        with open(ruta, "rb") as f:
+            return tomllib.load(f)
+    if sufijo in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ModuleNotFoundError as e:
+            raise RuntimeError("Para leer escenarios en YAML instala PyYAML (pip install pyyaml)") from e
+        with open(ruta, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Formato de escenarios no soportado: {ruta.suffix} (usa .json, .toml o .yaml)")
+
+
+def expandir_malla(malla):
+    """Producto cartesiano de {parametro: [valores]}; las claves 'segmento.param' van a ese segmento."""
+    claves = list(malla)
+    for valores in itertools.product(*(malla[c] for c in claves)):
+        escenario = {}
+        for clave, valor in zip(claves, valores):
+            if "." in clave:
+                segmento, parametro = clave.split(".", 1)
+                escenario.setdefault("segmentos", {}).setdefault(segmento, {})[parametro] = valor
+            else:
+                escenario[clave] = valor
+        yield escenario
+
+
+def normalizar_escenario(escenario, base=None, indice=0):
+    """Completa un escenario con los parámetros globales y de segmento por defecto."""
+    base = base or {}
+    completo = {**PARAMETROS_GLOBALES, **{k: v for k, v in base.items() if k != "segmentos"},
+                **{k: v for k, v in escenario.items() if k != "segmentos"}}
+    completo.setdefault("nombre", f"escenario_{indice}")
+    segmentos = {}
+    for clave, definicion in SEGMENTOS.items():
+        segmentos[clave] = {p: definicion[p] for p in ("factor", "fraccion_capacidad", "recompensa")}
+        segmentos[clave].update(base.get("segmentos", {}).get(clave, {}))
+        segmentos[clave].update(escenario.get("segmentos", {}).get(clave, {}))
+    completo["segmentos"] = segmentos
+    return completo
+
+
+def cargar_escenarios(ruta):
+    """
+    Lee un archivo JSON/TOML/YAML de escenarios. Se acepta una lista de escenarios o un
+    objeto con 'global' (valores base), 'escenarios' (lista) y/o 'malla' (producto cartesiano).
+    """
+    datos = _leer_archivo(ruta)
+    if isinstance(datos, list):
+        datos = {"escenarios": datos}
+    base = datos.get("global", {})
+    escenarios = list(datos.get("escenarios", []))
+    if "malla" in datos:
+        escenarios.extend(expandir_malla(datos["malla"]))
+    if not escenarios:
+        escenarios = [{}]
+    return [normalizar_escenario(e, base, i) for i, e in enumerate(escenarios)]
+
+
+# --- Evaluación vectorizada de un lote de escenarios ---
+def evaluar_escenarios(escenarios, puntos_malla=PUNTOS_MALLA, N0=N0_DEFECTO, incluir_trayectorias=False):
+    """
+    Evalúa un lote de escenarios normalizados de una sola vez (forma escenarios × segmentos × tiempo).
+    Devuelve un dict de columnas con parámetros, participantes finales, métricas de impacto
+    acumuladas y puntajes; con `incluir_trayectorias` añade las curvas completas.
+    """
+    claves = list(SEGMENTOS)
+    tasa = np.array([e["tasa_base_adopcion"] for e in escenarios], dtype=float)
+    duracion = np.array([e["duracion_simulacion"] for e in escenarios], dtype=float)
+    poblacion = np.array([e["poblacion_total_urc"] for e in escenarios], dtype=float)
+    factor = np.array([[e["segmentos"][c]["factor"] for c in claves] for e in escenarios], dtype=float)
+    fraccion = np.array([[e["segmentos"][c]["fraccion_capacidad"] for c in claves] for e in escenarios], dtype=float)
+    recompensa = np.array([[e["segmentos"][c]["recompensa"] for c in claves] for e in escenarios], dtype=float)
+    # Un segmento puede fijar su propia población inicial (p. ej. la calibrada con registros); si no, se usa `N0`
+    n0 = np.array([[e["segmentos"][c].get("N0", N0) for c in claves] for e in escenarios], dtype=float)
+
+    # N(t) solo depende de r·t, así que cada escenario usa su malla t = duración · u con u ∈ [0, 1]
+    u = np.linspace(0, 1, puntos_malla)
+    r_efectiva = (tasa[:, None] * factor) * duracion[:, None]
+    participantes = solucion_logistica(n0, r_efectiva, fraccion * poblacion[:, None], u) # (E, S, T)
+
+    columnas = {
+        "nombre": [e["nombre"] for e in escenarios],
+        "tasa_base_adopcion": tasa,
+        "duracion_simulacion": duracion.astype(np.int32),
+        "poblacion_total_urc": poblacion.astype(np.int64),
+    }
+    # Todas las métricas de todos los segmentos y escenarios en una sola pasada: (E, M, T)
+    valores_metricas, metricas = evaluar_metricas(participantes, claves)
+    score_total = np.zeros(len(escenarios), dtype=np.int64)
+    for s, clave in enumerate(claves):
+        columnas[f"{clave}_factor"] = factor[:, s]
+        columnas[f"{clave}_fraccion_capacidad"] = fraccion[:, s]
+        columnas[f"{clave}_recompensa"] = recompensa[:, s]
+        columnas[f"{clave}_participantes_finales"] = participantes[:, s, -1]
+        for m, metrica in enumerate(metricas):
+            if metrica.segmento == clave:
+                sufijo = "acum" if metrica.agregacion == "acumulada" else "final"
+                columnas[f"{clave}_{metrica.nombre}_{sufijo}"] = valores_metricas[:, m, -1]
+        score = np.floor(participantes[:, s, -1] / poblacion * 1000).astype(np.int64)
+        columnas[f"score_{clave}"] = score
+        score_total += score
+    columnas["score_total"] = score_total
+
+    if incluir_trayectorias:
+        columnas["_trayectorias"] = participantes
+        columnas["_meses"] = duracion[:, None] * u
+    return columnas
@@ -0,0 +1,107 @@
+# simulacion/estocastico.py
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.logistico import solucion_logistica
+
+PERCENTILES = (5, 50, 95)
+MODOS_ESTOCASTICOS = ("parametros", "sde")
+
+
+@dataclass
+class BandasMontecarlo:
+    """Percentiles P5/P50/P95 de las trayectorias; cada arreglo tiene forma `forma_parametros + (len(t),)`."""
+    t: np.ndarray
+    p5: np.ndarray
+    p50: np.ndarray
+    p95: np.ndarray
+    num_trayectorias: int
+
+
+# --- Generación de un bloque de trayectorias (se ejecuta en los procesos de trabajo) ---
+def _bloque_trayectorias(semilla, n, N0, r, K, t, sigma_r, sigma_K, sigma_ruido, modo):
+    """
+    Genera `n` trayectorias por cada combinación de parámetros, como float32 con forma
+    `r.shape + (n, len(t))`. Cada trayectoria tiene su propio r y K con ruido lognormal
+    (media 1); en modo 'sde' se añade además ruido multiplicativo σ·N·dW por paso.
+    """
+    rng = np.random.default_rng(semilla)
+    forma = r.shape + (n,)
+    r_tray = r[..., None] * rng.lognormal(-sigma_r ** 2 / 2, sigma_r, forma)
+    K_tray = K[..., None] * rng.lognormal(-sigma_K ** 2 / 2, sigma_K, forma)
+    N0_tray = np.broadcast_to(N0[..., None], forma)
+
+    if modo == "parametros":
+        return solucion_logistica(N0_tray, r_tray, K_tray, t).astype(np.float32)
+
+    # Euler–Maruyama vectorizado sobre todas las trayectorias: dN = rN(1 - N/K)dt + σN dW
+    trayectorias = np.empty(forma + (len(t),), dtype=np.float32)
+    N = N0_tray.astype(float)
+    trayectorias[..., 0] = N
+    for k, dt in enumerate(np.diff(t), start=1):
+        dW = rng.standard_normal(forma) * np.sqrt(dt)
+        N = N + r_tray * N * (1 - N / K_tray) * dt + sigma_ruido * N * dW
+        np.maximum(N, 0.0, out=N)
+        trayectorias[..., k] = N
+    return trayectorias
+
+
+# --- Grupo de procesos reutilizado entre ejecuciones de la página ---
+# Un solo grupo del tamaño de la máquina, compartido por todas las sesiones: nunca se redimensiona
+# (cerrarlo mientras otra sesión lo usa hace fallar sus envíos); con menos bloques, `map` envía menos tareas.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 'spawn' evita copiar con fork el estado de los hilos del servidor de Streamlit
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@atexit.register
+def _cerrar_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def simular_montecarlo(N0, r, K, t, num_trayectorias=20000, sigma_r=0.2, sigma_K=0.1,
+                       sigma_ruido=0.0, modo="parametros", semilla=42, tam_bloque=5000, procesos=None):
+    """
+    Adopción estocástica por Monte Carlo con bandas de percentiles.
+
+    N0, r y K se combinan por broadcasting (p. ej. un arreglo por segmento). Las trayectorias
+    se generan en bloques de `tam_bloque`; cada bloque recibe una semilla derivada de
+    `semilla`, por lo que el resultado no depende del número de procesos. Con más de un
+    bloque y más de un núcleo, los bloques se reparten en un `ProcessPoolExecutor`.
+    """
+    if modo not in MODOS_ESTOCASTICOS:
+        raise ValueError(f"Modo estocástico desconocido: {modo!r}. Opciones: {MODOS_ESTOCASTICOS}")
+    N0, r, K = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (N0, r, K)))
+    t = np.asarray(t, dtype=float)
+
+    tamanos = [tam_bloque] * (num_trayectorias // tam_bloque)
+    if num_trayectorias % tam_bloque:
+        tamanos.append(num_trayectorias % tam_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    argumentos = [(s, n, N0, r, K, t, sigma_r, sigma_K, sigma_ruido, modo) for s, n in zip(semillas, tamanos)]
+
+    procesos = min(procesos or os.cpu_count() or 1, len(tamanos))
+    if procesos > 1:
+        bloques = list(_obtener_pool().map(_bloque_trayectorias, *zip(*argumentos)))
+    else:
+        bloques = [_bloque_trayectorias(*a) for a in argumentos]
+
+    trayectorias = np.concatenate(bloques, axis=-2)
+    p5, p50, p95 = np.percentile(trayectorias, PERCENTILES, axis=-2)
+    return BandasMontecarlo(t, p5, p50, p95, num_trayectorias)
@@ -0,0 +1,146 @@
+# simulacion/factores.py
+# Análisis de factores fuera de memoria: PCA y regresión lineal sobre encuestas leídas por bloques desde disco.
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.importaciones import importar
+
+FACTORES = ['Confianza Usuario', 'Digitalización', 'Regulaciones (escala 1-10)', 'Marketing/Promoción']
+OBJETIVO = 'Aceptación Moneda (%)'
+TAM_BLOQUE = 250_000 # Filas por bloque leído del archivo
+TAM_MUESTRA = 5_000 # Filas que se conservan (muestreo uniforme) para las gráficas
+
+
+# --- Lectura por bloques ---
+def iterar_bloques(ruta, columnas, tam_bloque=TAM_BLOQUE):
+    """Recorre un CSV o Parquet en DataFrames de `tam_bloque` filas con solo `columnas`, sin cargarlo completo."""
+    if str(ruta).lower().endswith((".parquet", ".pq")):
+        pq = importar("pyarrow.parquet")
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tam_bloque, columns=list(columnas)):
+            yield lote.to_pandas()
+    else:
+        pd = importar("pandas")
+        yield from pd.read_csv(ruta, usecols=list(columnas), chunksize=tam_bloque)
+
+
+# --- Estadísticos suficientes acumulados bloque a bloque ---
+class MomentosIncrementales:
+    """
+    Media y matriz de co-momentos (suma de productos centrados) de varias columnas.
+    Cada bloque se resume por separado y se combina con la fórmula de Chan et al., que es
+    numéricamente estable y da el mismo resultado que calcular sobre todos los datos juntos.
+    """
+
+    def __init__(self, num_columnas):
+        self.n = 0
+        self.media = np.zeros(num_columnas)
+        self.comomentos = np.zeros((num_columnas, num_columnas))
+
+    def actualizar(self, datos):
+        datos = np.asarray(datos, dtype=float)
+        m = len(datos)
+        if m == 0:
+            return
+        media_bloque = datos.mean(axis=0)
+        centrado = datos - media_bloque
+        delta = media_bloque - self.media
+        total = self.n + m
+        self.comomentos += centrado.T @ centrado + np.outer(delta, delta) * (self.n * m / total)
+        self.media += delta * (m / total)
+        self.n = total
+
+    def covarianza(self):
+        return self.comomentos / (self.n - 1)
+
+
+@dataclass
+class ResultadoFactores:
+    """PCA y regresión ajustados sobre todas las filas; `muestra` es un subconjunto uniforme para graficar."""
+    num_filas: int
+    media_factores: np.ndarray
+    componentes: np.ndarray # (num_componentes, num_factores), misma convención de signo que sklearn
+    varianza_explicada: np.ndarray # Proporción de la varianza total por componente
+    coeficientes: np.ndarray
+    intercepto: float
+    muestra: object # pandas.DataFrame
+
+    def transformar(self, X):
+        """Proyecta filas de factores sobre las componentes principales."""
+        return (np.asarray(X, dtype=float) - self.media_factores) @ self.componentes.T
+
+
+def analisis_factores_incremental(bloques, factores=FACTORES, objetivo=OBJETIVO, predictores=FACTORES[:1],
+                                  num_componentes=2, tam_muestra=TAM_MUESTRA, semilla=42):
+    """
+    Ajusta en una sola pasada sobre `bloques` (DataFrames) el PCA de `factores` y la regresión
+    lineal de `objetivo` sobre `predictores`. Solo se mantienen en memoria un bloque, la matriz de
+    co-momentos y una muestra de `tam_muestra` filas, así que el tamaño del archivo no importa.
+    """
+    pd = importar("pandas")
+    columnas = list(dict.fromkeys([*factores, objetivo, *predictores]))
+    momentos = MomentosIncrementales(len(columnas))
+    rng = np.random.default_rng(semilla)
+    muestra, claves_muestra = None, np.empty(0)
+    for bloque in bloques:
+        momentos.actualizar(bloque[columnas].to_numpy(dtype=float))
+        # Muestreo uniforme sin reemplazo: se conservan las filas con las claves aleatorias más pequeñas
+        claves = np.concatenate([claves_muestra, rng.random(len(bloque))])
+        candidatas = bloque[columnas] if muestra is None else pd.concat([muestra, bloque[columnas]], ignore_index=True)
+        if len(claves) > tam_muestra:
+            elegidas = np.sort(np.argpartition(claves, tam_muestra)[:tam_muestra])
+            candidatas, claves = candidatas.iloc[elegidas].reset_index(drop=True), claves[elegidas]
+        muestra, claves_muestra = candidatas, claves
+    if momentos.n < 2:
+        raise ValueError("Se necesitan al menos dos filas para el análisis de factores.")
+
+    indice = {columna: i for i, columna in enumerate(columnas)}
+    covarianza = momentos.covarianza()
+
+    # PCA: eigendescomposición de la covarianza de los factores
+    f = [indice[c] for c in factores]
+    valores, vectores = np.linalg.eigh(covarianza[np.ix_(f, f)])
+    orden = np.argsort(valores)[::-1][:num_componentes]
+    componentes = vectores[:, orden].T
+    # Misma convención de signo que sklearn: el mayor coeficiente (en valor absoluto) de cada componente es positivo
+    signos = np.sign(componentes[np.arange(len(componentes)), np.abs(componentes).argmax(axis=1)])
+    componentes *= signos[:, None]
+
+    # Regresión de mínimos cuadrados con intercepto a partir de las mismas covarianzas
+    p, y = [indice[c] for c in predictores], indice[objetivo]
+    coeficientes = np.linalg.solve(covarianza[np.ix_(p, p)], covarianza[p, y])
+    intercepto = momentos.media[y] - momentos.media[p] @ coeficientes
+
+    return ResultadoFactores(
+        num_filas=momentos.n,
+        media_factores=momentos.media[f],
+        componentes=componentes,
+        varianza_explicada=valores[orden] / valores.sum(),
+        coeficientes=coeficientes,
+        intercepto=float(intercepto),
+        muestra=muestra,
+    )
+
+
+# --- Encuesta sintética para pruebas de volumen ---
+def generar_encuesta_sintetica(ruta, num_filas, tam_bloque=TAM_BLOQUE, semilla=42):
+    """Escribe en Parquet, bloque a bloque, una encuesta con el mismo modelo que los datos simulados de la página."""
+    pa = importar("pyarrow")
+    pq = importar("pyarrow.parquet")
+    rng = np.random.default_rng(semilla)
+    escritor = None
+    try:
+        for inicio in range(0, num_filas, tam_bloque):
+            n = min(tam_bloque, num_filas - inicio)
+            confianza, digitalizacion = rng.random(n) * 100, rng.random(n) * 100
+            regulaciones, marketing = rng.random(n) * 10, rng.random(n) * 50
+            aceptacion = np.clip(0.5 * confianza + 0.3 * digitalizacion - 2 * regulaciones +
+                                 0.8 * marketing + rng.standard_normal(n) * 10, 0, 100)
+            tabla = pa.table(dict(zip([*FACTORES, OBJETIVO], [confianza, digitalizacion, regulaciones, marketing, aceptacion])))
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
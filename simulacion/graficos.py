@@ -0,0 +1,120 @@
+# simulacion/graficos.py
+import numpy as np
+
+from simulacion.importaciones import importar
+
+
+def _rgba(color_hex, alpha):
+    color_hex = color_hex.lstrip("#")
+    r, g, b = (int(color_hex[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgba({r},{g},{b},{alpha})"
+
+
+# --- Bandas de incertidumbre (Monte Carlo) ---
+def figura_con_bandas(fig, bandas, nombres, colores=None):
+    """
+    Devuelve una copia de `fig` con las bandas P5–P95 y la mediana P50 de `bandas`.
+    `nombres` es una lista con una etiqueta por fila de las bandas (una por segmento).
+    La figura original no se modifica, ya que puede provenir de la caché.
+    """
+    px, go = importar("plotly.express"), importar("plotly.graph_objects")
+    fig = go.Figure(fig)
+    colores = colores or px.colors.qualitative.Plotly
+    p5, p50, p95 = (b.reshape(-1, len(bandas.t)) for b in (bandas.p5, bandas.p50, bandas.p95))
+    for i, nombre in enumerate(nombres):
+        color = colores[i % len(colores)]
+        fig.add_trace(go.Scatter(x=bandas.t, y=p95[i], mode="lines", line=dict(width=0),
+                                 showlegend=False, hoverinfo="skip", legendgroup=f"mc_{nombre}"))
+        fig.add_trace(go.Scatter(x=bandas.t, y=p5[i], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor=_rgba(color, 0.2),
+                                 name=f"{nombre} P5–P95", legendgroup=f"mc_{nombre}"))
+        fig.add_trace(go.Scatter(x=bandas.t, y=p50[i], mode="lines", line=dict(color=color, dash="dash"),
+                                 name=f"{nombre} P50", legendgroup=f"mc_{nombre}"))
+    return fig
+
+
+def figura_con_serie(fig, x, y, nombre, color=None, dash="dot"):
+    """Devuelve una copia de `fig` con una serie adicional superpuesta (p. ej. la curva por agentes)."""
+    px, go = importar("plotly.express"), importar("plotly.graph_objects")
+    fig = go.Figure(fig)
+    fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=nombre,
+                             line=dict(color=color or px.colors.qualitative.Plotly[1], dash=dash)))
+    return fig
+
+
+# --- Reducción de puntos para series largas ---
+MAX_PUNTOS_SERIE = 1500 # Puntos por serie que se envían al navegador
+UMBRAL_WEBGL = 5000 # Puntos totales de la figura a partir de los cuales se usa WebGL
+
+
+def lttb_indices(x, y, num_salida):
+    """
+    Índices que conserva el algoritmo Largest-Triangle-Three-Buckets: divide la serie en
+    cubetas y de cada una toma el punto que forma el triángulo de mayor área con el punto
+    elegido en la cubeta anterior y el promedio de la siguiente. Mantiene picos y quiebres.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if num_salida >= n or num_salida < 3:
+        return np.arange(n)
+    indices = np.empty(num_salida, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    bordes = np.linspace(1, n - 1, num_salida - 1).astype(np.int64)
+    # Promedios de cada cubeta calculados de una vez con sumas acumuladas
+    suma_x = np.concatenate(([0.0], np.cumsum(x)))
+    suma_y = np.concatenate(([0.0], np.cumsum(y)))
+    limites = np.append(bordes, n)
+    tam = np.diff(limites)
+    prom_x = (suma_x[limites[1:]] - suma_x[limites[:-1]]) / tam
+    prom_y = (suma_y[limites[1:]] - suma_y[limites[:-1]]) / tam
+    a = 0
+    for i in range(num_salida - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        xs, ys = x[inicio:fin], y[inicio:fin]
+        areas = np.abs((x[a] - prom_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (prom_y[i + 1] - y[a]))
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+
+def optimizar_figura(fig, max_puntos=MAX_PUNTOS_SERIE, umbral_webgl=UMBRAL_WEBGL):
+    """
+    Prepara una figura de líneas/áreas para enviarla al navegador:
+    - reduce cada serie a `max_puntos` con LTTB (las áreas apiladas comparten los mismos
+      índices, calculados sobre la envolvente, para que sigan alineadas);
+    - si la figura sigue teniendo más de `umbral_webgl` puntos, pasa las líneas a `scattergl`;
+    - envía x e y como arreglos float32, que plotly serializa en binario compacto.
+    Modifica y devuelve `fig`.
+    """
+    go = importar("plotly.graph_objects")
+    trazas = list(fig.data)
+    grupos = {}
+    for i, traza in enumerate(trazas):
+        if traza.type == "scatter" and traza.x is not None and traza.y is not None:
+            grupos.setdefault(traza.stackgroup or f"_serie_{i}", []).append(i)
+
+    for miembros in grupos.values():
+        x = np.asarray(trazas[miembros[0]].x, dtype=float)
+        if x.size > max_puntos:
+            envolvente = np.sum([np.asarray(trazas[i].y, dtype=float) for i in miembros], axis=0)
+            indices = lttb_indices(x, envolvente, max_puntos)
+        else:
+            indices = slice(None)
+        for i in miembros:
+            trazas[i].x = np.asarray(trazas[i].x, dtype=float)[indices].astype(np.float32)
+            trazas[i].y = np.asarray(trazas[i].y, dtype=float)[indices].astype(np.float32)
+
+    puntos = sum(len(t.x) for t in trazas if t.type == "scatter" and t.x is not None)
+    if puntos > umbral_webgl:
+        for i, traza in enumerate(trazas):
+            if traza.type == "scatter" and not traza.stackgroup and not traza.fill:
+                datos = traza.to_plotly_json()
+                datos.pop("type", None)
+                datos.setdefault("line", {}).pop("shape", None) # scattergl no admite 'spline'
+                if len(traza.x) > max_puntos // 4:
+                    datos["mode"] = "lines" # Los marcadores no aportan con series tan densas
+                trazas[i] = go.Scattergl(datos, skip_invalid=True) # Descarta propiedades sin equivalente en WebGL
+        fig.data = ()
+        fig.add_traces(trazas)
+    return fig
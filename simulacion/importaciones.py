@@ -0,0 +1,112 @@
+# simulacion/importaciones.py
+# Importaciones diferidas de las bibliotecas científicas pesadas, precarga por proceso
+# y reporte del costo de importación de cada página.
+import importlib
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Módulos costosos que solo algunas secciones necesitan
+MODULOS_PESADOS = (
+    "pandas",
+    "plotly.express",
+    "scipy.integrate",
+    "sklearn.decomposition",
+    "sklearn.linear_model",
+    "pyarrow.parquet",
+)
+
+# Tiempo (ms) de la primera importación de cada módulo en este proceso y quién la disparó
+TIEMPOS_IMPORTACION = {}
+_lock = threading.Lock()
+_precarga = None
+# Serializa las importaciones diferidas con la precarga: algunas bibliotecas (p. ej. plotly)
+# consultan sys.modules directamente y fallarían al ver un módulo a medio inicializar.
+_lock_importacion = threading.RLock()
+
+
+def importar(nombre, atributo=None, origen=None):
+    """
+    Importa `nombre` en el momento en que se necesita y registra cuánto tardó la primera vez.
+    Con `atributo` devuelve ese atributo del módulo (p. ej. importar("sklearn.decomposition", "PCA")).
+    """
+    modulo = sys.modules.get(nombre)
+    if modulo is None or getattr(getattr(modulo, "__spec__", None), "_initializing", False):
+        with _lock_importacion:
+            ya_importado = nombre in sys.modules
+            inicio = time.perf_counter()
+            modulo = importlib.import_module(nombre)
+            if not ya_importado:
+                with _lock:
+                    TIEMPOS_IMPORTACION.setdefault(nombre, {"ms": (time.perf_counter() - inicio) * 1000,
+                                                             "origen": origen or threading.current_thread().name})
+    return getattr(modulo, atributo) if atributo else modulo
+
+
+def precargar(modulos=MODULOS_PESADOS):
+    for nombre in modulos:
+        importar(nombre, origen="precarga")
+
+
+def iniciar_precarga(modulos=MODULOS_PESADOS):
+    """
+    Precarga los módulos pesados en un hilo en segundo plano, una sola vez por proceso del
+    servidor. Si una página los pide antes de que termine, el candado de importación de
+    Python la hace esperar a la importación en curso en lugar de repetirla.
+    """
+    global _precarga
+    if os.environ.get("NURC_SIN_PRECARGA"): # Lo usa el reporte de arranque para medir solo cada página
+        return None
+    with _lock:
+        if _precarga is None:
+            _precarga = threading.Thread(target=precargar, args=(modulos,), name="precarga", daemon=True)
+            _precarga.start()
+    return _precarga
+
+
+# --- Reporte de arranque por página ---
+_CODIGO_PAGINA = """
+import sys
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({pagina!r}, default_timeout=120)
+print("--- inicio de la página ---", file=sys.stderr, flush=True)
+app.run()
+"""
+_LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def costo_importacion_pagina(pagina, raiz):
+    """
+    Ejecuta `pagina` en un intérprete nuevo con `-X importtime` (con Streamlit ya importado)
+    y devuelve {módulo de primer nivel: ms acumulados} de lo que importa la propia página.
+    """
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                             _CODIGO_PAGINA.format(raiz=str(raiz), pagina=str(Path(raiz) / pagina))],
+                            capture_output=True, text=True, cwd=raiz,
+                            env={**os.environ, "NURC_SIN_PRECARGA": "1"})
+    _, _, registro = salida.stderr.partition("--- inicio de la página ---")
+    costos = {}
+    for linea in registro.splitlines():
+        coincidencia = _LINEA_IMPORTTIME.match(linea)
+        if coincidencia and len(coincidencia.group(3)) == 1: # Solo importaciones de primer nivel
+            costos[coincidencia.group(4)] = costos.get(coincidencia.group(4), 0) + int(coincidencia.group(2)) / 1000
+    return costos
+
+
+def reporte_arranque(raiz=None, paginas=None, top=5):
+    raiz = Path(raiz or Path(__file__).resolve().parent.parent)
+    paginas = paginas or ["app.py"] + sorted(str(p.relative_to(raiz)) for p in (raiz / "pages").glob("*.py"))
+    for pagina in paginas:
+        costos = costo_importacion_pagina(pagina, raiz)
+        principales = sorted(costos.items(), key=lambda item: -item[1])[:top]
+        detalle = ", ".join(f"{nombre} {ms:.0f} ms" for nombre, ms in principales)
+        print(f"{pagina:<34} {sum(costos.values()):8.0f} ms   {detalle}")
+
+
+if __name__ == "__main__":
+    reporte_arranque()
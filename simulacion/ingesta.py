@@ -0,0 +1,319 @@
+# simulacion/ingesta.py
+# Ingesta incremental de registros de participación (estudiante, segmento, fecha) y calibración por segmento.
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from simulacion.calibracion import DIRECTORIO_ESTADO, calibrar_cohortes, ruta_calibracion
+from simulacion.escenarios import SEGMENTOS
+
+COLUMNAS_EVENTOS = ("estudiante", "segmento", "fecha")
+EXTENSIONES = (".csv", ".parquet")
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+ARCHIVO_PARES = "claves.npy" # Claves únicas (segmento, mes, estudiante) ordenadas
+ARCHIVO_ESTUDIANTES = "estudiantes.parquet" # Identificadores no numéricos, en el orden en que se numeraron
+MIN_MESES_AJUSTE = 3
+TAM_BLOQUE_CSV = 1 << 24 # Bytes por bloque al leer CSV
+
+# Un segmento se reconoce por su clave ("cultural") o por su nombre ("Cultural"), sin distinguir mayúsculas
+_CLAVES_SEGMENTO = list(SEGMENTOS)
+_VALORES_SEGMENTO = pa.array([c.lower() for c in _CLAVES_SEGMENTO] +
+                             [SEGMENTOS[c]["nombre"].lower() for c in _CLAVES_SEGMENTO])
+
+
+# --- Codificación compacta: segmento (8 bits) | mes absoluto (16 bits) | estudiante (40 bits) ---
+# Los estudiantes con identificador entero entre 0 y 2³² - 1 ocupan su propio número; los demás
+# ('A001' o enteros fuera de rango) reciben uno correlativo desde 2³² en el diccionario de estudiantes
+_BITS_ESTUDIANTE = np.uint64(40)
+_BITS_SEGMENTO = np.uint64(56)
+_PRIMER_ID_DICCIONARIO = 1 << 32
+
+
+def _codificar(segmento, mes, estudiante):
+    return ((segmento.astype(np.uint64) << _BITS_SEGMENTO) | (mes.astype(np.uint64) << _BITS_ESTUDIANTE)
+            | estudiante.astype(np.uint64))
+
+
+def _decodificar(claves):
+    segmento = (claves >> _BITS_SEGMENTO).astype(np.int64)
+    mes = ((claves >> _BITS_ESTUDIANTE) & np.uint64(0xFFFF)).astype(np.int64)
+    return segmento, mes
+
+
+class _DiccionarioEstudiantes:
+    """Numeración persistente de los identificadores no numéricos: dos textos distintos nunca comparten número."""
+
+    def __init__(self, ruta, reiniciar=False):
+        self.ruta = ruta
+        valores = [] if reiniciar or not ruta.is_file() else pq.read_table(ruta).column("estudiante").to_pylist()
+        self.indices = {valor: i for i, valor in enumerate(valores)}
+        self.modificado = reiniciar
+
+    def id(self, valor):
+        if valor.isascii() and valor.isdigit() and int(valor) < _PRIMER_ID_DICCIONARIO:
+            return int(valor)
+        indice = self.indices.get(valor)
+        if indice is None:
+            indice = self.indices[valor] = len(self.indices)
+            self.modificado = True
+        return _PRIMER_ID_DICCIONARIO + indice
+
+    def guardar(self):
+        if not self.modificado:
+            return
+        temporal = self.ruta.with_name(self.ruta.name + ".tmp")
+        pq.write_table(pa.table({"estudiante": pa.array(list(self.indices), type=pa.string())}), temporal)
+        os.replace(temporal, self.ruta)
+        self.modificado = False
+
+
+def _ids_estudiante(columna, diccionario):
+    """
+    Identificadores de una columna de estudiantes (uint64) y la máscara de filas con identificador.
+    Los enteros entre 0 y 2³² - 1 se usan tal cual; los alfanuméricos ('A001') o fuera de rango se
+    numeran con `diccionario`, una sola vez por valor distinto del lote.
+    """
+    try: # Caso común: todos los identificadores son enteros en rango (también como texto en los CSV)
+        return pc.fill_null(pc.cast(columna, pa.uint32()), 0).to_numpy().astype(np.uint64), pc.is_valid(columna)
+    except pa.ArrowInvalid:
+        pass
+    codificada = pc.dictionary_encode(pc.utf8_trim_whitespace(pc.cast(columna, pa.string())))
+    distintos = codificada.dictionary.to_pylist()
+    if not distintos: # Ninguna fila trae estudiante
+        return np.zeros(len(columna), dtype=np.uint64), pa.array(np.zeros(len(columna), dtype=bool))
+    ids_distintos = np.array([diccionario.id(valor) if valor else 0 for valor in distintos], dtype=np.uint64)
+    no_vacios = np.array([valor != "" for valor in distintos])
+    indices = pc.fill_null(codificada.indices, 0).to_numpy()
+    return ids_distintos[indices], pc.and_(pc.is_valid(codificada.indices), pa.array(no_vacios[indices]))
+
+
+def _claves_lote(lote, diccionario):
+    """
+    Claves únicas (segmento, mes, estudiante) de un RecordBatch; descarta (y cuenta) las filas con
+    segmento desconocido, sin fecha o sin estudiante.
+    """
+    codigo = pc.index_in(pc.utf8_lower(pc.cast(lote.column("segmento"), pa.string())), value_set=_VALORES_SEGMENTO)
+    fecha = lote.column("fecha")
+    if not pa.types.is_timestamp(fecha.type):
+        fecha = pc.cast(fecha, pa.timestamp("s"))
+    mes = pc.add(pc.multiply(pc.year(fecha), 12), pc.subtract(pc.month(fecha), 1))
+    estudiante, con_estudiante = _ids_estudiante(lote.column("estudiante"), diccionario)
+    validas = pc.and_(pc.and_(pc.is_valid(codigo), pc.is_valid(mes)), con_estudiante)
+    codigo = pc.filter(codigo, validas).to_numpy() % len(_CLAVES_SEGMENTO)
+    mes = pc.filter(mes, validas).to_numpy()
+    estudiante = estudiante[validas.to_numpy(zero_copy_only=False)]
+    return np.unique(_codificar(codigo, mes, estudiante)), len(lote) - len(codigo)
+
+
+# --- Lectura de los archivos (mapeados en memoria) ---
+def _ultimo_salto_linea(mapa, tamano, trozo=1 << 16):
+    """Posición siguiente al último '\n' del archivo mapeado (las líneas incompletas se leen en la próxima ingesta)."""
+    fin = tamano
+    while fin > 0:
+        inicio = max(0, fin - trozo)
+        mapa.seek(inicio)
+        posicion = mapa.read(fin - inicio).rfind(b"\n")
+        if posicion >= 0:
+            return inicio + posicion + 1
+        fin = inicio
+    return 0
+
+
+def _verificar_columnas(columnas, origen):
+    faltantes = [c for c in COLUMNAS_EVENTOS if c not in columnas]
+    if faltantes:
+        raise pa.ArrowKeyError(f"Faltan las columnas {', '.join(faltantes)} en {origen}")
+
+
+def _abrir_registros(ruta, desde_byte=0):
+    """
+    Abre un archivo de registros y devuelve `(byte_final, lotes)`. Los Parquet se leen completos;
+    los CSV desde `desde_byte` hasta la última línea completa, sin copiar el archivo a memoria.
+    """
+    if ruta.suffix.lower() == ".parquet":
+        archivo = pq.ParquetFile(ruta, memory_map=True)
+        _verificar_columnas(archivo.schema_arrow.names, "el esquema del Parquet")
+        return ruta.stat().st_size, archivo.iter_batches(columns=list(COLUMNAS_EVENTOS))
+    mapa = pa.memory_map(str(ruta))
+    fin = _ultimo_salto_linea(mapa, mapa.size())
+    if fin <= desde_byte:
+        return desde_byte, iter(())
+    mapa.seek(0)
+    encabezado = mapa.read(1 << 16).split(b"\n", 1)[0].decode("utf-8").strip().split(",")
+    # Se valida antes de abrir el lector: si `open_csv` rechaza `include_columns`, pyarrow aborta el
+    # proceso al salir ("terminate called without an active exception")
+    _verificar_columnas(encabezado, "el encabezado del CSV")
+    lector = pa_csv.open_csv(
+        pa.BufferReader(mapa.read_at(fin - desde_byte, desde_byte)),
+        read_options=pa_csv.ReadOptions(column_names=encabezado, skip_rows=1 if desde_byte == 0 else 0,
+                                        block_size=TAM_BLOQUE_CSV),
+        convert_options=pa_csv.ConvertOptions(include_columns=list(COLUMNAS_EVENTOS),
+                                              column_types={"fecha": pa.timestamp("s"), "segmento": pa.string(),
+                                                            "estudiante": pa.string()}),
+    )
+    return fin, lector
+
+
+@dataclass
+class ResumenIngesta:
+    archivos_procesados: int
+    bytes_leidos: int
+    claves_nuevas: int
+    filas_descartadas: int
+    reconstruido: bool
+    segundos: float
+    errores: dict = field(default_factory=dict) # Archivo -> mensaje de los archivos que no se pudieron leer
+
+
+def ingerir(directorio_registros):
+    """
+    Incorpora al estado agregado los registros nuevos de `directorio_registros` (*.csv, *.parquet).
+
+    El estado vive en `<directorio>/.nurc_ingesta/`: un manifiesto con los bytes ya leídos de cada
+    archivo, el arreglo ordenado de claves únicas (segmento, mes, estudiante) y la numeración de
+    los identificadores no numéricos. Los Parquet se
+    tratan como inmutables (un archivo por periodo) y los CSV pueden crecer por el final: solo se
+    lee lo que se anexó desde la última ingesta. Si un archivo ya procesado cambia de otra forma,
+    el estado se reconstruye desde cero.
+    """
+    inicio = time.perf_counter()
+    directorio = Path(directorio_registros)
+    estado = directorio / DIRECTORIO_ESTADO
+    estado.mkdir(exist_ok=True)
+    ruta_manifiesto, ruta_pares = estado / ARCHIVO_MANIFIESTO, estado / ARCHIVO_PARES
+    manifiesto = json.loads(ruta_manifiesto.read_text(encoding="utf-8")) if ruta_manifiesto.is_file() else {}
+
+    archivos = sorted(p for p in directorio.iterdir() if p.is_file() and p.suffix.lower() in EXTENSIONES)
+    reconstruir = any(
+        nombre not in {p.name for p in archivos}
+        or (registro["tipo"] == "parquet" and registro["bytes"] != (directorio / nombre).stat().st_size)
+        or (registro["tipo"] == "csv" and registro["bytes"] > (directorio / nombre).stat().st_size)
+        for nombre, registro in manifiesto.items()
+    ) or (bool(manifiesto) and not ruta_pares.is_file()) # Estado sin claves (o con el formato anterior)
+    if reconstruir:
+        manifiesto = {}
+    diccionario = _DiccionarioEstudiantes(estado / ARCHIVO_ESTUDIANTES, reiniciar=reconstruir)
+
+    nuevas, procesados, bytes_leidos, descartadas, errores = [], 0, 0, 0, {}
+    for ruta in archivos:
+        registro = manifiesto.get(ruta.name)
+        tamano = ruta.stat().st_size
+        if registro is not None and registro["bytes"] == tamano:
+            continue
+        desde = registro["bytes"] if registro and ruta.suffix.lower() == ".csv" else 0
+        claves_archivo, descartadas_archivo, lotes = [], 0, None
+        try:
+            fin, lotes = _abrir_registros(ruta, desde)
+            for lote in lotes:
+                claves, filas_descartadas = _claves_lote(lote, diccionario)
+                claves_archivo.append(claves)
+                descartadas_archivo += filas_descartadas
+        except (pa.ArrowException, UnicodeDecodeError) as error:
+            # Un archivo ilegible (fechas mal formadas, columnas faltantes o un encabezado que no es UTF-8)
+            # no detiene la ingesta de los demás; no entra al manifiesto, así que se vuelve a intentar
+            # en la siguiente ingesta
+            errores[ruta.name] = str(error)
+            continue
+        finally:
+            if hasattr(lotes, "close"): # Lector de CSV por bloques o generador de lotes Parquet
+                lotes.close()
+        nuevas.extend(claves_archivo)
+        descartadas += descartadas_archivo
+        manifiesto[ruta.name] = {"tipo": ruta.suffix.lower().lstrip("."), "bytes": int(fin)}
+        procesados += 1
+        bytes_leidos += fin - desde
+
+    existentes = np.empty(0, dtype=np.uint64)
+    if ruta_pares.is_file() and not reconstruir:
+        existentes = np.load(ruta_pares, mmap_mode="r")
+    claves_nuevas = 0
+    diccionario.guardar() # Antes que las claves: todo identificador guardado en ellas tiene su número
+    if nuevas or reconstruir:
+        combinadas = np.unique(np.concatenate([existentes, *nuevas]))
+        claves_nuevas = len(combinadas) - len(existentes)
+        temporal = estado / (ARCHIVO_PARES + ".tmp")
+        with open(temporal, "wb") as f:
+            np.save(f, combinadas)
+        del existentes # Libera el mapeo antes de reemplazar el archivo
+        os.replace(temporal, ruta_pares)
+    ruta_manifiesto.write_text(json.dumps(manifiesto, indent=1), encoding="utf-8")
+    return ResumenIngesta(procesados, int(bytes_leidos), int(claves_nuevas), int(descartadas), reconstruir,
+                          time.perf_counter() - inicio, errores)
+
+
+# --- Series mensuales y calibración ---
+def participantes_mensuales(directorio_registros):
+    """
+    Participantes distintos por mes y segmento a partir del estado agregado.
+    Devuelve {clave_segmento: (primer_mes, conteos)}, con `primer_mes` como (año, mes) y `conteos`
+    una serie mensual continua (con ceros en los meses sin actividad) hasta el último mes observado.
+    """
+    ruta_pares = Path(directorio_registros) / DIRECTORIO_ESTADO / ARCHIVO_PARES
+    if not ruta_pares.is_file():
+        return {}
+    claves = np.load(ruta_pares, mmap_mode="r")
+    if len(claves) == 0:
+        return {}
+    # Las claves están ordenadas por (segmento, mes): cada grupo de meses es un tramo contiguo
+    grupos, conteos = np.unique(np.asarray(claves) >> _BITS_ESTUDIANTE, return_counts=True)
+    segmentos, meses = _decodificar(grupos << _BITS_ESTUDIANTE)
+    ultimo_mes = meses.max()
+    series = {}
+    for codigo in np.unique(segmentos):
+        propios = segmentos == codigo
+        primer_mes = meses[propios].min()
+        serie = np.zeros(ultimo_mes - primer_mes + 1, dtype=np.int64)
+        serie[meses[propios] - primer_mes] = conteos[propios]
+        series[_CLAVES_SEGMENTO[codigo]] = ((int(primer_mes // 12), int(primer_mes % 12) + 1), serie)
+    return series
+
+
+def calibrar(directorio_registros):
+    """
+    Ingiere lo nuevo, ajusta (N0, r, K) de todos los segmentos en un solo lote (cada serie desde su
+    primer mes con actividad) y guarda el resultado con sus intervalos de confianza en `calibracion.json`.
+    """
+    resumen = ingerir(directorio_registros)
+    series = {clave: datos for clave, datos in participantes_mensuales(directorio_registros).items()
+              if len(datos[1]) >= MIN_MESES_AJUSTE}
+    calibracion = {}
+    if series:
+        meses = max(len(serie) for _, serie in series.values())
+        observado = np.full((len(series), meses), np.nan)
+        for i, (_, serie) in enumerate(series.values()):
+            observado[i, :len(serie)] = serie
+        resultado = calibrar_cohortes(np.arange(meses), observado)
+        for i, (clave, ((anio, mes), serie)) in enumerate(series.items()):
+            calibracion[clave] = {**resultado.como_dict(i), "meses": len(serie), "primer_mes": f"{anio:04d}-{mes:02d}",
+                                  "participantes_ultimo_mes": int(serie[-1])}
+    ruta = ruta_calibracion(directorio_registros)
+    ruta.write_text(json.dumps(calibracion, indent=1, ensure_ascii=False), encoding="utf-8")
+    return resumen, calibracion
+
+
+# --- Registros sintéticos para pruebas de volumen ---
+def generar_registros_mes(ruta, anio, mes, participantes, poblacion, eventos_por_participante, rng):
+    """Escribe un Parquet con los eventos de un mes: `participantes[s]` estudiantes distintos por segmento."""
+    tablas = []
+    for codigo, (n, eventos) in enumerate(zip(participantes, eventos_por_participante)):
+        estudiantes = rng.choice(poblacion, size=int(n), replace=False).astype(np.uint32)
+        repeticiones = rng.poisson(eventos, size=len(estudiantes)) + 1
+        estudiantes = np.repeat(estudiantes, repeticiones)
+        dias = rng.integers(0, 28, size=len(estudiantes))
+        fechas = (np.datetime64(f"{anio:04d}-{mes:02d}-01", "s") + dias.astype("timedelta64[D]")
+                  + rng.integers(0, 86400, size=len(estudiantes)).astype("timedelta64[s]"))
+        tablas.append(pa.table({
+            "estudiante": estudiantes,
+            "segmento": pa.array([_CLAVES_SEGMENTO[codigo]] * len(estudiantes)).dictionary_encode(),
+            "fecha": fechas,
+        }))
+    pq.write_table(pa.concat_tables(tablas), ruta)
+
@@ -0,0 +1,223 @@
+# simulacion/libro_mayor.py
+import hashlib
+import json
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- Esquema del libro mayor ---
+# Los montos se guardan en centésimos de moneda (enteros) para que las sumas sean exactas.
+TIPO_EMISION, TIPO_GANANCIA, TIPO_GASTO = 0, 1, 2
+NOMBRES_TIPO = {TIPO_EMISION: "emisión", TIPO_GANANCIA: "ganancia", TIPO_GASTO: "gasto"}
+TESORERIA = np.iinfo(np.uint32).max # Identificador de la tesorería en las emisiones
+SIN_SEGMENTO = np.iinfo(np.uint8).max # Los gastos no pertenecen a ningún segmento
+CENTESIMOS = 100
+
+ESQUEMA_LIBRO_MAYOR = pa.schema([
+    ("secuencia", pa.uint64()),
+    ("mes", pa.uint16()),
+    ("estudiante", pa.uint32()),
+    ("segmento", pa.uint8()),
+    ("tipo", pa.uint8()),
+    ("monto_centesimos", pa.int64()),
+])
+ARCHIVO_CADENA = "cadena.jsonl"
+HASH_GENESIS = "0" * 64
+
+
+# --- Generación de transacciones a partir de la simulación ---
+def generar_transacciones(participantes_mensuales, recompensas, acciones_por_mes, poblacion_total_urc,
+                          prob_gasto=0.3, fraccion_gasto=0.5, tam_lote=1_000_000, semilla=42):
+    """
+    Genera el libro mayor simulado como una secuencia de `pa.RecordBatch` de `tam_lote` filas.
+
+    participantes_mensuales: arreglo (segmentos, meses + 1) con los participantes de cada mes
+    recompensas / acciones_por_mes: monedas por acción y acciones promedio por participante y segmento
+
+    Cada mes, los participantes de cada segmento realizan acciones ~ Poisson (una ganancia por
+    acción), la tesorería emite lo que paga, y cada estudiante con saldo gasta con probabilidad
+    `prob_gasto` una fracción de su saldo. Solo se mantiene en memoria el saldo por estudiante.
+    """
+    rng = np.random.default_rng(semilla)
+    participantes_mensuales = np.rint(np.asarray(participantes_mensuales)).astype(np.int64)
+    num_segmentos, num_meses = participantes_mensuales.shape
+    montos_recompensa = np.rint(np.asarray(recompensas, dtype=float) * CENTESIMOS).astype(np.int64)
+    # Orden en que los estudiantes se unen a cada segmento: en el mes m participan los primeros N(m)
+    orden_union = [rng.permutation(poblacion_total_urc).astype(np.uint32) for _ in range(num_segmentos)]
+    saldos = np.zeros(poblacion_total_urc, dtype=np.int64)
+    secuencia = 0
+    # Fragmentos por mes, segmento y tipo aún sin escribir; el primero puede estar consumido hasta `desplazamiento`
+    pendientes, desplazamiento, filas_pendientes = deque(), 0, 0
+
+    for mes in range(1, num_meses):
+        columnas_mes = []
+        for s in range(num_segmentos):
+            activos = orden_union[s][:min(participantes_mensuales[s, mes], poblacion_total_urc)]
+            acciones = rng.poisson(acciones_por_mes[s], activos.size)
+            estudiantes = np.repeat(activos, acciones)
+            if estudiantes.size == 0:
+                continue
+            montos = np.full(estudiantes.size, montos_recompensa[s], dtype=np.int64)
+            saldos += np.bincount(estudiantes, minlength=poblacion_total_urc) * montos_recompensa[s]
+            columnas_mes.append((np.array([TESORERIA], dtype=np.uint32), s, TIPO_EMISION,
+                                 np.array([montos.sum()], dtype=np.int64)))
+            columnas_mes.append((estudiantes, s, TIPO_GANANCIA, montos))
+
+        con_saldo = np.flatnonzero(saldos > 0)
+        gastan = con_saldo[rng.random(con_saldo.size) < prob_gasto]
+        montos_gasto = (saldos[gastan] * fraccion_gasto).astype(np.int64)
+        gastan, montos_gasto = gastan[montos_gasto > 0], montos_gasto[montos_gasto > 0]
+        saldos[gastan] -= montos_gasto
+        columnas_mes.append((gastan.astype(np.uint32), SIN_SEGMENTO, TIPO_GASTO, montos_gasto))
+
+        for estudiantes, segmento, tipo, montos in columnas_mes:
+            n = estudiantes.size
+            pendientes.append({
+                "secuencia": np.arange(secuencia, secuencia + n, dtype=np.uint64),
+                "mes": np.full(n, mes, dtype=np.uint16),
+                "estudiante": estudiantes,
+                "segmento": np.full(n, segmento, dtype=np.uint8),
+                "tipo": np.full(n, tipo, dtype=np.uint8),
+                "monto_centesimos": montos,
+            })
+            secuencia += n
+            filas_pendientes += n
+        while filas_pendientes >= tam_lote:
+            lote, desplazamiento = _cortar_lote(pendientes, desplazamiento, tam_lote)
+            filas_pendientes -= tam_lote
+            yield lote
+    if filas_pendientes:
+        lote, _ = _cortar_lote(pendientes, desplazamiento, filas_pendientes)
+        yield lote
+
+
+def _cortar_lote(pendientes, desplazamiento, n):
+    """
+    Toma `n` filas de los fragmentos pendientes (deque), desde la fila `desplazamiento` del primero.
+    Solo copia las filas del lote; los fragmentos agotados salen de `pendientes`. Devuelve
+    (lote, desplazamiento dentro del nuevo primer fragmento).
+    """
+    partes, faltan = [], n
+    while faltan:
+        fragmento = pendientes[0]
+        tomadas = min(faltan, len(fragmento["secuencia"]) - desplazamiento)
+        partes.append({nombre: valores[desplazamiento:desplazamiento + tomadas] for nombre, valores in fragmento.items()})
+        faltan -= tomadas
+        desplazamiento += tomadas
+        if desplazamiento == len(fragmento["secuencia"]):
+            pendientes.popleft()
+            desplazamiento = 0
+    lote = pa.RecordBatch.from_arrays([pa.array(np.concatenate([p[nombre] for p in partes]))
+                                       for nombre in ESQUEMA_LIBRO_MAYOR.names], schema=ESQUEMA_LIBRO_MAYOR)
+    return lote, desplazamiento
+
+
+# --- Encadenamiento de hashes ---
+def hash_lote(lote, hash_previo):
+    """SHA-256 de (hash del lote previo + contenido canónico del lote, columna por columna)."""
+    hasher = hashlib.sha256(bytes.fromhex(hash_previo))
+    for nombre, columna in zip(lote.schema.names, lote.columns):
+        hasher.update(nombre.encode())
+        hasher.update(np.ascontiguousarray(columna.to_numpy(zero_copy_only=False)).tobytes())
+    return hasher.hexdigest()
+
+
+class EscritorLibroMayor:
+    """
+    Escribe el libro mayor como archivos Parquet de un lote cada uno, solo por anexión.
+    Cada lote queda registrado en `cadena.jsonl` con el hash del lote previo y el propio.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.registros = leer_cadena(self.directorio)
+        self.hash_previo = self.registros[-1]["hash"] if self.registros else HASH_GENESIS
+
+    def anexar(self, lote):
+        numero = len(self.registros)
+        archivo = f"lote_{numero:06d}.parquet"
+        hash_actual = hash_lote(lote, self.hash_previo)
+        tabla = pa.Table.from_batches([lote]).replace_schema_metadata(
+            {"hash_previo": self.hash_previo, "hash": hash_actual})
+        pq.write_table(tabla, self.directorio / archivo, compression="zstd")
+        registro = {"lote": numero, "archivo": archivo, "filas": lote.num_rows,
+                    "hash_previo": self.hash_previo, "hash": hash_actual}
+        with open(self.directorio / ARCHIVO_CADENA, "a") as f:
+            f.write(json.dumps(registro) + "\n")
+        self.registros.append(registro)
+        self.hash_previo = hash_actual
+        return registro
+
+
+def escribir_libro_mayor(lotes, directorio):
+    """Anexa todos los lotes de un iterable al libro mayor de `directorio` y devuelve el último hash."""
+    escritor = EscritorLibroMayor(directorio)
+    for lote in lotes:
+        escritor.anexar(lote)
+    return escritor.hash_previo
+
+
+def leer_cadena(directorio):
+    ruta = Path(directorio) / ARCHIVO_CADENA
+    if not ruta.exists():
+        return []
+    with open(ruta) as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def iterar_lotes(directorio, columnas=None):
+    """Recorre el libro mayor lote por lote, en orden de la cadena, sin cargarlo completo."""
+    directorio = Path(directorio)
+    for registro in leer_cadena(directorio):
+        archivo = pq.ParquetFile(directorio / registro["archivo"])
+        for lote in archivo.iter_batches(columns=columnas):
+            yield registro, lote
+
+
+def verificar_cadena(directorio):
+    """Recalcula la cadena de hashes. Devuelve (True, None) o (False, número del primer lote inválido)."""
+    hash_previo = HASH_GENESIS
+    directorio = Path(directorio)
+    for registro in leer_cadena(directorio):
+        tabla = pq.read_table(directorio / registro["archivo"])
+        lote = tabla.combine_chunks().to_batches()[0] if tabla.num_rows else pa.RecordBatch.from_pylist([], tabla.schema)
+        if registro["hash_previo"] != hash_previo or hash_lote(lote, hash_previo) != registro["hash"]:
+            return False, registro["lote"]
+        hash_previo = registro["hash"]
+    return True, None
+
+
+# --- Agregados en flujo ---
+def agregar_libro_mayor(directorio, poblacion_total_urc):
+    """
+    Calcula saldos por estudiante, suministro circulante y totales por segmento recorriendo
+    los lotes uno a uno. La memoria depende del número de estudiantes, no de transacciones.
+    """
+    saldos = np.zeros(poblacion_total_urc, dtype=np.float64)
+    por_segmento = np.zeros((3, 256), dtype=np.float64) # (tipo, segmento)
+    transacciones = np.zeros(3, dtype=np.int64)
+    for _, lote in iterar_lotes(directorio, columnas=["estudiante", "segmento", "tipo", "monto_centesimos"]):
+        estudiante, segmento, tipo, monto = (c.to_numpy() for c in lote.columns)
+        transacciones += np.bincount(tipo, minlength=3)[:3]
+        por_segmento += np.bincount(tipo.astype(np.int64) * 256 + segmento, weights=monto,
+                                    minlength=3 * 256).reshape(3, 256)
+        ganancia, gasto = tipo == TIPO_GANANCIA, tipo == TIPO_GASTO
+        saldos += np.bincount(estudiante[ganancia], weights=monto[ganancia], minlength=poblacion_total_urc)
+        saldos -= np.bincount(estudiante[gasto], weights=monto[gasto], minlength=poblacion_total_urc)
+
+    emitido = por_segmento[TIPO_EMISION].sum() / CENTESIMOS
+    gastado = por_segmento[TIPO_GASTO].sum() / CENTESIMOS
+    return {
+        "transacciones": {NOMBRES_TIPO[k]: int(v) for k, v in enumerate(transacciones)},
+        "emitido": emitido,
+        "gastado": gastado,
+        "suministro_circulante": emitido - gastado,
+        "saldos": saldos / CENTESIMOS,
+        "emitido_por_segmento": por_segmento[TIPO_EMISION] / CENTESIMOS,
+        "ganado_por_segmento": por_segmento[TIPO_GANANCIA] / CENTESIMOS,
+    }
+
@@ -0,0 +1,88 @@
+# simulacion/logistico.py
+import numpy as np
+
+PUNTOS_MALLA = 100 # Resolución temporal por defecto de las páginas
+N0_DEFECTO = 10 # Población inicial de participantes
+# Resoluciones de las curvas de adopción: puntos por mes (None = malla estándar de PUNTOS_MALLA)
+RESOLUCIONES = {"estandar": None, "semanal": 52 / 12, "diaria": 365 / 12}
+
+# --- Función para simular el crecimiento logístico (Ecuaciones Diferenciales) ---
+def modelo_logistico(N, t, r, K):
+    """
+    N: Población actual
+    t: Tiempo
+    r: Tasa de crecimiento intrínseca
+    K: Capacidad de carga (población máxima)
+    """
+    dndt = r * N * (1 - N / K)
+    return dndt
+
+
+def malla_temporal(duracion_simulacion, num_puntos=PUNTOS_MALLA):
+    """Malla de tiempo en meses, de 0 a `duracion_simulacion` con `num_puntos` puntos."""
+    return np.linspace(0, duracion_simulacion, int(num_puntos))
+
+
+def puntos_resolucion(duracion_simulacion, resolucion="estandar"):
+    """Número de puntos de malla para una de las `RESOLUCIONES` y una duración en meses."""
+    puntos_por_mes = RESOLUCIONES[resolucion]
+    if puntos_por_mes is None:
+        return PUNTOS_MALLA
+    return int(round(duracion_simulacion * puntos_por_mes)) + 1
+
+
+# --- Solución analítica (forma cerrada) ---
+def solucion_logistica(N0, r, K, t):
+    """
+    Evalúa la solución cerrada N(t) = K * N0 / (N0 + (K - N0) * exp(-r t)).
+
+    N0, r y K se combinan por broadcasting de NumPy; `t` es un arreglo 1-D.
+    El resultado tiene forma `broadcast(N0, r, K).shape + (len(t),)`, de modo
+    que parámetros escalares devuelven una curva simple.
+    """
+    N0, r, K = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (N0, r, K)))
+    t = np.asarray(t, dtype=float)
+    N0, r, K = N0[..., None], r[..., None], K[..., None]
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        denominador = N0 + (K - N0) * np.exp(-r * t)
+        N = np.where(N0 > 0, K * N0 / denominador, 0.0)
+    return N
+
+
+# --- Respaldo numérico por lotes ---
+def integrar_lote(N0, r, K, t, terminos_extra, rtol=1e-6, atol=1e-6):
+    """
+    Integra numéricamente dN/dt = r N (1 - N/K) + terminos_extra(t, N, r, K)
+    para todas las combinaciones de parámetros como un solo sistema vectorial.
+
+    `terminos_extra` recibe arreglos planos (uno por combinación) y debe devolver
+    un arreglo de la misma forma que N. Se usa solo cuando el modelo deja de ser
+    puramente logístico y la solución cerrada ya no aplica.
+    """
+    from scipy.integrate import solve_ivp
+
+    N0, r, K = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (N0, r, K)))
+    forma = N0.shape
+    t = np.asarray(t, dtype=float)
+    r_plano, K_plano = r.ravel(), K.ravel()
+
+    def derivada(tiempo, N):
+        return modelo_logistico(N, tiempo, r_plano, K_plano) + terminos_extra(tiempo, N, r_plano, K_plano)
+
+    sol = solve_ivp(derivada, (t[0], t[-1]), N0.ravel(), t_eval=t,
+                    method="LSODA", rtol=rtol, atol=atol)
+    if not sol.success:
+        raise RuntimeError(f"La integración numérica no convergió: {sol.message}")
+    return sol.y.reshape(forma + (len(t),))
+
+
+def simular_logistico(N0, r, K, t, terminos_extra=None):
+    """
+    Punto de entrada común para simular la adopción de un segmento.
+
+    Sin `terminos_extra` se usa la solución cerrada (microsegundos, sin integrador);
+    con términos adicionales se recurre a `integrar_lote`.
+    """
+    if terminos_extra is None:
+        return solucion_logistica(N0, r, K, t)
+    return integrar_lote(N0, r, K, t, terminos_extra)
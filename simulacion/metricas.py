@@ -0,0 +1,77 @@
+# simulacion/metricas.py
+# Registro declarativo de las métricas de impacto de cada segmento y su evaluación vectorizada:
+# todas las métricas de todos los segmentos (y escenarios) en una sola pasada sobre un arreglo columnar.
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.importaciones import importar
+
+AGREGACIONES = ("acumulada", "mensual")
+
+
+@dataclass(frozen=True)
+class Metrica:
+    """
+    nombre: Clave de la métrica (columnas `{segmento}_{nombre}_acum` de los escenarios)
+    segmento: Clave del segmento en `SEGMENTOS`
+    tasa: Unidades por participante en cada punto de la malla (se trunca a entero, como en las tablas de impacto)
+    etiqueta: Nombre de la serie en las tablas y gráficas de las páginas
+    agregacion: 'acumulada' (suma de los valores truncados hasta cada punto) o 'mensual' (valor de cada punto)
+    """
+    nombre: str
+    segmento: str
+    tasa: float
+    etiqueta: str
+    agregacion: str = "acumulada"
+
+    def __post_init__(self):
+        if self.agregacion not in AGREGACIONES:
+            raise ValueError(f"Agregación desconocida: {self.agregacion!r}. Opciones: {AGREGACIONES}")
+
+
+# Supuestos de impacto de las páginas; agregar una métrica aquí la suma a las tablas, la comparativa y los escenarios
+METRICAS = (
+    Metrica("eventos_asistidos", "cultural", 1 / 10, "Eventos Asistidos (acum.)"), # 10 estudiantes por evento en promedio
+    Metrica("obras_creadas", "cultural", 1 / 50, "Obras/Contenido Creado (acum.)"), # Una obra por cada 50 participantes
+    Metrica("kg_reciclados", "ambiental", 0.5, "Kg Reciclados (acum.)"), # 0.5 kg por participante y mes
+    Metrica("arboles_plantados", "ambiental", 1 / 20, "Árboles Plantados (equiv. acum.)"), # 1 árbol por cada 20 participantes
+    Metrica("proyectos_investigacion", "academico", 1 / 10, "Proyectos Investigación (acum.)"), # 1 proyecto por cada 10 estudiantes
+    Metrica("tutorias_impartidas", "academico", 1 / 5, "Tutorías Impartidas (acum.)"), # 1 tutoría por cada 5 estudiantes
+)
+
+
+def metricas_de(segmentos, metricas=METRICAS):
+    """Métricas del registro que pertenecen a `segmentos`, en el orden del registro."""
+    return tuple(m for m in metricas if m.segmento in segmentos)
+
+
+def evaluar_metricas(participantes, segmentos, metricas=METRICAS):
+    """
+    Evalúa de una vez todas las métricas de `segmentos`.
+
+    participantes: arreglo (..., S, T) con una fila por segmento en el orden de `segmentos`; las
+    dimensiones iniciales pueden ser escenarios. Devuelve (valores, metricas) con valores int64 de
+    forma (..., M, T), una fila por métrica: el producto por las tasas, el truncado y la suma
+    acumulada se aplican a todas las filas a la vez.
+    """
+    segmentos = list(segmentos)
+    metricas = metricas_de(segmentos, metricas)
+    participantes = np.asarray(participantes, dtype=float)
+    filas = [segmentos.index(m.segmento) for m in metricas]
+    tasas = np.array([m.tasa for m in metricas], dtype=float)[:, None]
+    valores = (participantes[..., filas, :] * tasas).astype(np.int64)
+    acumulada = np.array([m.agregacion == "acumulada" for m in metricas])
+    if acumulada.all():
+        np.cumsum(valores, axis=-1, out=valores)
+    elif acumulada.any():
+        valores[..., acumulada, :] = np.cumsum(valores[..., acumulada, :], axis=-1)
+    return valores, metricas
+
+
+def tabla_metricas(t, valores, metricas, columna_tiempo="Mes de Simulación"):
+    """DataFrame de las páginas construido de un solo bloque 2-D (tiempo × métricas), sin una columna por paso."""
+    pd = importar("pandas")
+    tabla = pd.DataFrame(np.asarray(valores).T, columns=[m.etiqueta for m in metricas])
+    tabla.insert(0, columna_tiempo, t)
+    return tabla
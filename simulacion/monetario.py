@@ -0,0 +1,203 @@
+# simulacion/monetario.py
+# Dinámica de la moneda a resolución diaria: emisión por recompensas, saldo de estudiantes y comercios,
+# gasto, canje en tesorería y decaimiento del valor, con la distribución de saldos de toda la población.
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.agentes import ACCIONES_POR_MES
+from simulacion.escenarios import SEGMENTOS
+from simulacion.logistico import N0_DEFECTO, solucion_logistica
+
+DIAS_POR_MES = 365 / 12
+NUM_BINS = 512 # Intervalos del histograma de saldos (resolución de los cuantiles: saldo máximo / NUM_BINS)
+CUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90, 0.99)
+VENTANA_VELOCIDAD = 30 # Días de la media móvil de la velocidad
+# Supuestos por defecto de la página: fracciones mensuales y tasa anual
+TASA_GASTO_MENSUAL = 0.30 # Fracción del saldo de cada estudiante que se gasta en comercios del campus por mes
+TASA_CANJE_MENSUAL = 0.50 # Fracción del saldo de los comercios que se canjea en la tesorería (se retira) por mes
+DECAIMIENTO_ANUAL = 0.05 # Pérdida de valor de todo saldo por año (oxidación de la moneda)
+
+
+def tasa_diaria(tasa, dias_periodo):
+    """Fracción diaria equivalente a una fracción `tasa` aplicada por periodos de `dias_periodo` días."""
+    return 1 - (1 - tasa) ** (1 / dias_periodo)
+
+
+def _recurrencia(entradas, retencion):
+    """
+    Saldos al inicio de cada día de x[d + 1] = retencion · (x[d] + entradas[d]), x[0] = 0.
+    Es un filtro IIR de primer orden: una sola pasada acumulativa en C, sin bucle en Python.
+    """
+    from scipy.signal import lfilter
+
+    saldos = np.zeros(entradas.shape[-1] + 1)
+    saldos[1:] = lfilter([retencion], [1, -retencion], entradas)
+    return saldos
+
+
+@dataclass
+class ResultadoMonetario:
+    """
+    Series diarias (forma (dias + 1,), saldos al inicio de cada día; flujos del día en las primeras `dias`
+    posiciones y 0 en la última) y la distribución del saldo por estudiante sobre toda la población.
+    """
+    dias: np.ndarray
+    nombres: list
+    participantes: np.ndarray # (segmentos, dias + 1)
+    emision: np.ndarray # (segmentos, dias + 1) monedas emitidas por día
+    gasto: np.ndarray
+    canje: np.ndarray
+    decaimiento: np.ndarray
+    saldo_estudiantes: np.ndarray
+    saldo_comercios: np.ndarray
+    velocidad: np.ndarray # Gasto anualizado / circulante, media móvil de VENTANA_VELOCIDAD días
+    cuantiles: np.ndarray # float32 (len(CUANTILES), dias + 1) saldo por estudiante
+    gini: np.ndarray # float32 (dias + 1,)
+    fraccion_con_saldo: np.ndarray # float32 (dias + 1,)
+    bordes: np.ndarray # Saldo que representa cada intervalo del histograma
+    histograma_final: np.ndarray # Estudiantes por intervalo de saldo el último día
+    poblacion: float
+
+    @property
+    def meses(self):
+        return self.dias / DIAS_POR_MES
+
+    @property
+    def circulante(self):
+        return self.saldo_estudiantes + self.saldo_comercios
+
+    @property
+    def saldo_medio(self):
+        return self.saldo_estudiantes / self.poblacion
+
+
+def _histogramas_segmento(participantes, ganancia_diaria, retencion, ancho, num_bins):
+    """
+    Estudiantes por intervalo de saldo (dias + 1, num_bins) que aporta un segmento, cada día.
+
+    Quien se unió el día j tiene el día d un saldo ganancia · G(d - j) con G(n) = Σ_{k=1..n} retencion^k,
+    creciente en la antigüedad n: cada intervalo de saldo corresponde a un rango contiguo de antigüedades
+    [n_lo, n_hi), y los estudiantes en él son N(d - n_lo) - N(d - n_hi), con N la curva acumulada de participantes.
+    """
+    num_dias = participantes.shape[0]
+    antiguedad = np.arange(num_dias)
+    if retencion < 1:
+        G = retencion * (1 - retencion ** antiguedad) / (1 - retencion)
+    else:
+        G = antiguedad.astype(float)
+    intervalo = np.minimum(np.rint(ganancia_diaria * G / ancho), num_bins - 1).astype(np.int32)
+    limites = np.arange(num_bins)
+    n_lo = np.searchsorted(intervalo, limites, "left")
+    n_hi = np.searchsorted(intervalo, limites, "right")
+    # N(d) con N(negativo) = 0: se rellena por la izquierda para indexar sin condicionales
+    acumulado = np.r_[np.zeros(num_dias, dtype=np.float32), participantes.astype(np.float32)]
+    dia = np.arange(num_dias)[:, None] + num_dias
+    return acumulado[dia - n_lo] - acumulado[dia - n_hi]
+
+
+def _estadisticas_distribucion(histograma, bordes, poblacion):
+    """Cuantiles, coeficiente de Gini y fracción con saldo a partir de los histogramas diarios."""
+    acumulada = np.cumsum(histograma, axis=1) / poblacion
+    indices = (acumulada[None, :, :] < np.asarray(CUANTILES, dtype=np.float32)[:, None, None]).sum(axis=2)
+    cuantiles = bordes[np.minimum(indices, bordes.size - 1)].astype(np.float32)
+    # Gini por la curva de Lorenz: 1 - Σ p_b (L_{b-1} + L_b)
+    riqueza = np.cumsum(histograma * bordes, axis=1)
+    total = riqueza[:, -1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lorenz = np.where(total > 0, riqueza / total, 0)
+    lorenz_previa = np.pad(lorenz[:, :-1], ((0, 0), (1, 0)))
+    gini = np.where(total[:, 0] > 0, 1 - (histograma / poblacion * (lorenz_previa + lorenz)).sum(axis=1), 0)
+    fraccion_con_saldo = 1 - histograma[:, 0] / poblacion
+    return cuantiles, gini.astype(np.float32), fraccion_con_saldo.astype(np.float32)
+
+
+def simular_monetario(tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores, fracciones_capacidad,
+                      recompensas, N0=N0_DEFECTO, tasa_gasto_mensual=TASA_GASTO_MENSUAL,
+                      tasa_canje_mensual=TASA_CANJE_MENSUAL, decaimiento_anual=DECAIMIENTO_ANUAL, num_bins=NUM_BINS):
+    """
+    Simula la moneda día a día durante `duracion_simulacion` meses (hasta 60 meses ≈ 1,826 días).
+
+    Cada día, cada participante cobra la recompensa de sus acciones (ACCIONES_POR_MES prorrateadas);
+    luego todo saldo pierde la fracción diaria de decaimiento, los estudiantes gastan una fracción de su
+    saldo en comercios del campus y los comercios canjean una fracción del suyo en la tesorería.
+    Los segmentos siguen las curvas logísticas de las páginas y, como en el libro mayor, los estudiantes
+    se unen a cada segmento en un orden independiente, así que el saldo de un estudiante es la suma de
+    aportes independientes por segmento y la distribución de la población es la convolución de sus
+    histogramas (una FFT por día, todas en un solo lote).
+    """
+    claves = list(SEGMENTOS)
+    num_dias = int(round(duracion_simulacion * DIAS_POR_MES))
+    dias = np.arange(num_dias + 1)
+    r = tasa_base_adopcion * np.asarray(factores, dtype=float)
+    K = np.asarray(fracciones_capacidad, dtype=float) * poblacion_total_urc
+    participantes = solucion_logistica(np.asarray(N0, dtype=float), r, K, dias / DIAS_POR_MES) # (S, dias + 1)
+    acciones = np.array([ACCIONES_POR_MES[SEGMENTOS[c]["nombre"]] for c in claves])
+    ganancia_diaria = np.asarray(recompensas, dtype=float) * acciones / DIAS_POR_MES # Monedas por participante y día
+
+    decaimiento = tasa_diaria(decaimiento_anual, 365)
+    gasto = tasa_diaria(tasa_gasto_mensual, DIAS_POR_MES)
+    canje = tasa_diaria(tasa_canje_mensual, DIAS_POR_MES)
+    retencion_estudiantes = (1 - decaimiento) * (1 - gasto)
+    retencion_comercios = (1 - decaimiento) * (1 - canje)
+
+    # --- Agregados: dos recurrencias lineales encadenadas ---
+    emision = participantes * ganancia_diaria[:, None]
+    emision[:, -1] = 0 # El último día solo se observa el saldo
+    saldo_estudiantes = _recurrencia(emision[:, :-1].sum(axis=0), retencion_estudiantes)
+    antes_de_gastar = (saldo_estudiantes[:-1] + emision[:, :-1].sum(axis=0)) * (1 - decaimiento)
+    gasto_diario = np.r_[antes_de_gastar * gasto, 0]
+    saldo_comercios = _recurrencia(gasto_diario[:-1], retencion_comercios)
+    canje_diario = np.r_[(saldo_comercios[:-1] + gasto_diario[:-1]) * (1 - decaimiento) * canje, 0]
+    decaimiento_diario = np.r_[(saldo_estudiantes[:-1] + emision[:, :-1].sum(axis=0)
+                                + saldo_comercios[:-1] + gasto_diario[:-1]) * decaimiento, 0]
+
+    # Velocidad: gasto anualizado sobre el circulante, ambos en media móvil (sumas acumuladas)
+    def media_movil(serie):
+        acumulada = np.r_[0, np.cumsum(serie)]
+        inicio = np.maximum(dias + 1 - VENTANA_VELOCIDAD, 0)
+        return (acumulada[dias + 1] - acumulada[inicio]) / (dias + 1 - inicio)
+    circulante_medio = media_movil(saldo_estudiantes + saldo_comercios)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        velocidad = np.where(circulante_medio > 0, 365 * media_movil(gasto_diario) / circulante_medio, 0)
+
+    # --- Distribución del saldo por estudiante ---
+    # El aporte máximo de cada segmento es el de quien participa desde el día 0
+    G_max = retencion_estudiantes * (1 - retencion_estudiantes ** num_dias) / (1 - retencion_estudiantes) \
+        if retencion_estudiantes < 1 else float(num_dias)
+    saldo_maximo = max(float(ganancia_diaria.sum() * G_max), 1e-9)
+    ancho = saldo_maximo / (num_bins - 1)
+    histogramas = [_histogramas_segmento(participantes[s], ganancia_diaria[s], retencion_estudiantes, ancho, num_bins)
+                   for s in range(len(claves))]
+    poblacion = float(poblacion_total_urc)
+    for hist, N in zip(histogramas, participantes):
+        hist[:, 0] += (poblacion - N).astype(np.float32) # Quienes no participan aportan saldo 0
+    longitud = 1 << int(np.ceil(np.log2(len(histogramas) * num_bins)))
+    espectro = np.fft.rfft(histogramas[0], longitud, axis=1)
+    for hist in histogramas[1:]:
+        espectro *= np.fft.rfft(hist, longitud, axis=1)
+    conjunto = np.fft.irfft(espectro, longitud, axis=1)[:, :num_bins].astype(np.float32)
+    conjunto /= np.float32(poblacion ** (len(histogramas) - 1)) # Cada segmento es una distribución sobre la población
+    np.maximum(conjunto, 0, out=conjunto) # Ruido de redondeo de la FFT
+    bordes = (np.arange(num_bins) * ancho).astype(np.float32)
+    cuantiles, gini, fraccion_con_saldo = _estadisticas_distribucion(conjunto, bordes, poblacion)
+
+    return ResultadoMonetario(
+        dias=dias,
+        nombres=[SEGMENTOS[c]["nombre"] for c in claves],
+        participantes=participantes.astype(np.float32),
+        emision=emision,
+        gasto=gasto_diario,
+        canje=canje_diario,
+        decaimiento=decaimiento_diario,
+        saldo_estudiantes=saldo_estudiantes,
+        saldo_comercios=saldo_comercios,
+        velocidad=velocidad,
+        cuantiles=cuantiles,
+        gini=gini,
+        fraccion_con_saldo=fraccion_con_saldo,
+        bordes=bordes,
+        histograma_final=conjunto[-1],
+        poblacion=poblacion,
+    )
+
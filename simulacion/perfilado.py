@@ -0,0 +1,195 @@
+# simulacion/perfilado.py
+# Instrumentación de las páginas: tiempo de pared, tiempo de CPU y pico de memoria (tracemalloc)
+# de cada sección de cálculo y de dibujo, agrupados por reejecución del script.
+import csv
+import functools
+import io
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+MAX_EJECUCIONES = 50 # Reejecuciones que se conservan en el historial del proceso
+COLUMNAS_CSV = ["ejecucion", "pagina", "inicio", "seccion", "nivel", "pared_ms", "cpu_ms", "pico_kib"]
+
+
+@dataclass
+class MedicionSeccion:
+    seccion: str
+    nivel: int # Profundidad de anidamiento (0 = sección de primer nivel de la página)
+    pared_ms: float
+    cpu_ms: float
+    pico_kib: float # None si la medición de memoria está apagada
+
+
+@dataclass
+class Ejecucion:
+    """Una reejecución de una página (o de un fragmento) con las secciones medidas en orden de término."""
+    id: int
+    pagina: str
+    inicio: float # time.time() al iniciar
+    secciones: list = field(default_factory=list)
+    implicita: bool = False # Abierta automáticamente por una sección sin página (p. ej. la reejecución de un fragmento)
+
+    @property
+    def pared_ms(self):
+        return sum(m.pared_ms for m in self.secciones if m.nivel == 0)
+
+    @property
+    def cpu_ms(self):
+        return sum(m.cpu_ms for m in self.secciones if m.nivel == 0)
+
+
+class HistorialPerfiles:
+    """Últimas `max_ejecuciones` reejecuciones medidas en este proceso, compartidas por todas las sesiones."""
+
+    def __init__(self, max_ejecuciones=MAX_EJECUCIONES):
+        self._ejecuciones = deque(maxlen=max_ejecuciones)
+        self._lock = threading.Lock()
+        self._siguiente_id = 0
+
+    def nueva(self, pagina, implicita=False):
+        with self._lock:
+            self._siguiente_id += 1
+            return Ejecucion(self._siguiente_id, pagina, time.time(), implicita=implicita)
+
+    def agregar(self, ejecucion):
+        if ejecucion.secciones:
+            with self._lock:
+                self._ejecuciones.append(ejecucion)
+
+    def ultimas(self, n=None):
+        with self._lock:
+            ejecuciones = list(self._ejecuciones)
+        return ejecuciones[-n:] if n else ejecuciones
+
+    def limpiar(self):
+        with self._lock:
+            self._ejecuciones.clear()
+
+    def filas(self, n=None):
+        """Una fila por sección medida, con los datos de su reejecución (formato largo)."""
+        return [{"ejecucion": e.id, "pagina": e.pagina,
+                 "inicio": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e.inicio)), **asdict(m)}
+                for e in self.ultimas(n) for m in e.secciones]
+
+    def exportar_json(self, n=None):
+        return json.dumps([{"ejecucion": e.id, "pagina": e.pagina, "inicio": e.inicio,
+                            "pared_ms": e.pared_ms, "cpu_ms": e.cpu_ms,
+                            "secciones": [asdict(m) for m in e.secciones]} for e in self.ultimas(n)],
+                          ensure_ascii=False, indent=2)
+
+    def exportar_csv(self, n=None):
+        salida = io.StringIO()
+        escritor = csv.DictWriter(salida, fieldnames=COLUMNAS_CSV)
+        escritor.writeheader()
+        escritor.writerows(self.filas(n))
+        return salida.getvalue()
+
+
+historial_perfiles = HistorialPerfiles()
+
+# Streamlit ejecuta el script de cada sesión en su propio hilo: la reejecución en curso y la pila
+# de secciones abiertas son locales al hilo, así que las sesiones concurrentes no se mezclan.
+_estado = threading.local()
+
+
+def _pila():
+    if not hasattr(_estado, "pila"):
+        _estado.pila = []
+    return _estado.pila
+
+
+# --- Medición de memoria ---
+def memoria_activa():
+    return tracemalloc.is_tracing()
+
+
+def activar_memoria(activa=True):
+    """
+    Enciende o apaga tracemalloc para todo el proceso. Rastrear cada asignación hace el código
+    notablemente más lento, por eso está apagado salvo que se pida. Es un ajuste del servidor
+    (NURC_PERFILADO_MEMORIA=1 al arrancar), no de cada sesión: apagarlo desde una sesión cortaría
+    las mediciones en curso de todas las demás.
+    """
+    if activa and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not activa and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if os.environ.get("NURC_PERFILADO_MEMORIA"):
+    activar_memoria()
+
+
+# --- Reejecuciones ---
+def iniciar_ejecucion(pagina):
+    """Abre la reejecución de `pagina` en este hilo; la anterior, si quedó abierta, se archiva."""
+    finalizar_ejecucion()
+    _estado.ejecucion = historial_perfiles.nueva(pagina)
+    _pila().clear()
+    return _estado.ejecucion
+
+
+def finalizar_ejecucion():
+    """Archiva la reejecución abierta en este hilo (si la hay) y la devuelve."""
+    ejecucion = getattr(_estado, "ejecucion", None)
+    _estado.ejecucion = None
+    if ejecucion is not None:
+        historial_perfiles.agregar(ejecucion)
+    return ejecucion
+
+
+@contextmanager
+def seccion(nombre):
+    """
+    Mide el bloque como una sección de la reejecución en curso. Las secciones pueden anidarse;
+    el pico de memoria de cada una es el máximo asignado por encima de lo que había al entrar.
+    Si no hay una reejecución abierta (p. ej. se reejecuta solo un fragmento) se abre una implícita.
+    """
+    ejecucion = getattr(_estado, "ejecucion", None)
+    if ejecucion is None:
+        ejecucion = _estado.ejecucion = historial_perfiles.nueva("fragmento", implicita=True)
+    pila = _pila()
+    # Cada nivel guarda la memoria al entrar y el mayor pico visto en sus subsecciones, porque
+    # tracemalloc tiene un único pico por proceso que cada subsección reinicia
+    memoria = memoria_activa()
+    if memoria:
+        actual, pico = tracemalloc.get_traced_memory()
+        if pila:
+            pila[-1]["pico_hijos"] = max(pila[-1]["pico_hijos"], pico)
+        tracemalloc.reset_peak()
+    marco = {"memoria_inicial": actual if memoria else 0, "pico_hijos": 0}
+    pila.append(marco)
+    inicio_pared, inicio_cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        pared_ms = (time.perf_counter() - inicio_pared) * 1000
+        cpu_ms = (time.thread_time() - inicio_cpu) * 1000
+        pila.pop()
+        pico_kib = None
+        if memoria and memoria_activa():
+            pico = max(tracemalloc.get_traced_memory()[1], marco["pico_hijos"])
+            pico_kib = max(pico - marco["memoria_inicial"], 0) / 1024
+            if pila:
+                pila[-1]["pico_hijos"] = max(pila[-1]["pico_hijos"], pico)
+        ejecucion.secciones.append(MedicionSeccion(nombre, len(pila), pared_ms, cpu_ms, pico_kib))
+        if not pila and ejecucion.implicita:
+            finalizar_ejecucion()
+
+
+def perfilar(nombre=None):
+    """Decorador equivalente a envolver el cuerpo de la función en `seccion(nombre)`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with seccion(nombre or funcion.__qualname__):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
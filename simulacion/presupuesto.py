@@ -0,0 +1,158 @@
+# simulacion/presupuesto.py
+# Asignación de un presupuesto de monedas entre segmentos: busca las recompensas que maximizan
+# el scorecard al final de la simulación, evaluando todas las combinaciones candidatas por lotes.
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulacion.agentes import ACCIONES_POR_MES
+from simulacion.barrido import score_segmento
+from simulacion.escenarios import SEGMENTOS
+from simulacion.logistico import N0_DEFECTO, solucion_logistica
+
+# Rango de recompensas (monedas por acción) de los widgets de cada página
+RANGOS_RECOMPENSA = {"cultural": (1, 100), "ambiental": (0.1, 5.0), "academico": (20, 200)}
+RANGO_FACTOR = (0.5, 2.0) # Rango del factor de cada segmento en las páginas
+# Supuesto de respuesta: el factor del segmento escala con (recompensa / recompensa de referencia) ** ELASTICIDAD,
+# acotado a RANGO_FACTOR; la recompensa de referencia es la de SEGMENTOS, con la que el factor es el de la página.
+ELASTICIDAD = 0.5
+NIVELES = 48 # Niveles de recompensa por segmento en cada pasada (NIVELES ** 3 combinaciones)
+REFINAMIENTOS = 2 # Pasadas adicionales con una malla más fina alrededor de la mejor combinación
+
+
+def factor_efectivo(factor, recompensa, recompensa_referencia, elasticidad=ELASTICIDAD):
+    """Factor de adopción de un segmento con una recompensa dada (0 monedas = el segmento no crece)."""
+    relativo = np.asarray(recompensa, dtype=float) / recompensa_referencia
+    return np.where(relativo > 0, np.clip(factor * relativo ** elasticidad, *RANGO_FACTOR), 0.0)
+
+
+@dataclass
+class ResultadoPresupuesto:
+    """Mejor asignación (un valor por segmento, en el orden de `SEGMENTOS`) y la frontera costo–puntaje."""
+    presupuesto: float
+    recompensas: np.ndarray
+    factores: np.ndarray # Factor efectivo resultante de cada recompensa
+    costos: np.ndarray # Monedas emitidas por segmento durante la simulación
+    participantes_finales: np.ndarray
+    scores: np.ndarray
+    candidatos_evaluados: int
+    frontera_costo: np.ndarray # Menor costo con el que se alcanza cada puntaje de `frontera_score`
+    frontera_score: np.ndarray
+
+    @property
+    def score_total(self):
+        return int(self.scores.sum())
+
+    @property
+    def costo_total(self):
+        return float(self.costos.sum())
+
+
+def evaluar_recompensas(recompensas, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                        factores, fracciones_capacidad, N0=N0_DEFECTO):
+    """
+    Evalúa por lotes niveles de recompensa independientes por segmento.
+    recompensas: (segmentos, niveles). Devuelve (costos, scores, participantes_finales), cada uno (segmentos, niveles).
+
+    Cada segmento solo depende de su propia recompensa, así que basta una trayectoria por nivel y
+    segmento: las combinaciones entre segmentos se arman después sumando puntajes y costos.
+    """
+    claves = list(SEGMENTOS)
+    recompensas = np.asarray(recompensas, dtype=float)
+    referencia = np.array([SEGMENTOS[c]["recompensa"] for c in claves], dtype=float)[:, None]
+    acciones = np.array([ACCIONES_POR_MES[SEGMENTOS[c]["nombre"]] for c in claves])[:, None]
+    r = tasa_base_adopcion * factor_efectivo(np.asarray(factores, dtype=float)[:, None], recompensas, referencia)
+    K = (np.asarray(fracciones_capacidad, dtype=float) * poblacion_total_urc)[:, None]
+    meses = np.arange(int(duracion_simulacion) + 1)
+    participantes = solucion_logistica(np.asarray(N0, dtype=float).reshape(-1, 1), r, K, meses) # (S, L, meses + 1)
+    # Monedas emitidas: cada mes los participantes realizan sus acciones y cobran la recompensa (como el libro mayor)
+    costos = participantes[..., 1:].sum(axis=-1) * acciones * recompensas
+    finales = participantes[..., -1]
+    return costos, score_segmento(finales, poblacion_total_urc), finales
+
+
+def _combinar(costos, scores):
+    """Costo y puntaje totales de todas las combinaciones (una recompensa por segmento), forma (L0, L1, L2)."""
+    costo_total = costos[0][:, None, None] + costos[1][None, :, None] + costos[2][None, None, :]
+    score_total = scores[0][:, None, None] + scores[1][None, :, None] + scores[2][None, None, :]
+    return costo_total, score_total
+
+
+def _mejor_combinacion(costo_total, score_total, presupuesto):
+    """Índice de la combinación factible de mayor puntaje; entre empates, la más barata."""
+    factible = costo_total <= presupuesto
+    if not factible.any():
+        return None
+    mejor_score = score_total[factible].max()
+    candidatos = factible & (score_total == mejor_score)
+    costo_candidatos = np.where(candidatos, costo_total, np.inf)
+    return np.unravel_index(np.argmin(costo_candidatos), costo_total.shape)
+
+
+def _frontera(costo_total, score_total):
+    """Puntos de la frontera eficiente: para cada puntaje alcanzable, el menor costo que lo logra."""
+    costo, score = costo_total.ravel(), score_total.ravel()
+    orden = np.argsort(costo, kind="stable")
+    costo, score = costo[orden], score[orden]
+    maximo = np.maximum.accumulate(score)
+    mejora = np.r_[True, maximo[1:] > maximo[:-1]]
+    return costo[mejora], maximo[mejora]
+
+
+def _malla_inicial(clave, niveles):
+    minimo, maximo = RANGOS_RECOMPENSA[clave]
+    # Sin recompensa (el segmento no se incentiva) y niveles en escala geométrica dentro del rango del widget
+    return np.r_[0.0, np.geomspace(minimo, maximo, niveles - 1)]
+
+
+def _malla_refinada(malla, indice, niveles, minimo):
+    """Malla más fina entre los vecinos del mejor nivel (0 o dentro del rango del widget)."""
+    bajo = malla[max(indice - 1, 0)]
+    alto = malla[min(indice + 1, len(malla) - 1)]
+    refinada = np.linspace(bajo, alto, niveles - 1)
+    refinada[(refinada > 0) & (refinada < minimo)] = minimo
+    return np.sort(np.r_[refinada, malla[indice]]) # Conserva el mejor nivel
+
+
+def optimizar_presupuesto(presupuesto, tasa_base_adopcion, duracion_simulacion, poblacion_total_urc,
+                          factores, fracciones_capacidad, N0=N0_DEFECTO, niveles=NIVELES, refinamientos=REFINAMIENTOS):
+    """
+    Busca las recompensas por segmento que maximizan el puntaje total del scorecard a `duracion_simulacion`
+    sin que las monedas emitidas superen `presupuesto`. Cada pasada evalúa `niveles` recompensas por
+    segmento en un solo lote (segmentos × niveles × meses) y combina las niveles ** 3 asignaciones con
+    broadcasting; las pasadas siguientes refinan la malla alrededor de la mejor asignación.
+    Devuelve None si ni siquiera la asignación sin recompensas cabe en el presupuesto.
+    """
+    claves = list(SEGMENTOS)
+    argumentos = (tasa_base_adopcion, duracion_simulacion, poblacion_total_urc, factores, fracciones_capacidad, N0)
+    mallas = [_malla_inicial(c, niveles) for c in claves]
+    candidatos_evaluados, fronteras = 0, []
+    for _ in range(refinamientos + 1):
+        # Todas las mallas tienen `niveles` puntos: los tres segmentos se evalúan en un solo lote
+        costos, scores, finales = evaluar_recompensas(np.stack(mallas), *argumentos)
+        costo_total, score_total = _combinar(costos, scores)
+        candidatos_evaluados += costo_total.size
+        fronteras.append(_frontera(costo_total, score_total))
+        indice = _mejor_combinacion(costo_total, score_total, presupuesto)
+        if indice is None:
+            return None
+        mejor = [(mallas[s][i], costos[s][i], scores[s][i], finales[s][i]) for s, i in enumerate(indice)]
+        mallas = [_malla_refinada(malla, i, niveles, RANGOS_RECOMPENSA[c][0]) for malla, i, c in zip(mallas, indice, claves)]
+
+    recompensas, costos_mejor, scores_mejor, finales_mejor = (np.array(v) for v in zip(*mejor))
+    # La malla inicial cubre todo el rango y las refinadas aportan puntos más baratos cerca de la mejor
+    # asignación: la frontera se arma con los puntos de todas las pasadas para que la recomendación quede sobre ella
+    frontera_costo, frontera_score = _frontera(*(np.concatenate(v) for v in zip(*fronteras)))
+    referencia = np.array([SEGMENTOS[c]["recompensa"] for c in claves], dtype=float)
+    return ResultadoPresupuesto(
+        presupuesto=float(presupuesto),
+        recompensas=recompensas,
+        factores=factor_efectivo(np.asarray(factores, dtype=float), recompensas, referencia),
+        costos=costos_mejor,
+        participantes_finales=finales_mejor,
+        scores=scores_mejor,
+        candidatos_evaluados=candidatos_evaluados,
+        frontera_costo=frontera_costo,
+        frontera_score=frontera_score,
+    )
+
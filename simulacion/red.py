@@ -0,0 +1,116 @@
+# simulacion/red.py
+# Difusión de la adopción sobre la red social de los estudiantes (matriz de adyacencia CSR de scipy):
+# cada estudiante se une a un segmento según la fracción de sus contactos que ya participan.
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+GRADO_MEDIO = 40 # Contactos promedio por estudiante en la red sintética
+TAM_GRUPO = 200 # Estudiantes por grupo (salón o carrera) en la red sintética
+HOMOFILIA = 0.8 # Fracción de los contactos dentro del propio grupo
+
+
+@dataclass
+class ResultadoDifusion:
+    """Participantes por segmento y mes (forma (S, meses + 1)) y el tamaño de la red usada."""
+    meses: np.ndarray
+    participantes: np.ndarray
+    num_nodos: int
+    num_aristas: int
+
+
+# --- Construcción de la red ---
+def _simetrizar(origen, destino, num_nodos):
+    """Adyacencia binaria no dirigida (CSR float32, sin lazos ni aristas repetidas)."""
+    distintos = origen != destino
+    origen, destino = origen[distintos], destino[distintos]
+    filas = np.concatenate([origen, destino]).astype(np.int32)
+    columnas = np.concatenate([destino, origen]).astype(np.int32)
+    red = sparse.csr_matrix((np.ones(filas.size, dtype=np.float32), (filas, columnas)), shape=(num_nodos, num_nodos))
+    red.sum_duplicates()
+    red.data[:] = 1 # Dos estudiantes conectados dos veces siguen siendo un solo contacto
+    return red
+
+
+def generar_red(num_nodos, grado_medio=GRADO_MEDIO, tam_grupo=TAM_GRUPO, homofilia=HOMOFILIA, semilla=42):
+    """
+    Red sintética de grupos: los estudiantes se reparten en grupos consecutivos de `tam_grupo` y cada
+    arista une a un estudiante con otro de su grupo (probabilidad `homofilia`) o con cualquiera de la
+    universidad. Todas las aristas se sortean de una vez, sin bucles por estudiante.
+    """
+    rng = np.random.default_rng(semilla)
+    num_aristas = int(num_nodos * grado_medio // 2)
+    origen = rng.integers(0, num_nodos, num_aristas)
+    inicio_grupo = origen // tam_grupo * tam_grupo
+    tam_real = np.minimum(inicio_grupo + tam_grupo, num_nodos) - inicio_grupo # El último grupo puede ser menor
+    dentro = rng.random(num_aristas) < homofilia
+    destino = np.where(dentro, inicio_grupo + (rng.random(num_aristas) * tam_real).astype(np.int64),
+                       rng.integers(0, num_nodos, num_aristas))
+    return _simetrizar(origen, destino, num_nodos)
+
+
+def cargar_red(ruta, num_nodos):
+    """
+    Lee una red de estudiantes: matriz de scipy guardada con `sparse.save_npz` (.npz) o lista de aristas
+    en CSV (dos columnas enteras: origen, destino; el encabezado es opcional). La red se ajusta a
+    `num_nodos` estudiantes: se descartan las aristas con identificadores fuera de rango.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".npz":
+        coo = sparse.load_npz(ruta).tocoo()
+        origen, destino = coo.row, coo.col
+    elif ruta.suffix.lower() == ".csv":
+        import pandas as pd
+
+        aristas = pd.read_csv(ruta, header=None, usecols=[0, 1], comment="#")
+        if not np.issubdtype(aristas[0].dtype, np.integer): # Primera fila de encabezado
+            aristas = aristas.iloc[1:].astype(np.int64)
+        origen, destino = aristas[0].to_numpy(np.int64), aristas[1].to_numpy(np.int64)
+    else:
+        raise ValueError(f"Formato de red no soportado: {ruta.suffix} (usa .npz o .csv)")
+    en_rango = (origen >= 0) & (origen < num_nodos) & (destino >= 0) & (destino < num_nodos)
+    return _simetrizar(origen[en_rango], destino[en_rango], num_nodos)
+
+
+# --- Difusión ---
+def simular_difusion(red, N0, r, fracciones_capacidad, duracion_meses, semilla=42):
+    """
+    Propaga la adopción de todos los segmentos a la vez (una columna por segmento), un paso por mes.
+
+    Cada segmento tiene sus elegibles (fracción de capacidad, como en la simulación por agentes) y `N0`
+    participantes iniciales al azar entre ellos. En cada paso, un elegible que no participa se une con
+    probabilidad 1 - exp(-r · A/E), donde A son sus contactos participantes y E sus contactos elegibles:
+    ambos conteos salen de un producto matriz dispersa × matriz densa (nodos × segmentos). En una red
+    bien mezclada A/E ≈ N/K y se recupera el término logístico r N (1 - N/K); con grupos, la adopción
+    se satura localmente y se propaga más lento entre grupos.
+    """
+    rng = np.random.default_rng(semilla)
+    num_nodos = red.shape[0]
+    r = np.atleast_1d(np.asarray(r, dtype=np.float32))
+    fracciones_capacidad = np.broadcast_to(np.asarray(fracciones_capacidad, dtype=float), r.shape)
+    num_segmentos = r.size
+    N0 = np.broadcast_to(np.asarray(N0, dtype=float), r.shape)
+
+    elegible = rng.random((num_nodos, num_segmentos), dtype=np.float32) < fracciones_capacidad.astype(np.float32)
+    participa = np.zeros((num_nodos, num_segmentos), dtype=bool)
+    for s in range(num_segmentos):
+        indices_elegibles = np.flatnonzero(elegible[:, s])
+        iniciales = rng.choice(indices_elegibles, size=min(int(round(N0[s])), indices_elegibles.size), replace=False)
+        participa[iniciales, s] = True
+    contactos_elegibles = red @ elegible.astype(np.float32)
+    with np.errstate(divide="ignore"):
+        inverso_elegibles = np.where(contactos_elegibles > 0, 1 / contactos_elegibles, 0).astype(np.float32)
+
+    meses = np.arange(int(duracion_meses) + 1)
+    participantes = np.zeros((num_segmentos, meses.size), dtype=np.int64)
+    participantes[:, 0] = participa.sum(axis=0)
+    for mes in meses[1:]:
+        presion = (red @ participa.astype(np.float32)) * inverso_elegibles * r
+        prob_union = -np.expm1(-presion)
+        nuevos = elegible & ~participa & (rng.random((num_nodos, num_segmentos), dtype=np.float32) < prob_union)
+        participa |= nuevos
+        participantes[:, mes] = participa.sum(axis=0)
+    return ResultadoDifusion(meses, participantes, num_nodos, red.nnz // 2)
+
@@ -0,0 +1,185 @@
+# simulacion/tablas.py
+# Tablas precalculadas de bandas Monte Carlo, en archivos .npy de solo lectura que todas las sesiones y
+# procesos del servidor abren con memoria mapeada (el sistema operativo comparte sus páginas).
+#   python -m simulacion.tablas --directorio ~/.nurc/tablas --sigmas 0.2:0.1 0.1:0.05
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from simulacion.estocastico import BandasMontecarlo, simular_montecarlo
+from simulacion.logistico import PUNTOS_MALLA
+
+DIRECTORIO_TABLAS = os.environ.get("NURC_TABLAS", os.path.join(os.path.expanduser("~"), ".nurc", "tablas"))
+ARCHIVO_INDICE = "indice.json"
+VERSION = 1
+# Ejes de la malla. En modo 'parametros' cada trayectoria es N/N0 = f(r·t, K/N0) con el mismo ruido
+# lognormal, así que las bandas normalizadas N/K solo dependen de a = r · duración, ℓ = ln(K/N0) y
+# u = t / duración: una sola tabla sirve para cualquier tasa, factor, duración, población y N0.
+EJE_A = (0.05, 15.0, 96) # r · duración, en escala logarítmica (las páginas van de 0.06 a 12)
+EJE_L = (0.0, 11.0, 48) # ln(K / N0), lineal
+PUNTOS_U = PUNTOS_MALLA
+SIGMAS_DEFECTO = ((0.2, 0.1),) # (sigma_r, sigma_K) de los controles Monte Carlo por defecto
+TRAYECTORIAS_DEFECTO = 10000
+
+
+def _nombre_archivo(sigma_r, sigma_K):
+    return f"bandas_sr{sigma_r:.3f}_sk{sigma_K:.3f}.npy"
+
+
+# --- Construcción (paso fuera de línea) ---
+def _fila_tabla(a, ejes_l, u, sigma_r, sigma_K, num_trayectorias, semilla):
+    """Bandas normalizadas (3, L, U) de una fila de la malla: una a fija y todas las ℓ."""
+    K = np.exp(ejes_l)
+    bandas = simular_montecarlo(1.0, np.full_like(K, a), K, u, num_trayectorias=num_trayectorias,
+                                sigma_r=sigma_r, sigma_K=sigma_K, semilla=semilla, procesos=1)
+    return np.stack([bandas.p5, bandas.p50, bandas.p95]) / K[:, None]
+
+
+def construir_tablas(directorio=DIRECTORIO_TABLAS, sigmas=SIGMAS_DEFECTO, num_trayectorias=TRAYECTORIAS_DEFECTO,
+                     eje_a=EJE_A, eje_l=EJE_L, puntos_u=PUNTOS_U, semilla=42, procesos=None):
+    """
+    Calcula las bandas P5/P50/P95 de cada (sigma_r, sigma_K) sobre la malla a × ℓ × u y las escribe
+    como float32 (3, A, L, U). Cada fila simula todas las ℓ en un solo lote, así que consume el generador
+    de otra forma que una corrida en línea: en los nodos de la malla la tabla coincide con la simulación
+    solo estadísticamente, dentro del error Monte Carlo. El índice se escribe al final: mientras no
+    existe, las páginas siguen simulando.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    a = np.geomspace(eje_a[0], eje_a[1], eje_a[2])
+    l = np.linspace(eje_l[0], eje_l[1], eje_l[2])
+    u = np.linspace(0, 1, puntos_u)
+    procesos = procesos or os.cpu_count() or 1
+    archivos = {}
+    for sigma_r, sigma_K in sigmas:
+        argumentos = [(a_i, l, u, sigma_r, sigma_K, num_trayectorias, semilla) for a_i in a]
+        if procesos > 1:
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+                filas = list(pool.map(_fila_tabla, *zip(*argumentos)))
+        else:
+            filas = [_fila_tabla(*args) for args in argumentos]
+        nombre = _nombre_archivo(sigma_r, sigma_K)
+        temporal = directorio / f".{nombre}.tmp"
+        with open(temporal, "wb") as f:
+            np.save(f, np.stack(filas, axis=1).astype(np.float32))
+        os.replace(temporal, directorio / nombre)
+        archivos[f"{sigma_r:.3f}:{sigma_K:.3f}"] = nombre
+    indice = {"version": VERSION, "eje_a": list(eje_a), "eje_l": list(eje_l), "puntos_u": puntos_u,
+              "num_trayectorias": num_trayectorias, "semilla": semilla, "archivos": archivos}
+    temporal = directorio / f".{ARCHIVO_INDICE}.tmp"
+    temporal.write_text(json.dumps(indice, indent=2), encoding="utf-8")
+    os.replace(temporal, directorio / ARCHIVO_INDICE)
+    return indice
+
+
+# --- Consulta ---
+def _pesos(eje, valores):
+    """Índice inferior y peso lineal de cada valor sobre un eje creciente (None si cae fuera)."""
+    if np.any(valores < eje[0]) or np.any(valores > eje[-1]):
+        return None
+    i = np.clip(np.searchsorted(eje, valores, "right") - 1, 0, eje.size - 2)
+    return i, (valores - eje[i]) / (eje[i + 1] - eje[i])
+
+
+class TablasMontecarlo:
+    """Bandas precalculadas abiertas con `mmap_mode="r"`: se leen del disco (o de la caché de páginas) al consultarlas."""
+
+    def __init__(self, directorio=DIRECTORIO_TABLAS):
+        self.directorio = Path(directorio)
+        indice = json.loads((self.directorio / ARCHIVO_INDICE).read_text(encoding="utf-8"))
+        if indice.get("version") != VERSION:
+            raise ValueError(f"Versión de tablas no soportada: {indice.get('version')}")
+        self.num_trayectorias = indice["num_trayectorias"]
+        self.semilla = indice["semilla"]
+        self.log_a = np.log(np.geomspace(*indice["eje_a"][:2], indice["eje_a"][2]))
+        self.l = np.linspace(*indice["eje_l"][:2], indice["eje_l"][2])
+        self.u = np.linspace(0, 1, indice["puntos_u"])
+        self._tablas = {clave: np.load(self.directorio / nombre, mmap_mode="r")
+                        for clave, nombre in indice["archivos"].items()}
+
+    @property
+    def sigmas(self):
+        return [tuple(map(float, clave.split(":"))) for clave in self._tablas]
+
+    def bandas(self, N0, r, K, t, num_trayectorias=TRAYECTORIAS_DEFECTO, sigma_r=0.2, sigma_K=0.1,
+               sigma_ruido=0.0, modo="parametros", semilla=42, **_):
+        """
+        Bandas interpoladas con la misma forma que las de `simular_montecarlo`, o None si el caso no está
+        cubierto: otro modo o semilla, (sigma_r, sigma_K) sin tabla, más trayectorias de las precalculadas,
+        una malla que no empieza en 0 o parámetros fuera de la malla. Interpola linealmente en ln a, ℓ y u.
+        """
+        tabla = self._tablas.get(f"{sigma_r:.3f}:{sigma_K:.3f}")
+        t = np.asarray(t, dtype=float)
+        if (tabla is None or modo != "parametros" or semilla != self.semilla
+                or num_trayectorias > self.num_trayectorias or t.size < 2 or t[0] != 0):
+            return None
+        N0, r, K = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (N0, r, K)))
+        if np.any(N0 <= 0) or np.any(r <= 0):
+            return None
+        pesos_a = _pesos(self.log_a, np.log(r.ravel() * t[-1]))
+        pesos_l = _pesos(self.l, np.log(K.ravel() / N0.ravel()))
+        if pesos_a is None or pesos_l is None:
+            return None
+        (ia, wa), (il, wl) = pesos_a, pesos_l
+        # Bilineal en (ln a, ℓ): solo se leen las 4 filas vecinas de cada combinación de parámetros
+        wa, wl = wa[None, :, None], wl[None, :, None]
+        filas = ((1 - wa) * (1 - wl) * tabla[:, ia, il] + (1 - wa) * wl * tabla[:, ia, il + 1]
+                 + wa * (1 - wl) * tabla[:, ia + 1, il] + wa * wl * tabla[:, ia + 1, il + 1]) # (3, P, U)
+        u = t / t[-1]
+        if u.size != self.u.size or not np.allclose(u, self.u):
+            filas = np.stack([[np.interp(u, self.u, fila) for fila in banda] for banda in filas])
+        filas = filas * K.ravel()[None, :, None]
+        p5, p50, p95 = (banda.reshape(K.shape + (t.size,)) for banda in filas)
+        return BandasMontecarlo(t, p5, p50, p95, self.num_trayectorias)
+
+
+_tablas_abiertas = {} # directorio -> (mtime del índice, tablas)
+_tablas_lock = threading.Lock()
+
+
+def abrir_tablas(directorio=DIRECTORIO_TABLAS):
+    """
+    Tablas del proceso (una sola apertura por versión del índice), o None si aún no se han construido
+    o no se pueden abrir (otra versión, un índice corrupto o archivos faltantes): las páginas simulan.
+    Solo se guardan las aperturas exitosas: las tablas construidas con el servidor en marcha, o
+    reconstruidas, se usan en la siguiente consulta sin reiniciar.
+    """
+    try:
+        mtime = (Path(directorio) / ARCHIVO_INDICE).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _tablas_lock:
+        abiertas = _tablas_abiertas.get(str(directorio))
+        if abiertas is None or abiertas[0] != mtime:
+            _tablas_abiertas.pop(str(directorio), None)
+            try:
+                abiertas = _tablas_abiertas[str(directorio)] = (mtime, TablasMontecarlo(directorio))
+            except (ValueError, OSError, KeyError): # JSONDecodeError es un ValueError
+                return None
+        return abiertas[1]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precalcula las tablas de bandas Monte Carlo que comparten las páginas.")
+    parser.add_argument("--directorio", default=DIRECTORIO_TABLAS)
+    parser.add_argument("--sigmas", nargs="*", default=[f"{sr}:{sk}" for sr, sk in SIGMAS_DEFECTO],
+                        help="Pares sigma_r:sigma_K a precalcular (por defecto: los de los controles)")
+    parser.add_argument("--trayectorias", type=int, default=TRAYECTORIAS_DEFECTO)
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    sigmas = [tuple(float(v) for v in par.split(":")) for par in args.sigmas]
+    indice = construir_tablas(args.directorio, sigmas, args.trayectorias, procesos=args.procesos)
+    tamano = sum((Path(args.directorio) / nombre).stat().st_size for nombre in indice["archivos"].values())
+    print(f"{len(sigmas)} tablas ({tamano / 1e6:,.1f} MB) construidas en {time.perf_counter() - inicio:.1f} s "
+          f"-> {args.directorio}")
@@ -0,0 +1,80 @@
+# tests/test_ingesta.py
+# Ingesta de registros: los archivos ilegibles se reportan sin detener la ingesta de los demás.
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from simulacion.calibracion import DIRECTORIO_ESTADO
+from simulacion.ingesta import ARCHIVO_MANIFIESTO, ingerir, participantes_mensuales
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def _registros_validos(directorio):
+    (directorio / "validos.csv").write_text("estudiante,segmento,fecha\n1,cultural,2024-01-01\n2,cultural,2024-01-02\n",
+                                            encoding="utf-8")
+
+
+def _manifiesto(directorio):
+    return json.loads((directorio / DIRECTORIO_ESTADO / ARCHIVO_MANIFIESTO).read_text(encoding="utf-8"))
+
+
+def test_csv_sin_columna_estudiante(tmp_path):
+    _registros_validos(tmp_path)
+    (tmp_path / "sin_estudiante.csv").write_text("segmento,fecha\ncultural,2024-01-01\n", encoding="utf-8")
+    resumen = ingerir(tmp_path)
+    assert list(resumen.errores) == ["sin_estudiante.csv"]
+    assert "estudiante" in resumen.errores["sin_estudiante.csv"]
+    assert resumen.archivos_procesados == 1
+    assert list(_manifiesto(tmp_path)) == ["validos.csv"] # El archivo ilegible se reintenta en la próxima ingesta
+    assert participantes_mensuales(tmp_path)["cultural"][1].tolist() == [2]
+
+
+def test_parquet_sin_columna_estudiante(tmp_path):
+    _registros_validos(tmp_path)
+    pq.write_table(pa.table({"segmento": ["cultural"], "fecha": ["2024-01-01"]}), tmp_path / "sin_estudiante.parquet")
+    resumen = ingerir(tmp_path)
+    assert list(resumen.errores) == ["sin_estudiante.parquet"]
+    assert resumen.archivos_procesados == 1
+
+
+def test_encabezado_no_utf8(tmp_path):
+    _registros_validos(tmp_path)
+    (tmp_path / "latin1.csv").write_bytes(b"\xff\xfeestudiante,segmento,fecha\n1,cultural,2024-01-01\n")
+    resumen = ingerir(tmp_path)
+    assert list(resumen.errores) == ["latin1.csv"]
+    assert resumen.archivos_procesados == 1
+
+
+def test_columna_faltante_no_aborta_el_proceso(tmp_path):
+    # pyarrow aborta el intérprete al salir si `open_csv` rechaza las columnas pedidas
+    (tmp_path / "sin_estudiante.csv").write_text("segmento,fecha\ncultural,2024-01-01\n", encoding="utf-8")
+    proceso = subprocess.run(
+        [sys.executable, "-c", f"from simulacion.ingesta import ingerir; ingerir({str(tmp_path)!r})"],
+        cwd=RAIZ, capture_output=True, text=True, timeout=120)
+    assert proceso.returncode == 0, proceso.stderr
+
+
+def test_identificadores_alfanumericos_sin_colisiones(tmp_path):
+    # 200,000 identificadores de texto en un mismo segmento y mes: con un hash de 32 bits colisionaban varios
+    n = 200_000
+    pq.write_table(pa.table({"estudiante": [f"A{i:06d}" for i in range(n)], "segmento": ["cultural"] * n,
+                             "fecha": pa.array([0] * n, type=pa.timestamp("s"))}), tmp_path / "enero.parquet")
+    ingerir(tmp_path)
+    assert participantes_mensuales(tmp_path)["cultural"][1].tolist() == [n]
+
+
+def test_identificadores_alfanumericos_incrementales(tmp_path):
+    ruta = tmp_path / "registros.csv"
+    ruta.write_text("estudiante,segmento,fecha\nA1,cultural,2024-01-01\n7,cultural,2024-01-01\n", encoding="utf-8")
+    ingerir(tmp_path)
+    # Un mes nuevo con los mismos estudiantes y uno más: la numeración del diccionario se conserva entre ingestas
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write("A1,cultural,2024-02-01\n7,cultural,2024-02-01\nB2,cultural,2024-02-03\nA1,cultural,2024-02-09\n")
+    resumen = ingerir(tmp_path)
+    assert not resumen.reconstruido
+    assert participantes_mensuales(tmp_path)["cultural"][1].tolist() == [2, 3]
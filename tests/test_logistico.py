@@ -0,0 +1,43 @@
+# tests/test_logistico.py
+# Solución cerrada del modelo logístico frente a la integración numérica que usaban las páginas (odeint).
+import numpy as np
+import pytest
+from scipy.integrate import odeint
+
+from simulacion.logistico import (N0_DEFECTO, malla_temporal, modelo_logistico, puntos_resolucion, simular_logistico,
+                                  solucion_logistica)
+
+
+@pytest.mark.parametrize("r, K, duracion", [(0.05, 5000, 24), (0.3, 25000, 60), (1.2, 1000, 12), (0.005, 50000, 60)])
+def test_solucion_cerrada_igual_a_odeint(r, K, duracion):
+    t = malla_temporal(duracion)
+    numerica = odeint(modelo_logistico, N0_DEFECTO, t, args=(r, K), rtol=1e-10, atol=1e-10)[:, 0]
+    np.testing.assert_allclose(solucion_logistica(N0_DEFECTO, r, K, t), numerica, rtol=1e-6)
+
+
+def test_broadcasting_de_parametros():
+    t = malla_temporal(36)
+    r = np.array([[0.1], [0.2]])
+    K = np.array([1000.0, 2000.0, 3000.0])
+    N = solucion_logistica(N0_DEFECTO, r, K, t)
+    assert N.shape == (2, 3, t.size)
+    np.testing.assert_allclose(N[1, 2], solucion_logistica(N0_DEFECTO, 0.2, 3000.0, t))
+    np.testing.assert_allclose(N[..., 0], N0_DEFECTO)
+
+
+def test_sin_poblacion_inicial_no_hay_adopcion():
+    N = solucion_logistica([0, 10], 0.3, 1000, malla_temporal(24))
+    assert np.all(N[0] == 0) and N[1, -1] > 10
+
+
+def test_respaldo_numerico_sin_terminos_extra():
+    t = malla_temporal(48)
+    r, K = np.array([0.1, 0.25, 0.4]), np.array([800.0, 5000.0, 20000.0])
+    integrada = simular_logistico(N0_DEFECTO, r, K, t, terminos_extra=lambda tiempo, N, r, K: np.zeros_like(N))
+    np.testing.assert_allclose(integrada, simular_logistico(N0_DEFECTO, r, K, t), rtol=1e-4)
+
+
+def test_puntos_resolucion():
+    assert puntos_resolucion(24) == 100
+    assert puntos_resolucion(12, "semanal") == 53
+    assert puntos_resolucion(12, "diaria") == 366
@@ -0,0 +1,55 @@
+# tests/test_metricas.py
+# Registro de métricas de impacto: la pasada vectorizada reproduce las tablas de impacto originales de las páginas.
+import numpy as np
+import pytest
+
+from simulacion.logistico import N0_DEFECTO, malla_temporal, solucion_logistica
+from simulacion.metricas import METRICAS, Metrica, evaluar_metricas, metricas_de, tabla_metricas
+
+SEGMENTOS_PAGINAS = ("cultural", "ambiental", "academico")
+
+
+def _participantes(poblacion=25000, duracion=36):
+    t = malla_temporal(duracion)
+    return t, solucion_logistica(N0_DEFECTO, np.array([0.06, 0.05, 0.04]), np.array([0.2, 0.15, 0.3]) * poblacion, t)
+
+
+def test_igual_a_las_tablas_originales():
+    t, participantes = _participantes()
+    valores, metricas = evaluar_metricas(participantes, SEGMENTOS_PAGINAS)
+    # Cálculo de las páginas antes del registro: truncado a entero por punto de la malla y suma acumulada
+    tasas = {"cultural": (1 / 10, 1 / 50), "ambiental": (0.5, 1 / 20), "academico": (1 / 10, 1 / 5)}
+    esperado = [np.cumsum((participantes[s] * tasa).astype(int))
+                for s, clave in enumerate(SEGMENTOS_PAGINAS) for tasa in tasas[clave]]
+    assert [m.segmento for m in metricas] == ["cultural", "cultural", "ambiental", "ambiental", "academico", "academico"]
+    np.testing.assert_array_equal(valores, np.array(esperado))
+
+
+def test_escenarios_en_dimensiones_iniciales():
+    _, participantes = _participantes()
+    lote = np.stack([participantes, participantes * 0.5])
+    valores, _ = evaluar_metricas(lote, SEGMENTOS_PAGINAS)
+    assert valores.shape == (2, len(METRICAS), participantes.shape[-1])
+    np.testing.assert_array_equal(valores[0], evaluar_metricas(participantes, SEGMENTOS_PAGINAS)[0])
+
+
+def test_un_solo_segmento_y_agregacion_mensual():
+    _, participantes = _participantes()
+    mensual = Metrica("participantes", "ambiental", 1.0, "Participantes", agregacion="mensual")
+    valores, metricas = evaluar_metricas(participantes[1:2], ["ambiental"], METRICAS + (mensual,))
+    assert metricas == metricas_de(["ambiental"]) + (mensual,)
+    np.testing.assert_array_equal(valores[-1], participantes[1].astype(np.int64))
+    np.testing.assert_array_equal(valores[0], np.cumsum((participantes[1] * 0.5).astype(int)))
+
+
+def test_agregacion_desconocida():
+    with pytest.raises(ValueError):
+        Metrica("x", "cultural", 1.0, "X", agregacion="promedio")
+
+
+def test_tabla_metricas():
+    t, participantes = _participantes(duracion=12)
+    valores, metricas = evaluar_metricas(participantes[:1], ["cultural"])
+    tabla = tabla_metricas(t, valores, metricas)
+    assert list(tabla.columns) == ["Mes de Simulación", "Eventos Asistidos (acum.)", "Obras/Contenido Creado (acum.)"]
+    np.testing.assert_array_equal(tabla["Obras/Contenido Creado (acum.)"].to_numpy(), valores[1])
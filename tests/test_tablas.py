@@ -0,0 +1,66 @@
+# tests/test_tablas.py
+# Apertura de las tablas Monte Carlo precalculadas: reutilización por proceso, reconstrucción e índices inválidos.
+import json
+import os
+
+import numpy as np
+import pytest
+
+from simulacion.tablas import ARCHIVO_INDICE, VERSION, abrir_tablas, construir_tablas
+
+
+def _construir(directorio, num_trayectorias=50):
+    # Malla mínima: basta para abrir y consultar las tablas en pocos segundos
+    return construir_tablas(directorio, num_trayectorias=num_trayectorias, eje_a=(0.5, 5.0, 3), eje_l=(1.0, 5.0, 3),
+                            puntos_u=5, procesos=1)
+
+
+def _tocar_indice(directorio):
+    """Adelanta el mtime del índice: en algunos sistemas de archivos dos escrituras seguidas comparten marca."""
+    ruta = directorio / ARCHIVO_INDICE
+    mtime = ruta.stat().st_mtime_ns + 1_000_000_000
+    os.utime(ruta, ns=(mtime, mtime))
+
+
+@pytest.fixture(scope="module")
+def directorio_tablas(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp("tablas")
+    _construir(directorio)
+    return directorio
+
+
+def test_sin_tablas(tmp_path):
+    assert abrir_tablas(tmp_path) is None
+
+
+def test_una_apertura_por_indice(directorio_tablas):
+    tablas = abrir_tablas(directorio_tablas)
+    assert tablas is not None and tablas.num_trayectorias == 50
+    assert abrir_tablas(directorio_tablas) is tablas
+    bandas = tablas.bandas(10, 0.1, 1000, np.linspace(0, 24, 5), num_trayectorias=50)
+    assert bandas.p50.shape == (5,) and np.all(bandas.p5 <= bandas.p95)
+
+
+def test_tablas_reconstruidas_se_reabren(tmp_path):
+    _construir(tmp_path)
+    anteriores = abrir_tablas(tmp_path)
+    _construir(tmp_path, num_trayectorias=80)
+    _tocar_indice(tmp_path)
+    nuevas = abrir_tablas(tmp_path)
+    assert nuevas is not anteriores and nuevas.num_trayectorias == 80
+
+
+@pytest.mark.parametrize("indice", ["{no es json", json.dumps({"version": VERSION + 1}), json.dumps({"version": VERSION})])
+def test_indice_invalido(tmp_path, indice):
+    _construir(tmp_path)
+    assert abrir_tablas(tmp_path) is not None
+    (tmp_path / ARCHIVO_INDICE).write_text(indice, encoding="utf-8")
+    _tocar_indice(tmp_path)
+    assert abrir_tablas(tmp_path) is None # Las páginas vuelven a simular en lugar de fallar
+
+
+def test_archivo_de_tabla_faltante(tmp_path):
+    indice = _construir(tmp_path)
+    for nombre in indice["archivos"].values():
+        (tmp_path / nombre).unlink()
+    assert abrir_tablas(tmp_path) is None